@@ -14,9 +14,38 @@ __description__ = "QR Code Generator and URL Shortener Toolkit"
 from src.utils.qr_generator import QRCodeGenerator
 from src.utils.url_shortener import URLShortener
 from src.utils.svg_color_validator import SVGColorValidator
+from src.utils.metrics import MetricsRegistry, metrics
+from src.utils.profiling import RequestProfiler
+from src.utils.label_sheet import LabelSheetCompositor, SheetLayout
+from src.utils.render_pool import QRRenderPool, RenderResult
+from src.utils.preview_tokens import PreviewTokenCodec
+from src.utils.render_cache import SharedRenderCache
+from src.utils.file_delivery import FileDelivery
+from src.utils.compression import ResponseCompressor
+from src.utils.static_assets import StaticAssetManifest
+from src.utils.page_shell import PageShell
+from src.utils.svg_fixer import SVGFixer
+from src.utils.logo_palette import LogoPaletteExtractor
+from src.utils.qr_reader import QRCodeReader
 
 __all__ = [
     'QRCodeGenerator',
     'URLShortener', 
-    'SVGColorValidator'
+    'SVGColorValidator',
+    'MetricsRegistry',
+    'metrics',
+    'RequestProfiler',
+    'LabelSheetCompositor',
+    'SheetLayout',
+    'QRRenderPool',
+    'RenderResult',
+    'PreviewTokenCodec',
+    'SharedRenderCache',
+    'FileDelivery',
+    'ResponseCompressor',
+    'StaticAssetManifest',
+    'PageShell',
+    'SVGFixer',
+    'LogoPaletteExtractor',
+    'QRCodeReader'
 ]
\ No newline at end of file
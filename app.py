@@ -10,39 +10,103 @@ import logging
 import io
 import uuid
 import tempfile
-from flask import Flask, request, render_template, send_file, flash, redirect, url_for, session, Response
-from PIL import Image
+import time
+import hashlib
+import datetime
+import unicodedata
+from urllib.parse import quote
+from flask import (Flask, request, send_file, flash, redirect, url_for, session, Response, g,
+                   stream_with_context)
+from PIL import Image, UnidentifiedImageError
+from lxml import etree
+from qrcode.exceptions import DataOverflowError
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from utils import QRCodeGenerator, URLShortener, SVGColorValidator
+from utils import (QRCodeGenerator, URLShortener, SVGColorValidator, RequestProfiler, PreviewTokenCodec,
+                   SharedRenderCache, FileDelivery, ResponseCompressor, StaticAssetManifest, PageShell, SVGFixer,
+                   LogoPaletteExtractor, metrics)
+from utils.log_config import configure_logging
 
 app = Flask(__name__, 
             template_folder='src/templates',
             static_folder='src/static')
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('app.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
+# Configure logging (records are written by a background listener thread)
+configure_logging(
+    level=os.environ.get('LOG_LEVEL', 'INFO'),
+    log_file=os.environ.get('LOG_FILE', 'app.log') or None,
+    log_format=os.environ.get('LOG_FORMAT', 'text'),
+    max_bytes=int(os.environ.get('LOG_MAX_BYTES', 10 * 1024 * 1024)),
+    backup_count=int(os.environ.get('LOG_BACKUP_COUNT', 5))
 )
 logger = logging.getLogger(__name__)
 
 # Initialize utility classes
-qr_generator = QRCodeGenerator()
+qr_generator = QRCodeGenerator(png_profile=os.environ.get('QR_PNG_PROFILE', 'balanced'),
+                               error_correction=os.environ.get('QR_ERROR_CORRECTION', 'auto'),
+                               min_contrast=float(os.environ.get('QR_MIN_CONTRAST', 3.0)))
 url_shortener = URLShortener()
 svg_validator = SVGColorValidator()
+logo_palette = LogoPaletteExtractor()
 
 # Create temp directory for QR previews
-TEMP_DIR = os.path.join(tempfile.gettempdir(), 'qr_previews')
+TEMP_DIR = os.environ.get('QR_PREVIEW_DIR') or os.path.join(tempfile.gettempdir(), 'qr_previews')
 os.makedirs(TEMP_DIR, exist_ok=True)
 
+# Preview files are streamed by Flask, or handed to the front proxy
+# (X-Accel-Redirect / X-Sendfile) so Python does not copy the bytes
+file_delivery = FileDelivery(
+    TEMP_DIR,
+    mode=os.environ.get('FILE_DELIVERY', 'direct'),
+    internal_prefix=os.environ.get('FILE_DELIVERY_PREFIX', '/_protected/qr_previews')
+)
+
+# Preview storage: 'session' keeps a temp file per session on this machine,
+# 'stateless' puts signed render parameters in the preview URL so any node
+# sharing SECRET_KEY can serve it
+PREVIEW_MODE = os.environ.get('QR_PREVIEW_MODE', 'session')
+
+# Read every PNG/WebP render back before it is delivered
+VERIFY_RENDERS = os.environ.get('QR_VERIFY', 'true').lower() == 'true'
+
+# Largest version per code when long payloads are split into a sequence
+SEQUENCE_MAX_VERSION = int(os.environ.get('QR_SEQUENCE_MAX_VERSION', QRCodeGenerator.SEQUENCE_MAX_VERSION))
+preview_tokens = PreviewTokenCodec(
+    app.secret_key,
+    max_age=int(os.environ.get('QR_PREVIEW_MAX_AGE', 3600))
+)
+
+# Render cache shared by all workers on this machine (disabled unless RENDER_CACHE_DIR is set)
+render_cache = None
+if os.environ.get('RENDER_CACHE_DIR'):
+    render_cache = SharedRenderCache(
+        os.environ['RENDER_CACHE_DIR'],
+        max_bytes=int(os.environ.get('RENDER_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    )
+
+# gzip/brotli for text responses; static CSS/JS are served from precompressed copies
+compressor = ResponseCompressor(min_size=int(os.environ.get('COMPRESS_MIN_SIZE', 1024)))
+try:
+    compressor.precompress_directory(app.static_folder)
+except OSError as e:
+    logger.warning("Could not precompress static files: %s", e)
+
+# Content-hashed static URLs, cached by browsers for a year
+STATIC_MAX_AGE = 365 * 24 * 3600
+static_assets = StaticAssetManifest(app.static_folder)
+
+# index.html is rendered once; requests only add the fragments they show
+index_page = PageShell(app, 'index.html')
+
+# Opt-in request profiling (disabled unless PROFILE_TOKEN is set)
+profiler = RequestProfiler(
+    token=os.environ.get('PROFILE_TOKEN'),
+    profile_dir=os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'qr_profiles'))
+)
+
 def cleanup_old_files():
     """Clean up old preview files (older than 1 hour)."""
     import time
@@ -54,9 +118,9 @@ def cleanup_old_files():
                 file_age = current_time - os.path.getmtime(filepath)
                 if file_age > 3600:  # 1 hour
                     os.remove(filepath)
-                    logger.info(f"Cleaned up old preview file: {filename}")
+                    logger.info("Cleaned up old preview file: %s", filename)
     except Exception as e:
-        logger.warning(f"Failed to cleanup old files: {e}")
+        logger.warning("Failed to cleanup old files: %s", e)
 
 def save_qr_preview(qr_data, mimetype, filename, export_format):
     """Save QR preview to temp file and return preview info."""
@@ -67,19 +131,21 @@ def save_qr_preview(qr_data, mimetype, filename, export_format):
     temp_filename = f"{preview_id}.{export_format}"
     temp_filepath = os.path.join(TEMP_DIR, temp_filename)
     
-    if export_format == 'svg':
-        # Save SVG as text
-        with open(temp_filepath, 'w', encoding='utf-8') as f:
-            f.write(qr_data)
-    else:
-        # Save PNG as binary from base64
-        import base64
-        qr_bytes = base64.b64decode(qr_data)
-        with open(temp_filepath, 'wb') as f:
-            f.write(qr_bytes)
+    with metrics.span('preview_write'):
+        if export_format == 'svg':
+            # Save SVG as text
+            with open(temp_filepath, 'w', encoding='utf-8') as f:
+                f.write(qr_data)
+        else:
+            # Save binary formats from base64
+            import base64
+            qr_bytes = base64.b64decode(qr_data)
+            with open(temp_filepath, 'wb') as f:
+                f.write(qr_bytes)
     
     # Clean up old files periodically
-    cleanup_old_files()
+    with metrics.span('preview_cleanup'):
+        cleanup_old_files()
     
     # Return preview info (small, session-safe)
     return {
@@ -91,6 +157,154 @@ def save_qr_preview(qr_data, mimetype, filename, export_format):
     }
 
 
+@app.before_request
+def start_request_timer():
+    """Record the request start time for latency metrics."""
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Observe per-route latency and status counts."""
+    start = g.pop('request_start', None)
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe('http_request_duration_seconds', time.perf_counter() - start,
+                        route=route, method=request.method)
+        metrics.inc('http_requests_total', route=route, method=request.method,
+                    status=response.status_code)
+    return response
+
+
+@app.after_request
+def compress_response(response):
+    """Compress large text responses for clients that accept it."""
+    return compressor.compress_response(response, request)
+
+
+@app.url_defaults
+def fingerprint_static_urls(endpoint, values):
+    """Make url_for('static', ...) point at the content-hashed file name."""
+    if endpoint == 'static' and 'filename' in values:
+        if app.debug:
+            # Pick up edited assets without a restart
+            static_assets.build()
+        values['filename'] = static_assets.hashed(values['filename'])
+
+
+def serve_static(filename):
+    """Serve static files, preferring precompressed copies; fingerprinted names never change."""
+    original = static_assets.resolve(filename)
+    if original is None:
+        response = compressor.send_static(app.static_folder, filename, request,
+                                          max_age=app.get_send_file_max_age(filename))
+    else:
+        response = compressor.send_static(app.static_folder, original, request, max_age=STATIC_MAX_AGE)
+        if response is not None:
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+    if response is None:
+        return "Not found", 404
+    return response
+
+
+app.view_functions['static'] = serve_static
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Expose collected metrics in Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+def render_cache_params(data, export_format, style, pages=None):
+    """Everything that determines a render's bytes, normalized for cache keys."""
+    params = {key: value for key, value in style.items() if key != 'logo_image' and value is not None}
+    logo_image = style.get('logo_image')
+    if logo_image is not None:
+        params['logo'] = [hashlib.sha256(logo_image.tobytes()).hexdigest(), logo_image.mode, list(logo_image.size)]
+    params.update(
+        data=data,
+        export_format=export_format,
+        pages=pages or [],
+        png_profile=qr_generator.png_profile,
+        error_correction='auto' if qr_generator.auto_error_correction else qr_generator.error_correction
+    )
+    return params
+
+
+def render_qr(data, export_format, style, pages=None):
+    """
+    Render a QR code (one PDF page per payload when pages are given),
+    through the shared render cache when it is enabled.
+    
+    Returns:
+        tuple: (bytes, mimetype)
+    """
+    def render():
+        if pages:
+            buf, mimetype, _ = qr_generator.generate_pdf_pages([data] + pages, **style)
+        else:
+            buf, mimetype, _ = qr_generator.generate_qr_code(data=data, export_format=export_format, **style)
+        return buf.getvalue(), mimetype
+    
+    if render_cache is None:
+        return render()
+    key = render_cache.make_key('render', render_cache_params(data, export_format, style, pages))
+    return render_cache.get_or_render(key, render)
+
+
+def qr_style_from_form(form):
+    """Styling keyword arguments for the QR generator from the QR form fields."""
+    color_mask = form.get('color_mask', 'solid')
+    style = {
+        'module_drawer': form.get('module_drawer', 'square'),
+        'color_mask': color_mask,
+        'foreground_color': form.get('foreground_color'),
+        'background_color': form.get('background_color'),
+        'gradient_start': form.get('gradient_start'),
+        'gradient_end': form.get('gradient_end')
+    }
+    # Only use gradient colors if custom mode and gradient is enabled
+    if color_mask != 'custom' or form.get('use_gradient') != 'on':
+        style['gradient_start'] = None
+        style['gradient_end'] = None
+    return style
+
+
+def attachment_filename(filename):
+    """
+    Content-Disposition options for a download name (as ``send_file`` builds them).
+    
+    Names outside ASCII, such as uploaded file names, get an ASCII fallback
+    plus an RFC 5987 ``filename*``, since WSGI headers must be Latin-1.
+    """
+    try:
+        filename.encode('ascii')
+        return {'filename': filename}
+    except UnicodeEncodeError:
+        fallback = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        return {'filename': fallback, 'filename*': f"UTF-8''{quote(filename, safe='!#$&+^`|')}"}
+
+
+def parse_tolerance(value, name, default=0.01):
+    """
+    Read a tolerance from a form or JSON value (missing or empty means ``default``).
+    
+    Raises:
+        ValueError: If the value is not a positive finite number
+    """
+    if value is None or value == '':
+        return default
+    try:
+        tolerance = float(value)
+    except (TypeError, ValueError):
+        tolerance = float('nan')
+    if not 0 < tolerance < float('inf'):
+        raise ValueError(f"{name} must be a positive number")
+    return tolerance
+
+
 @app.route('/')
 def index():
     """Main page with both QR code generator and URL shortener."""
@@ -98,12 +312,19 @@ def index():
     show_qr = request.args.get('show_qr')
     
     if show_qr and 'qr_preview' in session:
-        qr_preview = session['qr_preview']
+        qr_preview = dict(session['qr_preview'])
+        if 'token' in qr_preview:
+            qr_preview['url'] = url_for('serve_token_preview', token=qr_preview['token'])
+            qr_preview['download_url'] = url_for('serve_token_preview', token=qr_preview['token'], download=1)
+        else:
+            qr_preview['url'] = url_for('serve_preview', preview_id=qr_preview['preview_id'])
+            qr_preview['download_url'] = url_for('download_qr')
         
-    return render_template('index.html', qr_preview=qr_preview)
+    return index_page.render(qr_preview=qr_preview)
 
 
 @app.route('/generate-qr', methods=['POST'])
+@profiler.profile_view
 def generate_qr():
     """Generate QR code with specified parameters."""
     try:
@@ -117,49 +338,88 @@ def generate_qr():
         logo_image = None
         if 'image' in request.files and request.files['image'].filename != '':
             logo_image = Image.open(request.files['image'])
-            logger.info(f"Logo image uploaded: {request.files['image'].filename}")
+            logger.info("Logo image uploaded: %s", request.files['image'].filename)
         
         # Get styling options
         export_format = request.form.get('export_format', 'png')
-        module_drawer = request.form.get('module_drawer', 'square')
-        color_mask = request.form.get('color_mask', 'solid')
+        style = qr_style_from_form(request.form)
+        style['logo_image'] = logo_image
         
-        # Get custom color options
-        foreground_color = request.form.get('foreground_color')
-        background_color = request.form.get('background_color')
-        gradient_start = request.form.get('gradient_start')
-        gradient_end = request.form.get('gradient_end')
-        use_gradient = request.form.get('use_gradient') == 'on'
+        if style['color_mask'] == 'custom' and style['gradient_start']:
+            logger.info("Generating QR code - Format: %s, Style: %s, Color: custom (fg: %s, bg: %s, gradient: %s to %s)",
+                        export_format, style['module_drawer'], style['foreground_color'],
+                        style['background_color'], style['gradient_start'], style['gradient_end'])
+        elif style['color_mask'] == 'custom':
+            logger.info("Generating QR code - Format: %s, Style: %s, Color: custom (fg: %s, bg: %s)",
+                        export_format, style['module_drawer'], style['foreground_color'],
+                        style['background_color'])
+        else:
+            logger.info("Generating QR code - Format: %s, Style: %s, Color: %s",
+                        export_format, style['module_drawer'], style['color_mask'])
         
-        # Only use gradient colors if custom mode and gradient is enabled
-        if color_mask == 'custom' and not use_gradient:
-            gradient_start = None
-            gradient_end = None
+        # Payloads too large for one small code are downloaded as a sequence
+        parts = [data]
+        if request.form.get('split_sequence') == 'on':
+            parts = qr_generator.plan_sequence(data, SEQUENCE_MAX_VERSION, logo_image)
         
-        if export_format == 'svg':
-            logger.info(f"Generating QR code - Format: {export_format} (styling options not available for SVG)")
-        else:
-            if color_mask == 'custom':
-                color_info = f"custom (fg: {foreground_color}, bg: {background_color}"
-                if use_gradient:
-                    color_info += f", gradient: {gradient_start} to {gradient_end}"
-                color_info += ")"
-                logger.info(f"Generating QR code - Format: {export_format}, Style: {module_drawer}, Color: {color_info}")
-            else:
-                logger.info(f"Generating QR code - Format: {export_format}, Style: {module_drawer}, Color: {color_mask}")
+        # Reject colors that will not scan before spending time on rendering
+        # (all codes of a sequence share the style, so the first one stands for them)
+        contrast = qr_generator.check_contrast(parts[0], **style)
+        if contrast['status'] == 'error':
+            logger.info("Rejected QR colors: contrast %.2f", contrast['contrast'])
+            flash(f"Colors rejected: {' '.join(contrast['messages'])}", 'error')
+            return redirect(url_for('index'))
+        for message in contrast['messages']:
+            flash(message, 'warning')
+        
+        if len(parts) > 1:
+            buf, mimetype, filename = qr_generator.generate_sequence(parts, export_format, **style)
+            logger.info("Split payload into a sequence of %d QR codes (%s)", len(parts), filename)
+            return send_file(buf, mimetype=mimetype, as_attachment=True, download_name=filename)
+        
+        # Additional payloads become extra pages of a PDF
+        extra_pages = []
+        if export_format == 'pdf':
+            extra_pages = [line.strip() for line in request.form.get('pdf_pages', '').splitlines() if line.strip()]
         
         # Generate QR code
-        buf, mimetype, filename = qr_generator.generate_qr_code(
-            data=data,
-            export_format=export_format,
-            module_drawer=module_drawer,
-            color_mask=color_mask,
-            logo_image=logo_image,
-            foreground_color=foreground_color,
-            background_color=background_color,
-            gradient_start=gradient_start,
-            gradient_end=gradient_end
-        )
+        if extra_pages:
+            logger.info("Generating multi-page PDF with %d pages", len(extra_pages) + 1)
+        body, mimetype = render_qr(data, export_format, style, extra_pages)
+        buf = io.BytesIO(body)
+        if VERIFY_RENDERS and export_format in ('png', 'webp'):
+            verification = qr_generator.verify_image(Image.open(buf), data, logo_image)
+            if verification['ok']:
+                logger.info("Verified QR code: %d codeword errors, margin %.0f%%",
+                            verification['codeword_errors'], verification['error_margin'] * 100)
+            else:
+                logger.warning("QR code failed verification: %s",
+                               verification.get('error') or 'decoded data differs')
+                flash("The rendered code did not read back correctly; simplify the style or remove the logo",
+                      'warning')
+            buf.seek(0)
+        filename = qr_generator.output_filename(export_format)
+        
+        # Stateless mode: the preview URL carries the render parameters
+        token = None
+        if PREVIEW_MODE == 'stateless' and logo_image is None:
+            token_params = {key: value for key, value in style.items() if key != 'logo_image'}
+            token_params.update(data=data, export_format=export_format, pages=extra_pages)
+            try:
+                token = preview_tokens.dumps(token_params)
+            except ValueError as e:
+                logger.info("Using session preview instead of a token: %s", e)
+        
+        if token:
+            session.pop('qr_preview', None)
+            session['qr_preview'] = {
+                'token': token,
+                'filename': filename,
+                'format': export_format,
+                'mimetype': mimetype
+            }
+            logger.info("Issued stateless QR preview token: %s (%d chars)", filename, len(token))
+            return redirect(url_for('index', show_qr=1))
         
         # Save QR code for preview using file storage (not session)
         import base64
@@ -169,20 +429,21 @@ def generate_qr():
             # For SVG, get raw content
             svg_content = buf.read().decode('utf-8')
             qr_data = svg_content
-            logger.info(f"Generated SVG QR code, size: {len(svg_content)} chars")
+            logger.info("Generated SVG QR code, size: %d chars", len(svg_content))
             # Re-encode for download
             buf = io.BytesIO(svg_content.encode('utf-8'))
         else:
-            # For PNG, get base64 data
-            qr_data = base64.b64encode(buf.getvalue()).decode('utf-8')
-            logger.info(f"Generated PNG QR code, base64 size: {len(qr_data)} chars")
+            # For binary formats, get base64 data
+            with metrics.span('png_base64'):
+                qr_data = base64.b64encode(buf.getvalue()).decode('utf-8')
+            logger.info("Generated %s QR code, base64 size: %d chars", export_format.upper(), len(qr_data))
             buf.seek(0)  # Reset buffer for download
         
         # Save preview to temp file and store small reference in session
         preview_info = save_qr_preview(qr_data, mimetype, filename, export_format)
         session.pop('qr_preview', None)  # Clear any existing preview
         session['qr_preview'] = preview_info
-        logger.info(f"Stored QR preview: {filename} (ID: {preview_info['preview_id']})")
+        logger.info("Stored QR preview: %s (ID: %s)", filename, preview_info['preview_id'])
         
         return redirect(url_for('index', show_qr=1))
         
@@ -191,6 +452,89 @@ def generate_qr():
         return redirect(url_for('index'))
 
 
+@app.route('/api/qr/preview', methods=['POST'])
+def qr_live_preview():
+    """Fast low-resolution preview for the QR form while options are edited."""
+    data = request.form.get('data', '').strip()
+    if not data:
+        return {'error': 'No data provided'}, 400
+    
+    try:
+        size = min(max(int(request.form.get('size', 192)), 64), 512)
+        logo_image = None
+        if 'image' in request.files and request.files['image'].filename != '':
+            logo_image = Image.open(request.files['image'])
+        
+        style = qr_style_from_form(request.form)
+        style['logo_image'] = logo_image
+        preview_format = request.form.get('preview_format', 'svg')
+        
+        contrast = qr_generator.check_contrast(data, **style)
+        
+        def render():
+            return qr_generator.render_preview(data, preview_format=preview_format, size=size, **style)
+        
+        if render_cache is None:
+            body, mimetype = render()
+        else:
+            params = render_cache_params(data, preview_format, style)
+            params['size'] = size
+            body, mimetype = render_cache.get_or_render(render_cache.make_key('preview', params), render)
+    except (ValueError, DataOverflowError) as e:
+        return {'error': str(e)}, 400
+    except Exception as e:
+        logger.error("Error rendering QR preview: %s", e)
+        return {'error': f'Error rendering preview: {str(e)}'}, 500
+    
+    response = Response(body, mimetype=mimetype)
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-QR-Contrast'] = f"{contrast['contrast']:.2f}"
+    response.headers['X-QR-Contrast-Status'] = contrast['status']
+    if contrast['messages']:
+        response.headers['X-QR-Contrast-Message'] = ' '.join(contrast['messages'])
+    return response
+
+
+@app.route('/api/qr/contrast', methods=['POST'])
+def qr_contrast():
+    """Check QR colors for scannability without rendering; JSON body or form fields as for /generate-qr."""
+    data = request.get_json(silent=True)
+    if data is not None:
+        if not isinstance(data, dict):
+            return {'error': 'Expected a JSON object'}, 400
+        data = {**data, 'use_gradient': 'on' if data.get('gradient_start') else None}
+    else:
+        data = request.form.to_dict()
+    if data.get('data') is not None and not isinstance(data['data'], str):
+        return {'error': 'data must be a string'}, 400
+    color_fields = ('foreground_color', 'background_color', 'gradient_start', 'gradient_end')
+    for field in ('module_drawer', 'color_mask') + color_fields:
+        if data.get(field) is not None and not isinstance(data[field], str):
+            return {'error': f'{field} must be a string'}, 400
+    # Colors only apply in custom mode; checking them is what a caller sending colors wants
+    if 'color_mask' not in data and any(data.get(field) for field in color_fields):
+        data['color_mask'] = 'custom'
+    style = qr_style_from_form(data)
+    try:
+        return qr_generator.check_contrast(data.get('data') or None, **style)
+    except (ValueError, DataOverflowError) as e:
+        return {'error': str(e)}, 400
+
+
+@app.route('/api/logo-palette', methods=['POST'])
+def logo_palette_suggestions():
+    """Suggest QR colors from the main colors of an uploaded logo."""
+    if 'image' not in request.files or request.files['image'].filename == '':
+        return {'error': 'No image provided'}, 400
+    try:
+        return logo_palette.extract(request.files['image'].read())
+    except UnidentifiedImageError:
+        return {'error': 'Unsupported image format'}, 400
+    except Exception as e:
+        logger.error("Error extracting logo palette: %s", e)
+        return {'error': f'Error extracting colors: {str(e)}'}, 500
+
+
 @app.route('/clear-qr-session', methods=['POST'])
 def clear_qr_session():
     """Clear QR preview from session."""
@@ -206,14 +550,43 @@ def serve_preview(preview_id):
     if not qr_preview or qr_preview['preview_id'] != preview_id:
         return "Preview not found", 404
     
-    temp_filepath = os.path.join(TEMP_DIR, qr_preview['temp_file'])
-    if not os.path.exists(temp_filepath):
+    response = file_delivery.send(qr_preview['temp_file'], qr_preview['mimetype'])
+    if response is None:
         return "Preview file not found", 404
+    return response
+
+
+@app.route('/qr/<token>')
+def serve_token_preview(token):
+    """Render a QR code from a signed preview token; works on any node."""
+    try:
+        params, issued = preview_tokens.loads(token)
+    except ValueError as e:
+        logger.info("Rejected preview token: %s", e)
+        return "Preview not found", 404
     
-    return send_file(
-        temp_filepath,
-        mimetype=qr_preview['mimetype']
-    )
+    data = params.pop('data')
+    export_format = params.pop('export_format')
+    pages = params.pop('pages', None)
+    try:
+        body, mimetype = render_qr(data, export_format, params, pages)
+    except ValueError as e:
+        return str(e), 400
+    
+    response = Response(body, mimetype=mimetype)
+    if request.args.get('download'):
+        # Name the file after the original render, not this request
+        issued_local = issued.astimezone()
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename="{qr_generator.output_filename(export_format, issued_local)}"'
+        )
+    
+    # The same token always renders the same bytes
+    response.set_etag(hashlib.sha256(token.encode('utf-8')).hexdigest()[:32])
+    remaining = preview_tokens.max_age - (datetime.datetime.now(datetime.timezone.utc) - issued).total_seconds()
+    response.cache_control.private = True
+    response.cache_control.max_age = max(0, int(remaining))
+    return response.make_conditional(request)
 
 
 @app.route('/download-qr')
@@ -224,20 +597,23 @@ def download_qr():
         flash('No QR code to download. Please generate one first.', 'error')
         return redirect(url_for('index'))
     
-    temp_filepath = os.path.join(TEMP_DIR, qr_preview['temp_file'])
-    if not os.path.exists(temp_filepath):
-        flash('Preview file not found. Please generate a new QR code.', 'error')
-        return redirect(url_for('index'))
+    if 'token' in qr_preview:
+        return redirect(url_for('serve_token_preview', token=qr_preview['token'], download=1))
     
-    return send_file(
-        temp_filepath,
-        mimetype=qr_preview['mimetype'],
+    response = file_delivery.send(
+        qr_preview['temp_file'],
+        qr_preview['mimetype'],
         as_attachment=True,
         download_name=qr_preview['filename']
     )
+    if response is None:
+        flash('Preview file not found. Please generate a new QR code.', 'error')
+        return redirect(url_for('index'))
+    return response
 
 
 @app.route('/check-svg', methods=['POST'])
+@profiler.profile_view
 def check_svg():
     """Check SVG file based on svg_checker.py functionality."""
     try:
@@ -252,34 +628,43 @@ def check_svg():
         
         if not svg_content:
             flash('Please provide an SVG file or paste SVG content', 'error')
-            return render_template('index.html')
+            return index_page.render()
         
         # Get check options
         check_red = request.form.get('check_red') == 'on'
         check_width = request.form.get('check_width') == 'on'
         check_opacity = request.form.get('check_opacity') == 'on'
+        check_geometry = request.form.get('check_geometry') == 'on'
+        try:
+            width_tolerance = parse_tolerance(request.form.get('width_tolerance'), 'Width tolerance')
+        except ValueError as e:
+            flash(str(e), 'error')
+            return index_page.render(), 400
         
         # Analyze SVG
-        analysis = svg_validator.validate_svg_colors(svg_content)
+        analysis = svg_validator.validate_svg_colors(svg_content, width_tolerance=width_tolerance)
         color_suggestions = svg_validator.extract_colors_for_picker(svg_content)
+        if check_geometry:
+            analysis['geometry'] = svg_validator.analyze_geometry(svg_content)
         
-        logger.info(f"SVG analysis completed: {analysis['total_shapes']} shapes, {len(analysis['color_summary']['unique_colors'])} colors")
+        logger.info("SVG analysis completed: %d shapes, %d colors",
+                    analysis['total_shapes'], len(analysis['color_summary']['unique_colors']))
         
-        return render_template('index.html', 
-                             svg_analysis=analysis,
-                             color_suggestions=color_suggestions,
-                             check_red=check_red,
-                             check_width=check_width,
-                             check_opacity=check_opacity,
-                             show_svg=True)
+        return index_page.render(svg_analysis=analysis,
+                                 color_suggestions=color_suggestions,
+                                 check_red=check_red,
+                                 check_width=check_width,
+                                 check_opacity=check_opacity,
+                                 show_svg=True)
         
     except Exception as e:
-        logger.error(f"Error checking SVG: {str(e)}")
+        logger.error("Error checking SVG: %s", e)
         flash(f'Error analyzing SVG: {str(e)}', 'error')
-        return render_template('index.html')
+        return index_page.render()
 
 
 @app.route('/analyze-svg-colors', methods=['POST'])
+@profiler.profile_view
 def analyze_svg_colors():
     """Analyze colors in SVG content."""
     try:
@@ -288,8 +673,17 @@ def analyze_svg_colors():
             return {'error': 'No SVG content provided'}, 400
         
         svg_content = data['svg_content']
-        analysis = svg_validator.validate_svg_colors(svg_content)
+        try:
+            width_tolerance = parse_tolerance(data.get('width_tolerance'), 'Width tolerance')
+            # Points are matched on a grid of this size, so it must be a positive distance
+            tolerance = parse_tolerance(data.get('tolerance'), 'Geometry tolerance')
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        
+        analysis = svg_validator.validate_svg_colors(svg_content, width_tolerance=width_tolerance)
         color_suggestions = svg_validator.extract_colors_for_picker(svg_content)
+        if data.get('geometry'):
+            analysis['geometry'] = svg_validator.analyze_geometry(svg_content, tolerance=tolerance)
         
         return {
             'analysis': analysis,
@@ -297,10 +691,84 @@ def analyze_svg_colors():
         }
         
     except Exception as e:
-        logger.error(f"Error analyzing SVG colors: {str(e)}")
+        logger.error("Error analyzing SVG colors: %s", e)
         return {'error': f'Error analyzing SVG: {str(e)}'}, 500
 
 
+@app.route('/fix-svg', methods=['POST'])
+@profiler.profile_view
+def fix_svg():
+    """Rewrite stroke color, width and opacity to the checker's requirements and stream the SVG back."""
+    if 'svg_file' in request.files and request.files['svg_file'].filename != '':
+        svg_file = request.files['svg_file']
+        source = svg_file.stream
+        name = os.path.splitext(os.path.basename(svg_file.filename))[0] or 'drawing'
+    elif request.form.get('svg_text'):
+        source = io.BytesIO(request.form['svg_text'].encode('utf-8'))
+        name = 'drawing'
+    else:
+        flash('Please provide an SVG file or paste SVG content', 'error')
+        return redirect(url_for('index'))
+
+    # Without any check selected (e.g. a plain API call), fix everything
+    options = [request.form.get(option) == 'on' for option in ('check_red', 'check_width', 'check_opacity')]
+    fix_color, fix_width, fix_opacity = options if any(options) else (True, True, True)
+    try:
+        width_tolerance = parse_tolerance(request.form.get('width_tolerance'), 'Width tolerance')
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('index'))
+    fixer = SVGFixer(tolerance=width_tolerance, fix_color=fix_color, fix_width=fix_width, fix_opacity=fix_opacity)
+    try:
+        chunks = fixer.stream(source)
+    except etree.XMLSyntaxError as e:
+        logger.error("Error fixing SVG: %s", e)
+        flash(f'Error fixing SVG: {str(e)}', 'error')
+        return redirect(url_for('index'))
+
+    def generate():
+        yield from chunks
+        logger.info("SVG fixed: %d of %d stroked shapes", fixer.stats['fixed'], fixer.stats['shapes'])
+
+    response = Response(stream_with_context(generate()), mimetype='image/svg+xml')
+    response.headers.set('Content-Disposition', 'attachment', **attachment_filename(f'{name}-fixed.svg'))
+    return response
+
+
+@app.route('/profiles')
+def list_profiles():
+    """List captured request profiles."""
+    if not profiler.is_authorized(request.headers.get('X-Profile') or request.args.get('token')):
+        return {'error': 'Not found'}, 404
+    return {'profiles': profiler.list_profiles()}
+
+
+@app.route('/profiles/<profile_id>')
+def download_profile(profile_id):
+    """Download a captured profile as a .prof file or a text report."""
+    if not profiler.is_authorized(request.headers.get('X-Profile') or request.args.get('token')):
+        return {'error': 'Not found'}, 404
+    
+    if request.args.get('format') == 'text':
+        try:
+            report = profiler.render_text(profile_id, sort=request.args.get('sort', 'cumulative'))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if report is None:
+            return {'error': 'Profile not found'}, 404
+        return Response(report, mimetype='text/plain')
+    
+    profile_path = profiler.profile_path(profile_id)
+    if profile_path is None:
+        return {'error': 'Profile not found'}, 404
+    return send_file(
+        profile_path,
+        mimetype='application/octet-stream',
+        as_attachment=True,
+        download_name=f"{profile_id}.prof"
+    )
+
+
 @app.route('/shorten-url', methods=['POST'])
 def shorten_url():
     """Shorten a Confluence URL."""
@@ -315,7 +783,7 @@ def shorten_url():
         # Generate short URL
         short_url = url_shortener.shorten_url(full_url, base_url)
         
-        return render_template('index.html', short_url=short_url)
+        return index_page.render(short_url=short_url)
         
     except ValueError as e:
         flash(str(e), 'error')
@@ -328,14 +796,14 @@ def shorten_url():
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
-    return render_template('index.html'), 404
+    return index_page.render(), 404
 
 
 @app.errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
     flash('An internal error occurred. Please try again.', 'error')
-    return render_template('index.html'), 500
+    return index_page.render(), 500
 
 
 if __name__ == '__main__':
@@ -12,7 +12,8 @@ from PIL import Image
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from utils import QRCodeGenerator, URLShortener
+from utils import QRCodeGenerator, URLShortener, LabelSheetCompositor, SheetLayout, QRRenderPool, QRCodeReader
+from utils.label_sheet import PAGE_SIZES_MM
 
 
 def main():
@@ -28,6 +29,22 @@ Examples:
   # Generate QR code with logo
   %(prog)s qr --data "https://example.com" --logo logo.png --output qr.png
   
+  # Multi-page vector PDF, one code per page
+  %(prog)s qr --data "https://a.example" --data "https://b.example" --format pdf --output codes.pdf
+  
+  # Label sheet: one payload per line, 3x8 grid on A4 with captions
+  %(prog)s sheet --input payloads.txt --output labels.pdf --rows 8 --columns 3
+  
+  # ZIP of PNG files rendered in parallel, one per payload
+  %(prog)s qr --data "https://a.example" --data "https://b.example" --workers 4 --output codes.zip
+  
+  # Long payload as a sequence of codes of at most version 10, rendered in parallel
+  %(prog)s qr --data "$(cat vcard.txt)" --split --output codes.zip
+  
+  # Check that a code reads back, and check existing renders in bulk
+  %(prog)s qr --data "https://example.com" --logo logo.png --verify --output qr.png
+  %(prog)s verify codes/*.png
+  
   # Shorten Confluence URL
   %(prog)s shorten --url "https://confluence.com/pages/123456"
   
@@ -40,12 +57,48 @@ Examples:
     
     # QR Code generation subcommand
     qr_parser = subparsers.add_parser('qr', help='Generate QR codes')
-    qr_parser.add_argument('--data', '-d', required=True, help='Data to encode in QR code')
+    qr_parser.add_argument('--data', '-d', required=True, action='append',
+                           help='Data to encode in QR code (repeat for one PDF page per value, or a ZIP of codes for other formats)')
     qr_parser.add_argument('--output', '-o', required=True, help='Output file path')
     qr_parser.add_argument('--logo', '-l', help='Logo image file to embed')
-    qr_parser.add_argument('--format', '-f', choices=['png', 'svg'], default='png', help='Output format')
+    qr_parser.add_argument('--format', '-f', choices=list(QRCodeGenerator.EXPORT_FORMATS), default='png', help='Output format')
     qr_parser.add_argument('--style', '-s', choices=['square', 'rounded', 'circle'], default='square', help='Module style')
     qr_parser.add_argument('--color', '-c', choices=['solid', 'radial', 'square'], default='solid', help='Color mask')
+    qr_parser.add_argument('--png-profile', choices=list(QRCodeGenerator.PNG_PROFILES), default='balanced',
+                           help='PNG encoding profile (fast, balanced or small)')
+    qr_parser.add_argument('--error-correction', '-e', choices=['auto'] + list(QRCodeGenerator.ERROR_CORRECTION_LEVELS),
+                           default='auto', help='Error correction level (auto picks one that tolerates the logo)')
+    qr_parser.add_argument('--workers', type=int, help='Worker processes for multiple --data values (default: CPU count)')
+    qr_parser.add_argument('--verify', action='store_true', help='Read the code back and compare it with --data (single --data only)')
+    qr_parser.add_argument('--split', action='store_true',
+                           help='Split a payload too large for --max-version into a structured append sequence '
+                                '(a ZIP of codes, or one PDF page per code; single --data only)')
+    qr_parser.add_argument('--max-version', type=int, default=QRCodeGenerator.SEQUENCE_MAX_VERSION,
+                           help='Largest version per code with --split (1-40)')
+    
+    # Verification subcommand
+    verify_parser = subparsers.add_parser('verify', help='Check that rendered QR code images decode')
+    verify_parser.add_argument('files', nargs='+', help='PNG, WebP or other raster images of QR codes')
+    verify_parser.add_argument('--data', '-d', help='Payload every image must decode to')
+    verify_parser.add_argument('--border', type=int, default=4, help='Quiet zone of the images in modules')
+    
+    # Label sheet subcommand
+    sheet_parser = subparsers.add_parser('sheet', help='Lay out many QR codes on printable label sheets')
+    sheet_parser.add_argument('--input', '-i', required=True,
+                              help='Text file with one payload per line (optionally "payload<TAB>caption")')
+    sheet_parser.add_argument('--output', '-o', required=True, help='Output file path')
+    sheet_parser.add_argument('--format', '-f', choices=['pdf', 'png'], default='pdf',
+                              help='Vector PDF, or PNG pages (a ZIP archive when there is more than one page)')
+    sheet_parser.add_argument('--page-size', default='A4', help=f"Page size ({', '.join(PAGE_SIZES_MM)})")
+    sheet_parser.add_argument('--rows', type=int, default=8, help='Labels per column')
+    sheet_parser.add_argument('--columns', type=int, default=3, help='Labels per row')
+    sheet_parser.add_argument('--margin', type=float, default=10.0, help='Page margin in mm')
+    sheet_parser.add_argument('--gap', type=float, default=4.0, help='Space between labels in mm')
+    sheet_parser.add_argument('--no-caption', action='store_true', help='Do not print captions under the codes')
+    sheet_parser.add_argument('--dpi', type=int, default=300, help='Resolution of PNG pages')
+    sheet_parser.add_argument('--logo', '-l', help='Logo image file to embed')
+    sheet_parser.add_argument('--style', '-s', choices=['square', 'rounded', 'circle'], default='square', help='Module style')
+    sheet_parser.add_argument('--color', '-c', choices=['solid', 'radial', 'square'], default='solid', help='Color mask')
     
     # URL shortening subcommand
     url_parser = subparsers.add_parser('shorten', help='Shorten Confluence URLs')
@@ -58,9 +111,19 @@ Examples:
         parser.print_help()
         sys.exit(1)
     
+    if args.command == 'qr' and len(args.data) > 1 and (args.split or args.verify):
+        parser.error("--split and --verify apply to a single --data value")
+    
+    if args.command == 'qr' and not 1 <= args.max_version <= 40:
+        parser.error("--max-version must be between 1 and 40")
+    
     try:
         if args.command == 'qr':
             generate_qr_cli(args)
+        elif args.command == 'sheet':
+            generate_sheet_cli(args)
+        elif args.command == 'verify':
+            verify_cli(args)
         elif args.command == 'shorten':
             shorten_url_cli(args)
     except Exception as e:
@@ -70,7 +133,7 @@ Examples:
 
 def generate_qr_cli(args):
     """Generate QR code via CLI."""
-    qr_generator = QRCodeGenerator()
+    qr_generator = QRCodeGenerator(png_profile=args.png_profile, error_correction=args.error_correction)
     
     # Load logo if provided
     logo_image = None
@@ -80,20 +143,143 @@ def generate_qr_cli(args):
         except Exception as e:
             raise ValueError(f"Could not load logo image: {e}")
     
+    # Payloads too large for one small code become a structured append sequence
+    if args.split:
+        parts = qr_generator.plan_sequence(args.data[0], args.max_version, logo_image)
+        if len(parts) > 1:
+            style = {'module_drawer': args.style, 'color_mask': args.color, 'logo_image': logo_image}
+            if args.format == 'pdf':
+                buf, _, _ = qr_generator.generate_sequence(parts, 'pdf', **style)
+                with open(args.output, 'wb') as f:
+                    f.write(buf.getvalue())
+            else:
+                with QRRenderPool(processes=args.workers, png_profile=args.png_profile,
+                                  error_correction=args.error_correction) as pool, \
+                        open(args.output, 'wb') as f:
+                    pool.write_sequence(parts, f, export_format=args.format, **style)
+            print(f"Payload split into {len(parts)} QR codes: {args.output}")
+            return
+    
     # Generate QR code
-    buf, mimetype, _ = qr_generator.generate_qr_code(
-        data=args.data,
-        export_format=args.format,
-        module_drawer=args.style,
-        color_mask=args.color,
-        logo_image=logo_image
-    )
+    if len(args.data) > 1 and args.format != 'pdf':
+        # One file per payload, rendered in worker processes into a ZIP archive
+        with QRRenderPool(processes=args.workers, png_profile=args.png_profile,
+                          error_correction=args.error_correction) as pool, \
+                open(args.output, 'wb') as f:
+            count = pool.write_archive(args.data, f, export_format=args.format, module_drawer=args.style,
+                                       color_mask=args.color, logo_image=logo_image)
+        print(f"{count} QR codes generated: {args.output}")
+        return
+    
+    if len(args.data) > 1:
+        buf, mimetype, _ = qr_generator.generate_pdf_pages(
+            args.data,
+            module_drawer=args.style,
+            color_mask=args.color,
+            logo_image=logo_image
+        )
+    else:
+        buf, mimetype, _, *verification = qr_generator.generate_qr_code(
+            data=args.data[0],
+            export_format=args.format,
+            module_drawer=args.style,
+            color_mask=args.color,
+            logo_image=logo_image,
+            verify=args.verify
+        )
     
     # Save to file
     with open(args.output, 'wb') as f:
         f.write(buf.read())
     
     print(f"QR code generated: {args.output}")
+    if len(args.data) == 1:
+        print(format_segments(qr_generator.plan_segments(args.data[0], logo_image)))
+    if verification:
+        print(format_verification(verification[0]))
+        if not verification[0]['ok']:
+            sys.exit(1)
+
+
+def format_segments(plan):
+    """One-line summary of the version and segment modes chosen for a code."""
+    modes = ', '.join(f"{segment['mode']} ({segment['length']})" for segment in plan['segments'])
+    line = f"Version {plan['version']}-{plan['error_correction']}, segments: {modes}"
+    if plan['modules_saved']:
+        line += f"; {plan['modules_saved']} modules saved by segment optimization"
+    return line
+
+
+def format_verification(report):
+    """One-line summary of a verification report."""
+    if not report['decoded']:
+        return f"FAIL: does not decode ({report['error']})"
+    details = (f"version {report['version']}-{report['error_correction']}, "
+               f"{report['codeword_errors']} codeword error(s), {report['error_margin']:.0%} margin")
+    if report['structured_append']:
+        sequence = report['structured_append']
+        details = f"code {sequence['index'] + 1} of {sequence['total']}, {details}"
+    if not report['matches']:
+        return f"FAIL: decodes to different data ({details})"
+    if not report['ok']:
+        return f"FAIL: beyond the correction capacity ({details})"
+    return f"OK: {details}"
+
+
+def verify_cli(args):
+    """Check rendered QR code images via CLI."""
+    reader = QRCodeReader(border=args.border)
+    expected = {path: args.data for path in args.files} if args.data is not None else None
+    failures = 0
+    for path, report in reader.verify_files(args.files, expected):
+        print(f"{path}: {format_verification(report)}")
+        if report['decoded'] and args.data is None:
+            print(f"  {report['data']}")
+        failures += not report['ok']
+    
+    if failures:
+        print(f"{failures} of {len(args.files)} file(s) failed verification")
+        sys.exit(1)
+
+
+def read_sheet_items(path):
+    """Yield (payload, caption) pairs from a payload file without loading it whole."""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            if not line.strip():
+                continue
+            payload, _, caption = line.partition('\t')
+            yield payload, caption or payload
+
+
+def generate_sheet_cli(args):
+    """Generate a label sheet via CLI."""
+    layout = SheetLayout(
+        page_size=args.page_size,
+        rows=args.rows,
+        columns=args.columns,
+        margin=args.margin,
+        gap=args.gap,
+        caption=not args.no_caption
+    )
+    compositor = LabelSheetCompositor(QRCodeGenerator(), layout)
+    
+    logo_image = None
+    if args.logo:
+        try:
+            logo_image = Image.open(args.logo)
+        except Exception as e:
+            raise ValueError(f"Could not load logo image: {e}")
+    
+    style = {'module_drawer': args.style, 'color_mask': args.color, 'logo_image': logo_image}
+    with open(args.output, 'wb') as f:
+        if args.format == 'pdf':
+            pages = compositor.write_pdf(read_sheet_items(args.input), f, **style)
+        else:
+            pages = compositor.write_png(read_sheet_items(args.input), f, dpi=args.dpi, **style)
+    
+    print(f"Label sheet generated: {args.output} ({pages} page{'s' if pages != 1 else ''})")
 
 
 def shorten_url_cli(args):
@@ -51,12 +51,14 @@ function generateNew() {
     
     if (form && preview) {
         form.classList.remove('collapsed');
-        preview.style.display = 'none';
+        preview.remove();
     }
     
     // Clear only the text input and file input, keep radio selections
     document.getElementById('data').value = '';
     document.getElementById('image').value = '';
+    const logoColors = document.getElementById('logo-colors');
+    if (logoColors) logoColors.style.display = 'none';
     
     // Update radio button styles after showing form again
     updateRadioStyles();
@@ -138,24 +140,11 @@ document.addEventListener('DOMContentLoaded', function() {
     // Handle format change to show/hide styling options
     function handleFormatChange(format) {
         const svgInfo = document.getElementById('svg-info');
-        const moduleGroup = document.querySelector('input[name="module_drawer"]').closest('.form-group');
-        const colorGroup = document.querySelector('input[name="color_mask"]').closest('.form-group');
+        const pdfOptions = document.getElementById('pdf-options');
         
-        if (format === 'svg') {
-            // Show SVG limitations warning
-            if (svgInfo) svgInfo.style.display = 'block';
-            
-            // Disable/dim styling options for SVG
-            if (moduleGroup) moduleGroup.style.opacity = '0.5';
-            if (colorGroup) colorGroup.style.opacity = '0.5';
-        } else {
-            // Hide warning
-            if (svgInfo) svgInfo.style.display = 'none';
-            
-            // Re-enable styling options for PNG
-            if (moduleGroup) moduleGroup.style.opacity = '1';
-            if (colorGroup) colorGroup.style.opacity = '1';
-        }
+        // Show the vector output note for SVG; all styling options apply to every format
+        if (svgInfo) svgInfo.style.display = format === 'svg' ? 'block' : 'none';
+        if (pdfOptions) pdfOptions.style.display = format === 'pdf' ? 'block' : 'none';
     }
     
     // Handle color mask change to show/hide custom color options
@@ -207,6 +196,12 @@ document.addEventListener('DOMContentLoaded', function() {
     // Add SVG analysis functionality
     addSVGAnalysisFeature();
     
+    // Live preview while the QR form is edited
+    setupLivePreview();
+    
+    // Color suggestions from an uploaded logo
+    setupLogoPalette();
+    
     // Add form validation
     const forms = document.querySelectorAll('form');
     forms.forEach(form => {
@@ -250,6 +245,113 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
+function setupLivePreview() {
+    const form = document.getElementById('qr-form');
+    const target = document.getElementById('live-preview');
+    if (!form || !target) return;
+    
+    let timer = null;
+    let controller = null;
+    
+    function refreshPreview() {
+        const formData = new FormData(form);
+        if (!String(formData.get('data') || '').trim()) {
+            target.style.display = 'none';
+            target.innerHTML = '';
+            return;
+        }
+        formData.set('preview_format', 'svg');
+        
+        // Drop responses for options that have changed since
+        if (controller) controller.abort();
+        controller = new AbortController();
+        
+        fetch('/api/qr/preview', { method: 'POST', body: formData, signal: controller.signal })
+            .then(response => response.ok
+                ? response.text().then(svg => ({ svg, headers: response.headers }))
+                : Promise.reject(new Error(response.statusText)))
+            .then(({ svg, headers }) => {
+                target.innerHTML = svg;
+                // Warn about colors that may not scan before the code is generated
+                const status = headers.get('X-QR-Contrast-Status');
+                if (status && status !== 'ok') {
+                    const note = document.createElement('p');
+                    note.className = `contrast-note ${status}`;
+                    note.textContent = headers.get('X-QR-Contrast-Message') || '';
+                    target.appendChild(note);
+                }
+                target.style.display = 'block';
+            })
+            .catch(err => {
+                if (err.name !== 'AbortError') {
+                    console.error('Error updating preview:', err);
+                }
+            });
+    }
+    
+    // Debounce so typing sends one request per pause, not per keystroke
+    function schedulePreview() {
+        clearTimeout(timer);
+        timer = setTimeout(refreshPreview, 150);
+    }
+    
+    form.addEventListener('input', schedulePreview);
+    form.addEventListener('change', schedulePreview);
+}
+
+function setupLogoPalette() {
+    const input = document.getElementById('image');
+    const target = document.getElementById('logo-colors');
+    if (!input || !target) return;
+    
+    input.addEventListener('change', function() {
+        target.style.display = 'none';
+        target.innerHTML = '';
+        if (!input.files.length) return;
+        
+        const formData = new FormData();
+        formData.append('image', input.files[0]);
+        fetch('/api/logo-palette', { method: 'POST', body: formData })
+            .then(response => response.json())
+            .then(result => {
+                if (result.error) return;
+                showLogoPalette(target, result);
+            })
+            .catch(err => console.error('Error extracting logo colors:', err));
+    });
+}
+
+function showLogoPalette(target, suggestions) {
+    let html = '<small>Logo colors:</small>';
+    suggestions.palette.forEach(entry => {
+        html += `<span class="color-swatch" title="${entry.color}" style="background-color: ${entry.color}"></span>`;
+    });
+    html += `<button type="button" class="small-btn">Use logo colors (contrast ${suggestions.contrast}:1)</button>`;
+    target.innerHTML = html;
+    target.style.display = 'flex';
+    
+    target.querySelector('button').addEventListener('click', function() {
+        const customRadio = document.querySelector('input[name="color_mask"][value="custom"]');
+        if (customRadio && !customRadio.checked) {
+            customRadio.checked = true;
+            customRadio.dispatchEvent(new Event('change'));
+        }
+        const values = {
+            foreground_color: suggestions.foreground,
+            background_color: suggestions.background,
+            gradient_start: suggestions.gradient_start,
+            gradient_end: suggestions.gradient_end
+        };
+        Object.entries(values).forEach(([id, color]) => {
+            const colorInput = document.getElementById(id);
+            if (colorInput) {
+                colorInput.value = color;
+                colorInput.dispatchEvent(new Event('change', { bubbles: true }));
+            }
+        });
+    });
+}
+
 function addSVGAnalysisFeature() {
     // Add a button to analyze SVG colors when an SVG QR code is generated
     const observer = new MutationObserver(function(mutations) {
@@ -3,5 +3,23 @@
 from .qr_generator import QRCodeGenerator
 from .url_shortener import URLShortener
 from .svg_color_validator import SVGColorValidator
+from .metrics import MetricsRegistry, metrics
+from .profiling import RequestProfiler
+from .label_sheet import LabelSheetCompositor, SheetLayout
+from .render_pool import QRRenderPool, RenderResult
+from .preview_tokens import PreviewTokenCodec
+from .render_cache import SharedRenderCache
+from .file_delivery import FileDelivery
+from .compression import ResponseCompressor
+from .static_assets import StaticAssetManifest
+from .page_shell import PageShell
+from .svg_fixer import SVGFixer
+from .logo_palette import LogoPaletteExtractor
+from .qr_reader import QRCodeReader
 
-__all__ = ['QRCodeGenerator', 'URLShortener', 'SVGColorValidator']
\ No newline at end of file
+__all__ = ['QRCodeGenerator', 'URLShortener', 'SVGColorValidator', 'MetricsRegistry', 'metrics',
+           'RequestProfiler', 'LabelSheetCompositor', 'SheetLayout',
+           'QRRenderPool', 'RenderResult', 'PreviewTokenCodec',
+           'SharedRenderCache', 'FileDelivery', 'ResponseCompressor',
+           'StaticAssetManifest', 'PageShell', 'SVGFixer',
+           'LogoPaletteExtractor', 'QRCodeReader']
\ No newline at end of file
@@ -0,0 +1,181 @@
+"""WCAG relative luminance and contrast ratios (vectorized over NumPy arrays) and QR color checks."""
+
+import numpy as np
+import webcolors
+
+
+# Contrast below which codes fail to scan on many readers, and the level to aim for
+MIN_SCANNABLE_CONTRAST = 3.0
+RECOMMENDED_CONTRAST = 4.5
+
+
+def parse_color(value):
+    """
+    RGB triple of a '#rrggbb', '#rgb' or named color.
+
+    Raises:
+        ValueError: If the color cannot be read
+    """
+    value = value.strip()
+    if value.startswith('#'):
+        return tuple(webcolors.hex_to_rgb(value))
+    return tuple(webcolors.name_to_rgb(value))
+
+
+def to_hex(rgb):
+    """'#rrggbb' of an RGB triple (floats are rounded and clipped)."""
+    r, g, b = np.clip(np.rint(np.asarray(rgb, dtype=float)), 0, 255).astype(int)
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def relative_luminance(rgb):
+    """
+    WCAG 2 relative luminance.
+
+    Args:
+        rgb: Array-like of shape (..., 3) with 0-255 channels
+
+    Returns:
+        ndarray: Luminance in [0, 1] of shape (...)
+    """
+    c = np.asarray(rgb, dtype=float) / 255.0
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def contrast_ratio(first, second):
+    """
+    WCAG 2 contrast ratio, from 1 (same luminance) to 21 (black on white).
+
+    Both arguments broadcast against each other, so one color can be
+    compared with a whole array of colors at once.
+    """
+    a = relative_luminance(first)
+    b = relative_luminance(second)
+    return (np.maximum(a, b) + 0.05) / (np.minimum(a, b) + 0.05)
+
+
+def _rgb(color):
+    """RGB array of a color string or an RGB(A) tuple."""
+    if isinstance(color, str):
+        return np.array(parse_color(color), dtype=float)
+    return np.asarray(color[:3], dtype=float)
+
+
+class ColorContrastValidator:
+    """
+    Checks that QR code colors keep enough contrast to scan.
+
+    Solid colors are compared directly. For gradient masks the gradient
+    is evaluated at the center of every dark module (or of every module
+    of a sample grid when no symbol is given) in one array operation, and
+    the lowest contrast against the background counts.
+
+    Args:
+        min_contrast (float): Contrast below which a code is rejected
+        recommended_contrast (float): Contrast below which a warning is given
+    """
+
+    # Modules per side of the grid sampled when no symbol is given
+    SAMPLE_GRID = 25
+
+    def __init__(self, min_contrast=MIN_SCANNABLE_CONTRAST, recommended_contrast=RECOMMENDED_CONTRAST):
+        self.min_contrast = min_contrast
+        self.recommended_contrast = max(recommended_contrast, min_contrast)
+
+    @staticmethod
+    def gradient_colors(gradient, size, points):
+        """
+        Colors of a gradient mask, as qrcode's color masks compute them.
+
+        Args:
+            gradient (dict): ``type`` ('radial' or 'square'), ``center_color``
+                and ``edge_color``
+            size (float): Edge of the whole image, in modules (border included)
+            points (ndarray): (n, 2) x/y positions in modules
+
+        Returns:
+            ndarray: (n, 3) RGB colors
+        """
+        half = size / 2
+        dx = points[:, 0] - half
+        dy = points[:, 1] - half
+        if gradient['type'] == 'square':
+            fraction = np.maximum(np.abs(dx), np.abs(dy)) / half
+        else:
+            fraction = np.hypot(dx, dy) / (np.sqrt(2) * half)
+        center = _rgb(gradient['center_color'])
+        edge = _rgb(gradient['edge_color'])
+        return np.floor(center + (edge - center) * fraction[:, None])
+
+    def validate(self, fill_color, back_color, gradient=None, modules=None, border=4):
+        """
+        Contrast report for a set of QR colors.
+
+        Args:
+            fill_color: Module color (string or RGB tuple)
+            back_color: Background color (string or RGB tuple)
+            gradient (dict): Gradient mask replacing ``fill_color``, as in
+                ``gradient_colors``
+            modules: Module matrix of the symbol, to sample only dark modules
+            border (int): Quiet zone in modules
+
+        Returns:
+            dict: ``status`` ('ok', 'warning' or 'error'), lowest ``contrast``,
+                the thresholds, ``inverted`` (light modules on a dark
+                background), ``messages``, and for gradients a ``gradient``
+                summary with the share of modules below the recommended contrast
+
+        Raises:
+            ValueError: If a color cannot be read
+        """
+        background = _rgb(back_color)
+        report = {}
+        if gradient:
+            if modules is not None:
+                rows, cols = np.nonzero(np.asarray(modules, dtype=bool))
+                count = len(modules)
+            else:
+                count = self.SAMPLE_GRID
+                rows, cols = np.indices((count, count)).reshape(2, -1)
+            points = np.column_stack([cols + border + 0.5, rows + border + 0.5])
+            colors = self.gradient_colors(gradient, count + 2 * border, points)
+            ratios = contrast_ratio(colors, background)
+            contrast = float(ratios.min()) if len(ratios) else 21.0
+            inverted = bool(np.any(relative_luminance(colors) > relative_luminance(background)))
+            report['gradient'] = {
+                'min_contrast': round(contrast, 2),
+                'max_contrast': round(float(ratios.max()) if len(ratios) else 21.0, 2),
+                'low_contrast_share': round(float(np.mean(ratios < self.recommended_contrast)), 3)
+                if len(ratios) else 0.0,
+                'samples': int(len(ratios)),
+            }
+        else:
+            foreground = _rgb(fill_color)
+            contrast = float(contrast_ratio(foreground, background))
+            inverted = bool(relative_luminance(foreground) > relative_luminance(background))
+
+        messages = []
+        if contrast < self.min_contrast:
+            status = 'error'
+            messages.append(f"Contrast {contrast:.2f}:1 is below {self.min_contrast:g}:1; "
+                            "the code will not scan reliably")
+        elif contrast < self.recommended_contrast:
+            status = 'warning'
+            messages.append(f"Contrast {contrast:.2f}:1 is below the recommended {self.recommended_contrast:g}:1")
+        else:
+            status = 'ok'
+        if inverted:
+            if status == 'ok':
+                status = 'warning'
+            messages.append("Modules are lighter than the background; many readers cannot scan inverted codes")
+
+        report.update(
+            status=status,
+            contrast=round(contrast, 2),
+            min_contrast=self.min_contrast,
+            recommended_contrast=self.recommended_contrast,
+            inverted=inverted,
+            messages=messages,
+        )
+        return report
@@ -0,0 +1,212 @@
+"""Content-Encoding negotiation and compression for text responses."""
+
+import os
+import gzip
+import hashlib
+import mimetypes
+import threading
+import collections
+
+from flask import send_file
+
+from .metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+
+class ResponseCompressor:
+    """
+    Compresses HTML, CSS, JavaScript, JSON and SVG responses.
+
+    The encoding is picked from the request's Accept-Encoding (brotli
+    when the ``brotli`` package is installed, otherwise gzip). Bodies
+    smaller than ``min_size`` are sent as is. Generated SVGs are
+    requested again and again with the same bytes, so their compressed
+    form is kept in an LRU cache keyed by content hash; one-off bodies
+    such as analysis pages are compressed on the fly.
+
+    Static files are served from ``.br``/``.gz`` copies written once by
+    ``precompress_directory`` instead of being compressed per request.
+
+    Args:
+        min_size (int): Smallest body worth compressing, in bytes
+        gzip_level (int): gzip compression level (1-9)
+        brotli_quality (int): Brotli quality for dynamic bodies (0-11)
+        cache_size (int): Compressed SVGs kept in memory
+    """
+
+    COMPRESSIBLE_TYPES = {
+        'text/html', 'text/css', 'text/plain', 'text/javascript', 'application/javascript',
+        'application/json', 'image/svg+xml', 'application/xml', 'text/xml',
+    }
+    CACHED_TYPES = {'image/svg+xml'}
+    # Precompressed variants on disk, in order of preference
+    STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+    STATIC_EXTENSIONS = ('.css', '.js', '.svg')
+
+    def __init__(self, min_size=1024, gzip_level=6, brotli_quality=5, cache_size=256):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def encodings(self):
+        """Encodings this server can produce, best first."""
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def negotiate(self, accept_encodings, available=None):
+        """
+        Pick the encoding for a request.
+
+        Args:
+            accept_encodings: The request's parsed Accept-Encoding header
+            available (iterable): Encodings to choose from (defaults to ``encodings``)
+
+        Returns:
+            str: 'br', 'gzip', or None for identity
+        """
+        best = None
+        best_quality = 0
+        for encoding in available or self.encodings:
+            quality = accept_encodings[encoding]
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def compress(self, body, encoding):
+        """Compress a body with the given encoding."""
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def _compress_cached(self, body, encoding):
+        key = (hashlib.sha256(body).digest(), encoding)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                metrics.cache_hit('compressed_svg')
+                return cached
+        metrics.cache_miss('compressed_svg')
+        compressed = self.compress(body, encoding)
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed
+
+    def compress_response(self, response, request):
+        """
+        Compress a response in place when the client and content allow it.
+
+        Streamed and file responses, error pages and bodies that are
+        already encoded are left untouched.
+
+        Returns:
+            Response: The same response object
+        """
+        response.vary.add('Accept-Encoding')
+        if (response.direct_passthrough or response.is_streamed or response.status_code != 200
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in self.COMPRESSIBLE_TYPES):
+            return response
+
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+        encoding = self.negotiate(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        with metrics.span('compress'):
+            if response.mimetype in self.CACHED_TYPES:
+                compressed = self._compress_cached(body, encoding)
+            else:
+                compressed = self.compress(body, encoding)
+        if len(compressed) >= len(body):
+            return response
+
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # Same resource, different bytes: conditional requests still match
+            response.set_etag(etag, weak=True)
+        return response
+
+    def precompress_directory(self, root):
+        """
+        Write ``.br`` and ``.gz`` copies of the text assets below ``root``.
+
+        Copies are written with maximum compression and only when missing
+        or older than their source.
+
+        Returns:
+            int: Number of files written
+        """
+        written = 0
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if not filename.endswith(self.STATIC_EXTENSIONS):
+                    continue
+                source = os.path.join(directory, filename)
+                for encoding, suffix in self.STATIC_ENCODINGS:
+                    target = source + suffix
+                    if encoding not in self.encodings or self._is_fresh(target, source):
+                        continue
+                    with open(source, 'rb') as f:
+                        body = f.read()
+                    if encoding == 'br':
+                        compressed = brotli.compress(body, quality=11)
+                    else:
+                        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+                    with open(target, 'wb') as f:
+                        f.write(compressed)
+                    written += 1
+        return written
+
+    @staticmethod
+    def _is_fresh(copy, source):
+        """Whether a precompressed copy exists and is not older than its source."""
+        return os.path.isfile(copy) and os.path.getmtime(copy) >= os.path.getmtime(source)
+
+    def send_static(self, root, filename, request, **kwargs):
+        """
+        Serve a static file, using a precompressed copy when the client accepts it.
+
+        Args:
+            root (str): Static folder
+            filename (str): Path of the file below ``root``
+            request: The current request
+            **kwargs: Extra arguments for ``send_file`` (e.g. ``max_age``)
+
+        Returns:
+            Response: The file response, or None if the file does not exist
+        """
+        root = os.path.abspath(root)
+        path = os.path.abspath(os.path.join(root, filename))
+        if not path.startswith(root + os.sep) or not os.path.isfile(path):
+            return None
+
+        # Copies older than the source (edited since startup) are stale; serve the source instead
+        available = [encoding for encoding, suffix in self.STATIC_ENCODINGS
+                     if encoding in self.encodings and self._is_fresh(path + suffix, path)]
+        encoding = self.negotiate(request.accept_encodings, available) if available else None
+        if encoding is None:
+            response = send_file(path, conditional=True, **kwargs)
+        else:
+            compressed = path + dict(self.STATIC_ENCODINGS)[encoding]
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            etag = f"{int(os.path.getmtime(compressed))}-{os.path.getsize(compressed)}-{encoding}"
+            response = send_file(compressed, mimetype=mimetype, download_name=os.path.basename(path),
+                                 conditional=True, etag=etag, **kwargs)
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+
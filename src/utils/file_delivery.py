@@ -0,0 +1,81 @@
+"""Serve files directly or hand them off to the front proxy."""
+
+import os
+
+from flask import Response, send_file
+
+
+class FileDelivery:
+    """
+    Sends files from one directory, optionally without copying them through Python.
+
+    In ``direct`` mode files are streamed by Flask's ``send_file``. In the
+    offload modes the response carries only headers and the front proxy
+    reads the file itself:
+
+    - ``x-accel``: ``X-Accel-Redirect: <internal_prefix>/<name>``, for nginx
+      (``internal`` location) or Caddy (``handle_response`` + ``file_server``)
+    - ``x-sendfile``: ``X-Sendfile: <absolute path>``, for Apache
+      mod_xsendfile and lighttpd
+
+    The proxy must see the directory at the configured location.
+
+    Args:
+        root (str): Directory the files are served from
+        mode (str): 'direct', 'x-accel' or 'x-sendfile'
+        internal_prefix (str): URL prefix mapped to ``root`` by the proxy
+            (x-accel only)
+    """
+
+    MODES = ('direct', 'x-accel', 'x-sendfile')
+
+    def __init__(self, root, mode='direct', internal_prefix='/_protected/qr_previews'):
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported file delivery mode: {mode}. Choose from {', '.join(self.MODES)}")
+        self.root = os.path.abspath(root)
+        self.mode = mode
+        self.internal_prefix = internal_prefix.rstrip('/')
+
+    def path(self, name):
+        """
+        Absolute path of a file in ``root``.
+
+        Returns:
+            str: The path, or None if the name escapes ``root`` or the file is missing
+        """
+        path = os.path.abspath(os.path.join(self.root, name))
+        if os.path.dirname(path) != self.root or not os.path.isfile(path):
+            return None
+        return path
+
+    def send(self, name, mimetype, as_attachment=False, download_name=None):
+        """
+        Build the response for a file in ``root``.
+
+        Args:
+            name (str): File name inside ``root``
+            mimetype (str): Content type of the file
+            as_attachment (bool): Send a Content-Disposition attachment header
+            download_name (str): File name offered to the browser
+
+        Returns:
+            Response: The file, or an empty response for the proxy to fill;
+                None if the file does not exist
+        """
+        path = self.path(name)
+        if path is None:
+            return None
+
+        if self.mode == 'direct':
+            return send_file(path, mimetype=mimetype, as_attachment=as_attachment,
+                             download_name=download_name)
+
+        response = Response(mimetype=mimetype)
+        if self.mode == 'x-accel':
+            response.headers['X-Accel-Redirect'] = f"{self.internal_prefix}/{os.path.basename(path)}"
+        else:
+            response.headers['X-Sendfile'] = path
+        if as_attachment:
+            response.headers.set('Content-Disposition', 'attachment',
+                                 filename=download_name or os.path.basename(path))
+        return response
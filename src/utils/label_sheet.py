@@ -0,0 +1,286 @@
+"""Label sheet compositor: lays out many QR codes on printable pages."""
+
+import io
+import zipfile
+import itertools
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw, ImageFont
+
+from .metrics import metrics
+from .vector_export import PDFWriter, PDFPageResources, MM_TO_PT, _fmt
+
+
+PAGE_SIZES_MM = {
+    'A4': (210.0, 297.0),
+    'A5': (148.0, 210.0),
+    'A3': (297.0, 420.0),
+    'LETTER': (215.9, 279.4),
+    'LEGAL': (215.9, 355.6),
+}
+
+# Helvetica advance widths (1/1000 em) for ASCII 32-126, from the standard AFM
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+
+
+def _helvetica_width(text, font_size):
+    """Width of ``text`` set in Helvetica, in the units of ``font_size``."""
+    total = 0
+    for char in text:
+        code = ord(char)
+        total += _HELVETICA_WIDTHS[code - 32] if 32 <= code <= 126 else 556
+    return total * font_size / 1000
+
+
+def _pdf_string(text):
+    """Escape text for a PDF literal string in WinAnsiEncoding."""
+    encoded = text.encode('cp1252', errors='replace').decode('latin-1')
+    return '(' + encoded.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+class SheetLayout:
+    """
+    Grid specification for a label sheet.
+
+    All lengths are in millimetres.
+
+    Args:
+        page_size (str or tuple): Name from PAGE_SIZES_MM or (width, height)
+        rows (int): Labels per column
+        columns (int): Labels per row
+        margin (float): Page margin on every side
+        gap (float): Space between neighbouring cells
+        caption (bool): Print the caption text under each code
+        caption_size (float): Caption font size in points
+    """
+
+    def __init__(self, page_size='A4', rows=8, columns=3, margin=10.0, gap=4.0,
+                 caption=True, caption_size=8.0):
+        if isinstance(page_size, str):
+            try:
+                page_size = PAGE_SIZES_MM[page_size.upper()]
+            except KeyError:
+                raise ValueError(f"Unknown page size: {page_size}. Choose from {', '.join(PAGE_SIZES_MM)}")
+        if rows < 1 or columns < 1:
+            raise ValueError("Rows and columns must be at least 1")
+
+        self.page_width, self.page_height = page_size
+        self.rows = rows
+        self.columns = columns
+        self.margin = margin
+        self.gap = gap
+        self.caption = caption
+        self.caption_size = caption_size
+
+        self.cell_width = (self.page_width - 2 * margin - (columns - 1) * gap) / columns
+        self.cell_height = (self.page_height - 2 * margin - (rows - 1) * gap) / rows
+        # Caption line height: font size in points plus leading, in mm
+        self.caption_height = caption_size * 1.4 / MM_TO_PT if caption else 0
+        self.code_size = min(self.cell_width, self.cell_height - self.caption_height)
+        if self.code_size <= 0:
+            raise ValueError("Grid does not fit on the page; reduce rows, columns, margin or gap")
+
+    @property
+    def per_page(self):
+        return self.rows * self.columns
+
+    def cell_origin(self, index):
+        """Top-left corner (mm, y down) of the cell at ``index`` on a page."""
+        row, column = divmod(index, self.columns)
+        x = self.margin + column * (self.cell_width + self.gap)
+        y = self.margin + row * (self.cell_height + self.gap)
+        return x, y
+
+    def code_origin(self, index):
+        """Top-left corner (mm, y down) of the code, centered in its cell."""
+        x, y = self.cell_origin(index)
+        return (x + (self.cell_width - self.code_size) / 2,
+                y + (self.cell_height - self.caption_height - self.code_size) / 2)
+
+
+class LabelSheetCompositor:
+    """
+    Renders batches of QR codes onto label sheets.
+
+    Payloads are consumed lazily and each page is written out as soon as
+    it is full, so memory stays bounded by one page regardless of the
+    batch size. Items may be plain payload strings or (payload, caption)
+    tuples; the payload itself is the default caption.
+    """
+
+    def __init__(self, generator, layout, cache_size=64):
+        self.generator = generator
+        self.layout = layout
+        self.cache_size = cache_size
+
+    @staticmethod
+    def _normalize(item):
+        if isinstance(item, (tuple, list)):
+            payload, caption = item
+            return payload, caption
+        return item, item
+
+    def _pages(self, items):
+        """Group items into page-sized chunks without materializing the batch."""
+        iterator = iter(items)
+        while True:
+            page = list(itertools.islice(iterator, self.layout.per_page))
+            if not page:
+                return
+            yield [self._normalize(item) for item in page]
+
+    def write_pdf(self, items, fileobj, **style):
+        """
+        Stream a vector PDF sheet to ``fileobj``, one page at a time.
+
+        Args:
+            items (iterable): Payloads or (payload, caption) tuples
+            fileobj: Binary file-like object to write to
+            **style: Styling options as for ``QRCodeGenerator.generate_qr_code``
+
+        Returns:
+            int: Number of pages written
+
+        Raises:
+            ValueError: If ``items`` is empty
+        """
+        pages = self._pages(items)
+        first = next(pages, None)
+        if first is None:
+            raise ValueError("At least one payload is required for a label sheet")
+        layout = self.layout
+        generator = self.generator
+        renderer = generator.vector_renderer
+
+        writer = PDFWriter(fileobj)
+        page_width = layout.page_width * MM_TO_PT
+        page_height = layout.page_height * MM_TO_PT
+        code_cache = OrderedDict()
+
+        for page in itertools.chain([first], pages):
+            with metrics.span('sheet_pdf_page'):
+                resources = PDFPageResources(writer)
+                content = []
+                for index, (payload, caption) in enumerate(page):
+                    code = dict(self._cached(code_cache, payload, lambda: generator.vector_code(payload, **style)))
+                    modules = code.pop('modules')
+                    size = len(modules) + 2 * generator.border
+                    scale = layout.code_size * MM_TO_PT / size
+                    x, y = layout.code_origin(index)
+                    # Flip to the renderer's y-down module space inside the cell
+                    content.append(f'q {_fmt(scale)} 0 0 {_fmt(-scale)} {_fmt(x * MM_TO_PT)} '
+                                   f'{_fmt(page_height - y * MM_TO_PT)} cm')
+                    content.extend(renderer.pdf_code_ops(modules, resources, **code))
+                    content.append('Q')
+
+                    if layout.caption and caption:
+                        content.append(self._pdf_caption(caption, index, resources, page_height))
+                writer.add_page(page_width, page_height, '\n'.join(content) + '\n',
+                                resources=resources.dictionary())
+        writer.close()
+        return len(writer.page_refs)
+
+    def _pdf_caption(self, caption, index, resources, page_height):
+        layout = self.layout
+        font = resources.font('Helvetica')
+        text = self._fit_caption(caption, layout.cell_width * MM_TO_PT,
+                                 lambda t: _helvetica_width(t, layout.caption_size))
+        cell_x, cell_y = layout.cell_origin(index)
+        center = (cell_x + layout.cell_width / 2) * MM_TO_PT
+        baseline = page_height - (cell_y + layout.cell_height) * MM_TO_PT + layout.caption_size * 0.4
+        x = center - _helvetica_width(text, layout.caption_size) / 2
+        return (f'0 0 0 rg BT /{font} {_fmt(layout.caption_size)} Tf '
+                f'{_fmt(round(x, 3))} {_fmt(round(baseline, 3))} Td {_pdf_string(text)} Tj ET')
+
+    @staticmethod
+    def _fit_caption(text, max_width, measure):
+        """Truncate ``text`` with an ellipsis so it fits ``max_width``."""
+        if measure(text) <= max_width:
+            return text
+        while text and measure(text + '...') > max_width:
+            text = text[:-1]
+        return text + '...'
+
+    def _cached(self, cache, key, compute):
+        """Small LRU so repeated payloads in a batch are encoded only once."""
+        if key in cache:
+            cache.move_to_end(key)
+            metrics.cache_hit('sheet_codes')
+            return cache[key]
+        metrics.cache_miss('sheet_codes')
+        value = cache[key] = compute()
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
+
+    def iter_png_pages(self, items, dpi=300, **style):
+        """
+        Yield each sheet page as a PIL image.
+
+        Every code is rendered once at the cell resolution and pasted into
+        the shared page canvas; only one page is held in memory at a time.
+        """
+        layout = self.layout
+        px_per_mm = dpi / 25.4
+        page_size = (round(layout.page_width * px_per_mm), round(layout.page_height * px_per_mm))
+        code_px = int(layout.code_size * px_per_mm)
+        font = None
+        if layout.caption:
+            font = ImageFont.load_default(size=max(1, round(layout.caption_size / 72 * dpi)))
+        image_cache = OrderedDict()
+
+        for page in self._pages(items):
+            with metrics.span('sheet_png_page'):
+                canvas = Image.new('RGB', page_size, 'white')
+                draw = ImageDraw.Draw(canvas)
+                for index, (payload, caption) in enumerate(page):
+                    code = self._cached(image_cache, payload,
+                                        lambda: self.generator.render_image(payload, max_size=code_px, **style))
+                    x, y = layout.code_origin(index)
+                    # Center the (box-size rounded) render on the nominal code area
+                    offset = (code_px - code.size[0]) // 2
+                    canvas.paste(code, (round(x * px_per_mm) + offset, round(y * px_per_mm) + offset))
+
+                    if font is not None and caption:
+                        cell_x, cell_y = layout.cell_origin(index)
+                        max_width = layout.cell_width * px_per_mm
+                        text = self._fit_caption(caption, max_width, lambda t: draw.textlength(t, font=font))
+                        center = (cell_x + layout.cell_width / 2) * px_per_mm
+                        bottom = (cell_y + layout.cell_height) * px_per_mm
+                        draw.text((center, bottom), text, fill='black', font=font, anchor='md')
+            yield canvas
+
+    def write_png(self, items, fileobj, dpi=300, **style):
+        """
+        Write PNG sheet pages to ``fileobj``.
+
+        A single page is written as a plain PNG; more pages are streamed
+        into a ZIP archive (page-0001.png, ...) as they are rendered.
+
+        Returns:
+            int: Number of pages written
+        """
+        pages = self.iter_png_pages(items, dpi=dpi, **style)
+        first = next(pages, None)
+        if first is None:
+            raise ValueError("At least one payload is required for a label sheet")
+        second = next(pages, None)
+        if second is None:
+            first.save(fileobj, format='PNG', dpi=(dpi, dpi), optimize=True)
+            return 1
+
+        count = 0
+        with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for page in itertools.chain([first, second], pages):
+                count += 1
+                page_buf = io.BytesIO()
+                page.save(page_buf, format='PNG', dpi=(dpi, dpi))
+                archive.writestr(f'page-{count:04d}.png', page_buf.getvalue())
+        return count
@@ -0,0 +1,175 @@
+"""Color palettes of raster logos, for QR color suggestions."""
+
+import io
+import hashlib
+import threading
+import collections
+
+import numpy as np
+from PIL import Image
+
+from .metrics import metrics
+from .color_contrast import RECOMMENDED_CONTRAST, relative_luminance, contrast_ratio, to_hex
+
+WHITE = np.array([255.0, 255.0, 255.0])
+
+
+class LogoPaletteExtractor:
+    """
+    Extracts the main colors of a logo and suggests QR colors from them.
+
+    The logo is downsampled to at most ``max_side`` pixels per side and
+    quantized with median cut on a NumPy array of its opaque pixels.
+    From the palette a dark foreground and a light background with at
+    least ``min_contrast`` between them are picked (a palette color is
+    darkened when none is dark enough), plus a gradient end that keeps
+    the same contrast. Results are cached by a hash of the image, so
+    re-uploading or re-previewing the same logo costs nothing.
+
+    Args:
+        colors (int): Palette size
+        max_side (int): Longest side of the downsampled copy, in pixels
+        min_contrast (float): WCAG contrast the suggestions must reach
+        cache_size (int): Palettes kept in memory
+    """
+
+    MIN_SPLIT_RANGE = 8
+
+    def __init__(self, colors=6, max_side=64, min_contrast=RECOMMENDED_CONTRAST, cache_size=128):
+        self.colors = colors
+        self.max_side = max_side
+        self.min_contrast = min_contrast
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def image_hash(image):
+        """Cache key of an image given as bytes or a PIL image."""
+        if isinstance(image, (bytes, bytearray)):
+            return hashlib.sha256(image).hexdigest()
+        digest = hashlib.sha256(image.tobytes())
+        digest.update(f"{image.mode}{image.size}".encode())
+        return digest.hexdigest()
+
+    def extract(self, image):
+        """
+        Palette and color suggestions for a logo.
+
+        Args:
+            image: Encoded image bytes (PNG, JPEG, ...) or a PIL image
+
+        Returns:
+            dict: ``palette`` ([{'color', 'share'}], most common first),
+                ``foreground``, ``background``, ``gradient_start``,
+                ``gradient_end``, their ``contrast`` and ``suggested_colors``
+
+        Raises:
+            PIL.UnidentifiedImageError: If the bytes are not an image
+        """
+        key = self.image_hash(image)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                metrics.cache_hit('logo_palette')
+                return cached
+        metrics.cache_miss('logo_palette')
+
+        with metrics.span('logo_palette'):
+            if isinstance(image, (bytes, bytearray)):
+                image = Image.open(io.BytesIO(image))
+            colors, counts = self.quantize(self._pixels(image))
+            result = self.suggest(colors, counts)
+
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _pixels(self, image):
+        """Opaque pixels of a downsampled RGBA copy, as an (n, 3) float array."""
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        scale = self.max_side / max(image.size)
+        if scale < 1:
+            size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+            image = image.resize(size, Image.Resampling.BOX, reducing_gap=2.0)
+        rgba = np.asarray(image.convert('RGBA'), dtype=float).reshape(-1, 4)
+        opaque = rgba[rgba[:, 3] >= 128, :3]
+        return opaque if len(opaque) else rgba[:, :3]
+
+    def quantize(self, pixels):
+        """
+        Median cut: split the box with the widest channel range at its median.
+
+        Returns:
+            tuple: (colors as a (k, 3) array of box means, pixel counts),
+                most common first
+        """
+        boxes = [pixels]
+        while len(boxes) < self.colors:
+            ranges = [np.ptp(box, axis=0) if len(box) > 1 else np.zeros(3) for box in boxes]
+            # Boxes that are already nearly one color are not split further
+            scores = [spread.max() * len(box) if spread.max() > self.MIN_SPLIT_RANGE else 0
+                      for spread, box in zip(ranges, boxes)]
+            index = int(np.argmax(scores))
+            if scores[index] <= 0:
+                break
+            box = boxes.pop(index)
+            values = box[:, int(np.argmax(ranges[index]))]
+            middle = len(box) // 2
+            order = np.argpartition(values, middle)
+            boxes.extend([box[order[:middle]], box[order[middle:]]])
+
+        colors = np.rint([box.mean(axis=0) for box in boxes])
+        counts = np.array([len(box) for box in boxes])
+        order = np.argsort(-counts, kind='stable')
+        return colors[order], counts[order]
+
+    def _darkened(self, color, background):
+        """The lightest shade of ``color`` with enough contrast on ``background``."""
+        shades = np.rint(np.linspace(1.0, 0.0, 51)[:, None] * color)
+        enough = np.flatnonzero(contrast_ratio(shades, background) >= self.min_contrast)
+        return shades[enough[0]] if len(enough) else shades[-1]
+
+    def suggest(self, colors, counts):
+        """Foreground, background and gradient suggestions from a palette."""
+        shares = counts / counts.sum()
+        luminance = relative_luminance(colors)
+
+        # Background: white or a light palette color; foreground: a darker palette color
+        backgrounds = np.vstack([colors, WHITE])
+        background_shares = np.append(shares, 0.0)
+        contrast = contrast_ratio(colors[:, None, :], backgrounds[None, :, :])
+        darker = luminance[:, None] < relative_luminance(backgrounds)[None, :]
+        score = np.where((contrast >= self.min_contrast) & darker,
+                         shares[:, None] + 0.5 * background_shares[None, :], -1.0)
+        fg_index, bg_index = np.unravel_index(np.argmax(score), score.shape)
+        if score[fg_index, bg_index] < 0:
+            background = WHITE
+            foreground = self._darkened(colors[0], background)
+            fg_index, bg_index = 0, len(colors)
+        else:
+            background = backgrounds[bg_index]
+            foreground = colors[fg_index]
+
+        # Gradient end: the most common other color, darkened as needed
+        others = [i for i in range(len(colors)) if i != fg_index and i != bg_index
+                  and np.abs(colors[i] - foreground).max() > 24]
+        end = colors[others[0]] if others else np.rint(foreground * 0.6)
+        if contrast_ratio(end, background) < self.min_contrast or \
+                relative_luminance(end) >= relative_luminance(background):
+            end = self._darkened(end, background)
+
+        return {
+            'palette': [{'color': to_hex(color), 'share': round(float(share), 3)}
+                        for color, share in zip(colors, shares)],
+            'foreground': to_hex(foreground),
+            'background': to_hex(background),
+            'gradient_start': to_hex(foreground),
+            'gradient_end': to_hex(end),
+            'contrast': round(float(contrast_ratio(foreground, background)), 2),
+            'suggested_colors': [to_hex(color) for color in colors],
+        }
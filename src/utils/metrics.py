@@ -0,0 +1,161 @@
+"""Lightweight request and hot-path instrumentation with Prometheus text export."""
+
+import time
+import threading
+from contextlib import contextmanager
+
+
+# Histogram bucket upper bounds in seconds (Prometheus defaults, plus a 30s tail)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75,
+                   1.0, 2.5, 5.0, 7.5, 10.0, 30.0)
+
+
+def _format_labels(labels):
+    """Render a sorted label tuple as a Prometheus label set."""
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class _Histogram:
+    """Cumulative histogram for a single label set."""
+
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters and histograms."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+
+    def describe(self, name, help_text):
+        """Register the HELP text shown for a metric family."""
+        self._help[name] = help_text
+
+    def inc(self, name, amount=1, **labels):
+        """
+        Increment a counter.
+
+        Args:
+            name (str): Metric family name
+            amount (float): Value to add
+            **labels: Label values identifying the series
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """
+        Record an observation in a histogram.
+
+        Args:
+            name (str): Metric family name
+            value (float): Observed value (seconds for timing metrics)
+            **labels: Label values identifying the series
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block into the ``span_duration_seconds`` histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('span_duration_seconds', time.perf_counter() - start, span=name)
+
+    def cache_hit(self, cache):
+        """Count a hit on the named cache."""
+        self.inc('cache_hits_total', cache=cache)
+
+    def cache_miss(self, cache):
+        """Count a miss on the named cache."""
+        self.inc('cache_misses_total', cache=cache)
+
+    def reset(self):
+        """Drop all recorded series."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: Exposition text (version 0.0.4)
+        """
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, list(h.counts), h.total, h.count)
+                for key, h in self._histograms.items()
+            )
+
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name in seen:
+                return
+            seen.add(name)
+            if name in self._help:
+                lines.append(f'# HELP {name} {self._help[name]}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f'{name}{_format_labels(labels)} {value}')
+
+        for (name, labels), counts, total, count in histograms:
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                bucket_labels = labels + (('le', repr(float(bound))),)
+                lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {cumulative}')
+            inf_labels = labels + (('le', '+Inf'),)
+            lines.append(f'{name}_bucket{_format_labels(inf_labels)} {count}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+            lines.append(f'{name}_count{_format_labels(labels)} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry shared by the utilities and the Flask app
+metrics = MetricsRegistry()
+metrics.describe('span_duration_seconds', 'Time spent in instrumented hot-path sections.')
+metrics.describe('cache_hits_total', 'Cache lookups that returned a stored value.')
+metrics.describe('cache_misses_total', 'Cache lookups that had to compute the value.')
+metrics.describe('cache_evictions_total', 'Entries dropped from a bounded cache.')
+metrics.describe('http_request_duration_seconds', 'Request latency by route.')
+metrics.describe('http_requests_total', 'Requests served by route and status code.')
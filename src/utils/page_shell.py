@@ -0,0 +1,86 @@
+"""Pages rendered once as a static shell with small per-request fragments."""
+
+import threading
+
+from flask import render_template, get_flashed_messages
+from markupsafe import Markup
+
+from .metrics import metrics
+
+
+class PageShell:
+    """
+    Renders a page template once and fills in its dynamic fragments per request.
+
+    The template marks each dynamic part with ``{{ fragment('name') }}``.
+    On first use it is rendered with those calls replaced by markers and
+    split into static chunks; later requests only join the chunks with
+    the fragments that have something to show. A fragment is rendered
+    from ``fragments/<name>.html`` when its context value is set (or, for
+    ``flashes``, when there are flashed messages); otherwise it is empty
+    and the page costs no template rendering at all.
+
+    The shell is rebuilt on every request while templates auto-reload
+    (debug mode), so edits to the page show up immediately.
+
+    Args:
+        app (Flask): Application whose templates are used
+        template (str): Shell template name
+    """
+
+    MARKER = '\x00fragment:{}\x00'
+
+    def __init__(self, app, template):
+        self.app = app
+        self.template = template
+        self._chunks = None
+        self._lock = threading.Lock()
+
+    def _compile(self):
+        names = []
+
+        def fragment(name):
+            names.append(name)
+            return Markup(self.MARKER.format(name))
+
+        with metrics.span('page_shell_compile'):
+            html = render_template(self.template, fragment=fragment)
+        chunks = []
+        for name in names:
+            static, html = html.split(self.MARKER.format(name), 1)
+            chunks.append((static, name))
+        chunks.append((html, None))
+        return chunks
+
+    def chunks(self):
+        """Static chunks of the shell, each followed by a fragment name (None at the end)."""
+        if self.app.jinja_env.auto_reload:
+            return self._compile()
+        if self._chunks is None:
+            with self._lock:
+                if self._chunks is None:
+                    self._chunks = self._compile()
+        return self._chunks
+
+    def render(self, **context):
+        """
+        Render the page for the current request.
+
+        Args:
+            **context: Fragment values (e.g. ``qr_preview``) and any extra
+                variables the fragments use
+
+        Returns:
+            str: The full HTML page
+        """
+        messages = get_flashed_messages(with_categories=True)
+        if messages:
+            context['flashes'] = context['messages'] = messages
+
+        parts = []
+        for static, name in self.chunks():
+            parts.append(static)
+            if name is not None and context.get(name):
+                with metrics.span('page_fragment'):
+                    parts.append(render_template(f'fragments/{name}.html', **context))
+        return ''.join(parts)
@@ -0,0 +1,96 @@
+"""Signed, self-contained tokens describing a QR render."""
+
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+
+
+class PreviewTokenCodec:
+    """
+    Encodes QR render parameters into compact, signed URL tokens.
+
+    A token carries everything needed to render the code again, so any
+    worker or node sharing the secret key can serve it without a session
+    file. Field names are shortened, defaults are left out and the
+    payload is zlib-compressed when that helps; the signature includes
+    the issue time, which bounds the token's lifetime.
+
+    Args:
+        secret_key (str): Key shared by every node serving previews
+        max_age (int): Seconds a token stays valid
+        max_length (int): Longest token accepted for a URL
+    """
+
+    # Long parameter names and their short token keys
+    FIELDS = {
+        'data': 'd',
+        'export_format': 'f',
+        'module_drawer': 'm',
+        'color_mask': 'c',
+        'foreground_color': 'fg',
+        'background_color': 'bg',
+        'gradient_start': 'gs',
+        'gradient_end': 'ge',
+        'pages': 'p',
+    }
+    DEFAULTS = {
+        'export_format': 'png',
+        'module_drawer': 'square',
+        'color_mask': 'solid',
+    }
+
+    def __init__(self, secret_key, max_age=3600, max_length=2048):
+        self.serializer = URLSafeTimedSerializer(secret_key, salt='qr-preview')
+        self.max_age = max_age
+        self.max_length = max_length
+
+    def dumps(self, params):
+        """
+        Encode render parameters into a token.
+
+        Args:
+            params (dict): Keys from FIELDS; None values and defaults are dropped
+
+        Returns:
+            str: URL-safe token
+
+        Raises:
+            ValueError: If a parameter is unknown or the token is too long
+        """
+        compact = {}
+        for name, value in params.items():
+            if name not in self.FIELDS:
+                raise ValueError(f"Unsupported preview parameter: {name}")
+            if value is None or value == [] or self.DEFAULTS.get(name) == value:
+                continue
+            compact[self.FIELDS[name]] = value
+
+        token = self.serializer.dumps(compact)
+        if len(token) > self.max_length:
+            raise ValueError(f"Preview token too long ({len(token)} > {self.max_length} characters)")
+        return token
+
+    def loads(self, token):
+        """
+        Decode and verify a token.
+
+        Returns:
+            tuple: (params dict with defaults filled in, issue time as datetime)
+
+        Raises:
+            ValueError: If the token is malformed, tampered with or expired
+        """
+        if len(token) > self.max_length:
+            raise ValueError("Preview token too long")
+        try:
+            compact, issued = self.serializer.loads(token, max_age=self.max_age, return_timestamp=True)
+        except SignatureExpired:
+            raise ValueError("Preview token expired")
+        except BadSignature:
+            raise ValueError("Invalid preview token")
+
+        names = {short: name for name, short in self.FIELDS.items()}
+        params = dict(self.DEFAULTS)
+        for short, value in compact.items():
+            if short not in names:
+                raise ValueError("Invalid preview token")
+            params[names[short]] = value
+        return params, issued
@@ -0,0 +1,164 @@
+"""Opt-in per-request cProfile capture for diagnosing slow payloads."""
+
+import io
+import os
+import re
+import hmac
+import uuid
+import time
+import pstats
+import cProfile
+import functools
+
+from .metrics import metrics
+
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+_PROFILE_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+# Orders accepted by ``render_text`` (the pstats.SortKey values)
+SORT_KEYS = frozenset(key.value for key in pstats.SortKey)
+
+
+class RequestProfiler:
+    """
+    Captures a cProfile profile for individual requests on demand.
+
+    Profiling is enabled only when a token is configured. Clients then send
+    the token in the ``X-Profile`` header to profile that one request; the
+    saved profile id is returned in the ``X-Profile-Id`` response header.
+    Without a token, ``profile_view`` returns the view unchanged so the
+    disabled path costs nothing.
+    """
+
+    def __init__(self, token=None, profile_dir=None, max_profiles=50):
+        self.token = token or None
+        self.profile_dir = profile_dir
+        self.max_profiles = max_profiles
+        if self.enabled:
+            os.makedirs(self.profile_dir, exist_ok=True)
+
+    @property
+    def enabled(self):
+        return bool(self.token and self.profile_dir)
+
+    def is_authorized(self, supplied_token):
+        """Check a client-supplied token in constant time."""
+        if not self.enabled or not supplied_token:
+            return False
+        return hmac.compare_digest(str(supplied_token), self.token)
+
+    def profile_view(self, view):
+        """
+        Decorate a Flask view so it can be profiled via the request header.
+
+        Args:
+            view (callable): The view function
+
+        Returns:
+            callable: The original view when profiling is disabled,
+            otherwise a wrapper that profiles authorized requests
+        """
+        if not self.enabled:
+            return view
+
+        from flask import request, make_response
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.is_authorized(request.headers.get(PROFILE_HEADER)):
+                return view(*args, **kwargs)
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                result = view(*args, **kwargs)
+            finally:
+                profiler.disable()
+                profile_id = self._save(profiler, request.path)
+            response = make_response(result)
+            response.headers[PROFILE_ID_HEADER] = profile_id
+            return response
+
+        return wrapper
+
+    def _save(self, profiler, path):
+        profile_id = uuid.uuid4().hex
+        profiler.dump_stats(os.path.join(self.profile_dir, f"{profile_id}.prof"))
+        with open(os.path.join(self.profile_dir, f"{profile_id}.path"), 'w', encoding='utf-8') as f:
+            f.write(path)
+        metrics.inc('profiles_captured_total')
+        self._prune()
+        return profile_id
+
+    def _prune(self):
+        """Keep only the newest ``max_profiles`` captures."""
+        profiles = self.list_profiles()
+        for info in profiles[self.max_profiles:]:
+            for ext in ('.prof', '.path'):
+                try:
+                    os.remove(os.path.join(self.profile_dir, info['id'] + ext))
+                except OSError:
+                    pass
+
+    def list_profiles(self):
+        """
+        List saved profiles, newest first.
+
+        Returns:
+            list: Dicts with 'id', 'path' and 'created' keys
+        """
+        if not self.enabled:
+            return []
+        profiles = []
+        for filename in os.listdir(self.profile_dir):
+            if not filename.endswith('.prof'):
+                continue
+            profile_id = filename[:-5]
+            path_file = os.path.join(self.profile_dir, profile_id + '.path')
+            try:
+                with open(path_file, encoding='utf-8') as f:
+                    path = f.read()
+            except OSError:
+                path = None
+            profiles.append({
+                'id': profile_id,
+                'path': path,
+                'created': os.path.getmtime(os.path.join(self.profile_dir, filename))
+            })
+        profiles.sort(key=lambda info: info['created'], reverse=True)
+        return profiles
+
+    def profile_path(self, profile_id):
+        """
+        Resolve the file for a saved profile.
+
+        Returns:
+            str or None: Path to the .prof file, or None if unknown
+        """
+        if not self.enabled or not _PROFILE_ID_RE.match(profile_id):
+            return None
+        path = os.path.join(self.profile_dir, f"{profile_id}.prof")
+        return path if os.path.exists(path) else None
+
+    def render_text(self, profile_id, sort='cumulative', limit=50):
+        """
+        Render a saved profile as a pstats text report.
+
+        Returns:
+            str or None: The report, or None if the profile does not exist
+
+        Raises:
+            ValueError: If ``sort`` is not one of SORT_KEYS
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort order: {sort}. Choose from {', '.join(sorted(SORT_KEYS))}")
+        path = self.profile_path(profile_id)
+        if path is None:
+            return None
+        out = io.StringIO()
+        out.write(f"Profile {profile_id} captured {time.ctime(os.path.getmtime(path))}\n\n")
+        stats = pstats.Stats(path, stream=out)
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
@@ -0,0 +1,208 @@
+"""Estimate whether a QR code still decodes when part of it is covered.
+
+The check works on the symbol layout only: it maps every module to the
+codeword it carries (following the placement order of ISO/IEC 18004),
+then counts damaged codewords per Reed-Solomon block and compares them
+with what the block can correct. No image decoding is involved, so it is
+cheap enough to run on every render.
+"""
+
+import math
+import functools
+
+import qrcode
+from qrcode.base import rs_blocks
+
+
+# Codewords reserved for misdecode protection in the smallest symbols;
+# they reduce the correction capacity below (n - k) / 2
+_MISDECODE_PROTECTION = {
+    (1, qrcode.constants.ERROR_CORRECT_L): 3,
+    (1, qrcode.constants.ERROR_CORRECT_M): 2,
+    (1, qrcode.constants.ERROR_CORRECT_Q): 1,
+    (1, qrcode.constants.ERROR_CORRECT_H): 1,
+    (2, qrcode.constants.ERROR_CORRECT_L): 2,
+    (3, qrcode.constants.ERROR_CORRECT_L): 1,
+}
+
+
+# Roles of the modules in a symbol
+DATA, ALIGNMENT, FUNCTION = 0, 1, 2
+
+
+@functools.lru_cache(maxsize=None)
+def module_roles(version):
+    """
+    Role of every module: DATA, ALIGNMENT, or FUNCTION (finders,
+    separators, timing, format and version information).
+
+    Returns:
+        tuple: Rows of role constants
+    """
+    count = version * 4 + 17
+    qr = qrcode.QRCode(version=version)
+    qr.modules_count = count
+    qr.modules = [[None] * count for _ in range(count)]
+    # Same order as qrcode's makeImpl: alignment patterns overlapping a
+    # finder are skipped, and timing modules stop at alignment patterns
+    qr.setup_position_probe_pattern(0, 0)
+    qr.setup_position_probe_pattern(count - 7, 0)
+    qr.setup_position_probe_pattern(0, count - 7)
+    before = [[module is not None for module in row] for row in qr.modules]
+    qr.setup_position_adjust_pattern()
+    alignment = [[module is not None and not before[r][c] for c, module in enumerate(row)]
+                 for r, row in enumerate(qr.modules)]
+    qr.setup_timing_pattern()
+    qr.setup_type_info(True, 0)
+    if version >= 7:
+        qr.setup_type_number(True)
+
+    return tuple(
+        tuple(ALIGNMENT if alignment[r][c] else FUNCTION if module is not None else DATA
+              for c, module in enumerate(row))
+        for r, row in enumerate(qr.modules)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def data_module_order(version):
+    """
+    Data modules in the order their bits are placed.
+
+    Follows qrcode's ``map_data`` zigzag: bit ``i`` of the codeword stream
+    lands on the ``i``-th (row, col) pair, most significant bit of each
+    codeword first. Modules past the last codeword hold remainder bits.
+
+    Returns:
+        tuple: (row, col) pairs of every data module
+    """
+    roles = module_roles(version)
+    count = len(roles)
+    order = []
+
+    inc = -1
+    row = count - 1
+    for col in range(count - 1, 0, -2):
+        if col <= 6:
+            col -= 1
+        while True:
+            for c in (col, col - 1):
+                if roles[row][c] == DATA:
+                    order.append((row, c))
+            row += inc
+            if row < 0 or row >= count:
+                row -= inc
+                inc = -inc
+                break
+    return tuple(order)
+
+
+@functools.lru_cache(maxsize=None)
+def codeword_map(version):
+    """
+    Index of the codeword stored in every data module.
+
+    Remainder bits past the last codeword and function modules are None.
+
+    Returns:
+        tuple: Rows of codeword indexes (or None)
+    """
+    count = version * 4 + 17
+    total_codewords = sum(block.total_count for block in rs_blocks(version, qrcode.constants.ERROR_CORRECT_L))
+    owner = [[None] * count for _ in range(count)]
+    for bit, (row, col) in enumerate(data_module_order(version)[:total_codewords * 8]):
+        owner[row][col] = bit // 8
+    return tuple(tuple(row) for row in owner)
+
+
+@functools.lru_cache(maxsize=None)
+def _block_layout(version, error_correction):
+    """Block of every transmitted codeword after interleaving, plus per-block capacity."""
+    blocks = rs_blocks(version, error_correction)
+    owners = []
+    for i in range(max(block.data_count for block in blocks)):
+        owners.extend(b for b, block in enumerate(blocks) if i < block.data_count)
+    for i in range(max(block.total_count - block.data_count for block in blocks)):
+        owners.extend(b for b, block in enumerate(blocks) if i < block.total_count - block.data_count)
+
+    protection = _MISDECODE_PROTECTION.get((version, error_correction), 0)
+    capacities = [(block.total_count - block.data_count - protection) // 2 for block in blocks]
+    return tuple(owners), tuple(capacities)
+
+
+def obscured_modules(modules_count, width, height):
+    """
+    Modules touched by a centered rectangle.
+
+    Args:
+        modules_count (int): Symbol size in modules (without quiet zone)
+        width (float): Rectangle width in modules
+        height (float): Rectangle height in modules
+
+    Returns:
+        set: (row, col) pairs of every module the rectangle overlaps
+    """
+    if width <= 0 or height <= 0:
+        return set()
+    center = modules_count / 2
+    # Any overlap counts, and pixel rounding can shift the logo by a fraction
+    first_col = max(0, math.floor(center - width / 2))
+    last_col = min(modules_count - 1, math.ceil(center + width / 2) - 1)
+    first_row = max(0, math.floor(center - height / 2))
+    last_row = min(modules_count - 1, math.ceil(center + height / 2) - 1)
+    return {(r, c) for r in range(first_row, last_row + 1) for c in range(first_col, last_col + 1)}
+
+
+def check_decodability(version, error_correction, obscured, error_budget=1.0):
+    """
+    Check that a symbol survives the loss of the given modules.
+
+    Args:
+        version (int): Symbol version (1-40)
+        error_correction (int): qrcode.constants.ERROR_CORRECT_* level
+        obscured (iterable): (row, col) pairs of unreadable modules
+        error_budget (float): Share of each block's correction capacity the
+            obscured modules may use; the rest is left for print and camera
+            noise
+
+    Returns:
+        dict: {'decodable': bool, 'function_patterns_hit': int,
+               'alignment_modules_hit': int, 'damaged_codewords': int,
+               'worst_block_usage': float}
+
+    Covered finder, timing or format modules make the symbol unreadable.
+    A covered alignment pattern is only reported: decoders fall back to
+    the neighbouring ones.
+    """
+    roles = module_roles(version)
+    owner = codeword_map(version)
+    block_of, capacities = _block_layout(version, error_correction)
+
+    damaged = set()
+    function_hits = 0
+    alignment_hits = 0
+    for row, col in obscured:
+        role = roles[row][col]
+        if role == FUNCTION:
+            function_hits += 1
+        elif role == ALIGNMENT:
+            alignment_hits += 1
+        elif owner[row][col] is not None:
+            damaged.add(owner[row][col])
+
+    per_block = [0] * len(capacities)
+    for codeword in damaged:
+        per_block[block_of[codeword]] += 1
+
+    worst = 0.0
+    for hits, capacity in zip(per_block, capacities):
+        if hits:
+            worst = max(worst, hits / capacity if capacity > 0 else math.inf)
+
+    return {
+        'decodable': function_hits == 0 and worst <= error_budget,
+        'function_patterns_hit': function_hits,
+        'alignment_modules_hit': alignment_hits,
+        'damaged_codewords': len(damaged),
+        'worst_block_usage': worst,
+    }
@@ -3,31 +3,99 @@
 import qrcode
 from PIL import Image
 import io
+import copy
+import zipfile
 import datetime
+import threading
+from collections import OrderedDict
 from qrcode.image.styledpil import StyledPilImage
 from qrcode.image.styles.moduledrawers.pil import RoundedModuleDrawer, CircleModuleDrawer
-from qrcode.image.styles.colormasks import RadialGradiantColorMask, SquareGradiantColorMask
-from qrcode.image.svg import SvgImage
+from qrcode.image.styles.colormasks import SolidFillColorMask, RadialGradiantColorMask, SquareGradiantColorMask
+from qrcode import util
+
+from .metrics import metrics
+from .svg_renderer import QRSvgRenderer
+from .vector_export import QRVectorRenderer
+from .qr_decodability import check_decodability, obscured_modules
+from .color_contrast import ColorContrastValidator, MIN_SCANNABLE_CONTRAST, parse_color
+from .qr_reader import QRCodeReader
+from .qr_sequence import SequencePart, MAX_PARTS, HEADER_BITS, split_payload, make_symbol
+from .qr_segments import fit_segments, describe
 
 
 class QRCodeGenerator:
     """Handles QR code generation with various styling options."""
     
-    def __init__(self):
+    # PNG output profiles: zlib level, Pillow's optimize pass, and the largest
+    # number of distinct colors that is still re-encoded as a palette image
+    PNG_PROFILES = {
+        'fast': {'compress_level': 1, 'optimize': False, 'max_palette_colors': 2},
+        'balanced': {'compress_level': 6, 'optimize': False, 'max_palette_colors': 256},
+        'small': {'compress_level': 9, 'optimize': True, 'max_palette_colors': 256},
+    }
+    
+    # Supported export formats and their MIME types
+    EXPORT_FORMATS = {
+        'png': 'image/png',
+        'webp': 'image/webp',
+        'svg': 'image/svg+xml',
+        'pdf': 'application/pdf',
+        'eps': 'application/postscript',
+    }
+    VECTOR_FORMATS = ('svg', 'pdf', 'eps')
+    
+    ERROR_CORRECTION_LEVELS = {
+        'L': qrcode.constants.ERROR_CORRECT_L,
+        'M': qrcode.constants.ERROR_CORRECT_M,
+        'Q': qrcode.constants.ERROR_CORRECT_Q,
+        'H': qrcode.constants.ERROR_CORRECT_H,
+    }
+    
+    # Share of each error correction block a logo may use up in auto mode;
+    # the remainder is kept for print defects and camera noise
+    LOGO_ERROR_BUDGET = 0.75
+    
+    # Largest logo edge in pixels at the default box size
+    LOGO_SIZE = 50
+    
+    # Largest version of each code when a payload is split into a sequence;
+    # larger symbols render slowly and need a steady hand to scan
+    SEQUENCE_MAX_VERSION = 10
+    
+    def __init__(self, png_profile='balanced', error_correction='auto', matrix_cache_size=128,
+                 min_contrast=MIN_SCANNABLE_CONTRAST):
+        if png_profile not in self.PNG_PROFILES:
+            raise ValueError(f"Unknown PNG profile: {png_profile}. Choose from {', '.join(self.PNG_PROFILES)}")
+        if error_correction != 'auto' and error_correction not in self.ERROR_CORRECTION_LEVELS:
+            raise ValueError(f"Unknown error correction level: {error_correction}. "
+                             f"Choose from auto, {', '.join(self.ERROR_CORRECTION_LEVELS)}")
+        # Smallest version to consider; codes grow as needed to fit the data
         self.version = 1
-        self.error_correction = qrcode.constants.ERROR_CORRECT_L
+        # In auto mode the level is raised from L only when a logo needs it
+        self.auto_error_correction = error_correction == 'auto'
+        self.error_correction = self.ERROR_CORRECTION_LEVELS['L' if self.auto_error_correction else error_correction]
         self.box_size = 10
         self.border = 4
+        self.png_profile = png_profile
+        # Encoded symbols by payload, shared by previews and full renders
+        self.matrix_cache_size = matrix_cache_size
+        self._matrix_cache = OrderedDict()
+        self._matrix_lock = threading.Lock()
+        self.svg_renderer = QRSvgRenderer(box_size=self.box_size, border=self.border)
+        self.vector_renderer = QRVectorRenderer(box_size=self.box_size, border=self.border)
+        self.contrast_validator = ColorContrastValidator(min_contrast=min_contrast)
+        self.reader = QRCodeReader(border=self.border)
     
     def generate_qr_code(self, data, export_format='png', module_drawer='square', 
                         color_mask='solid', logo_image=None, foreground_color=None, 
-                        background_color=None, gradient_start=None, gradient_end=None):
+                        background_color=None, gradient_start=None, gradient_end=None,
+                        png_profile=None, verify=False):
         """
         Generate a QR code with the specified parameters.
         
         Args:
             data (str): The data to encode in the QR code
-            export_format (str): 'png' or 'svg'
+            export_format (str): 'png', 'webp', 'svg', 'pdf' or 'eps'
             module_drawer (str): 'square', 'rounded', or 'circle'
             color_mask (str): 'solid', 'radial', 'square', or 'custom'
             logo_image (PIL.Image): Optional logo to embed in the QR code
@@ -35,26 +103,491 @@ class QRCodeGenerator:
             background_color (str): Custom background color in hex format
             gradient_start (str): Gradient start color in hex format
             gradient_end (str): Gradient end color in hex format
+            png_profile (str): 'fast', 'balanced' or 'small'; defaults to the
+                generator's profile
+            verify (bool): Read the rendered code back and compare it with
+                ``data`` (vector formats are checked on a raster render of
+                the same style)
+            
+        Returns:
+            tuple: (BytesIO buffer, mimetype, filename), plus the report from
+                ``QRCodeReader.verify`` when ``verify`` is set
+        """
+        if export_format not in self.EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}. Choose from {', '.join(self.EXPORT_FORMATS)}")
+        
+        qr = self.module_matrix(data, logo_image)
+        drawer, mask, fill_color, back_color = self._select_style(
+            module_drawer, color_mask, foreground_color, background_color,
+            gradient_start, gradient_end
+        )
+        
+        buf = io.BytesIO()
+        image = None
+        if export_format in self.VECTOR_FORMATS:
+            # Vector output straight from the module matrix
+            code = self._vector_code(qr.modules, module_drawer, mask, fill_color, back_color, logo_image)
+            if export_format == 'svg':
+                with metrics.span('qr_svg_render'):
+                    buf.write(self.svg_renderer.render(**code).encode('utf-8'))
+            elif export_format == 'pdf':
+                with metrics.span('qr_pdf_render'):
+                    buf.write(self.vector_renderer.render_pdf([code]))
+            else:
+                with metrics.span('qr_eps_render'):
+                    buf.write(self.vector_renderer.render_eps(**code))
+        else:
+            image = self._render_image(qr, drawer, mask, logo_image)
+            if export_format == 'webp':
+                with metrics.span('qr_webp_compress'):
+                    image.save(buf, format='WEBP', lossless=True, quality=100, method=4)
+            else:
+                with metrics.span('qr_png_compress'):
+                    self._save_png(image, buf, png_profile or self.png_profile)
+        buf.seek(0)
+        
+        result = buf, self.EXPORT_FORMATS[export_format], self.output_filename(export_format)
+        if verify:
+            if image is None:
+                image = self._render_image(qr, drawer, mask, logo_image)
+            result += (self.reader.verify(image, self._payload_text(data), qr.modules),)
+        return result
+    
+    def verify_image(self, image, data, logo_image=None):
+        """
+        Check that a render of ``data`` by this generator decodes back to it.
+        
+        The module grid comes from the encoded symbol and the image size,
+        so previews and renders at any box size can be checked.
+        
+        Args:
+            image (PIL.Image): The rendered code
+            data (str): The payload it was rendered from
+            logo_image (PIL.Image): The logo it was rendered with, if any
+            
+        Returns:
+            dict: Report from ``QRCodeReader.verify``
+        """
+        qr = self.module_matrix(data, logo_image)
+        return self.reader.verify(image, self._payload_text(data), qr.modules)
+    
+    @staticmethod
+    def _payload_text(data):
+        return data.data if isinstance(data, SequencePart) else data
+    
+    def plan_sequence(self, data, max_version=None, logo_image=None):
+        """
+        Split a payload over as few structured append codes as needed to
+        keep every code at or below ``max_version``.
+        
+        Args:
+            data (str): The data to encode
+            max_version (int): Largest version per code (default:
+                SEQUENCE_MAX_VERSION)
+            logo_image (PIL.Image): Optional logo, which may raise the
+                error correction level and so the version
+            
+        Returns:
+            list: ``[data]`` when one code is small enough, otherwise
+                SequencePart tuples in reading order
+            
+        Raises:
+            ValueError: If even MAX_PARTS codes of that version are too small
+        """
+        max_version = max_version or self.SEQUENCE_MAX_VERSION
+        with metrics.span('qr_plan_sequence'):
+            try:
+                if self.plan_symbol(data, logo_image)['version'] <= max_version:
+                    return [data]
+            except qrcode.exceptions.DataOverflowError:
+                pass
+            size = len(util.to_bytestring(data))
+            for count in range(2, MAX_PARTS + 1):
+                if count > size:
+                    break
+                parts = split_payload(data, count)
+                try:
+                    if all(self.plan_symbol(part, logo_image)['version'] <= max_version for part in parts):
+                        return parts
+                except qrcode.exceptions.DataOverflowError:
+                    continue
+        raise ValueError(f"Payload too large for {MAX_PARTS} codes of version {max_version}")
+    
+    def generate_sequence(self, parts, export_format='png', **style):
+        """
+        Render a structured append sequence, bundled in one file.
+        
+        PDF output has one code per page; other formats are returned as a
+        ZIP archive of qr-01-of-03.png, ... Codes are rendered one after
+        another; ``QRRenderPool.write_sequence`` renders them in parallel.
+        
+        Args:
+            parts (list): Sequence from ``plan_sequence``
+            export_format (str): Format of the codes
+            **style: Styling options as for ``generate_qr_code``
             
         Returns:
             tuple: (BytesIO buffer, mimetype, filename)
         """
-        # Create QR code object
-        qr = qrcode.QRCode(
-            version=self.version,
-            error_correction=self.error_correction,
-            box_size=self.box_size,
-            border=self.border,
+        if export_format == 'pdf':
+            return self.generate_pdf_pages(parts, **style)
+        
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for index, part in enumerate(parts):
+                code, _, _ = self.generate_qr_code(part, export_format=export_format, **style)
+                archive.writestr(self.sequence_filename(index, len(parts), export_format), code.getvalue())
+        buf.seek(0)
+        return buf, 'application/zip', self.output_filename('zip')
+    
+    @staticmethod
+    def output_filename(export_format, timestamp=None):
+        """Download name of a render, e.g. 2024-05-01_12-00-00_qrcode.png (``timestamp`` defaults to now)."""
+        timestamp = (timestamp or datetime.datetime.now()).strftime("%Y-%m-%d_%H-%M-%S")
+        return f"{timestamp}_qrcode.{export_format}"
+    
+    @staticmethod
+    def sequence_filename(index, total, export_format):
+        """Name of a code in a sequence bundle, e.g. qr-01-of-03.png."""
+        return f"qr-{index + 1:02d}-of-{total:02d}.{export_format}"
+    
+    def check_contrast(self, data=None, module_drawer='square', color_mask='solid', logo_image=None,
+                       foreground_color=None, background_color=None, gradient_start=None,
+                       gradient_end=None):
+        """
+        Check that the colors of a code keep enough contrast to scan, before rendering it.
+        
+        Takes the same styling arguments as ``generate_qr_code``. Gradients
+        are sampled at the dark modules of the encoded payload (or over a
+        sample grid when no data is given); solid colors do not depend on
+        the payload, so it is only encoded for gradients.
+        
+        Returns:
+            dict: Contrast report (see ``ColorContrastValidator.validate``)
+            
+        Raises:
+            ValueError: If a color cannot be read
+            DataOverflowError: If a gradient is checked for data too large
+                for a QR code
+        """
+        _, mask, fill_color, back_color = self._select_style(
+            module_drawer, color_mask, foreground_color, background_color,
+            gradient_start, gradient_end
+        )
+        modules = self.module_matrix(data, logo_image).modules if data and self._is_gradient(mask) else None
+        code = self._vector_code(modules, module_drawer, mask, fill_color, back_color, logo_image)
+        with metrics.span('qr_contrast_check'):
+            return self.contrast_validator.validate(code['fill_color'], code['back_color'], code['gradient'],
+                                                    modules=modules, border=self.border)
+    
+    def render_preview(self, data, preview_format='svg', size=192, module_drawer='square',
+                       color_mask='solid', logo_image=None, foreground_color=None,
+                       background_color=None, gradient_start=None, gradient_end=None):
+        """
+        Render a quick, low-resolution preview from the cached module matrix.
+        
+        Args:
+            data (str): The data to encode in the QR code
+            preview_format (str): 'svg' (inline vector) or 'png'
+            size (int): Largest PNG edge in pixels
+            (other arguments as for ``generate_qr_code``)
+            
+        Returns:
+            tuple: (bytes, mimetype)
+        """
+        if preview_format not in ('svg', 'png'):
+            raise ValueError(f"Unsupported preview format: {preview_format}. Choose from svg, png")
+        
+        qr = self.module_matrix(data, logo_image)
+        drawer, mask, fill_color, back_color = self._select_style(
+            module_drawer, color_mask, foreground_color, background_color,
+            gradient_start, gradient_end
         )
-        qr.add_data(data)
-        qr.make(fit=True)
         
-        # Select image factory
-        if export_format == 'svg':
-            image_factory = SvgImage
+        with metrics.span('qr_preview_render'):
+            if preview_format == 'svg':
+                code = self._vector_code(qr.modules, module_drawer, mask, fill_color, back_color, logo_image)
+                return self.svg_renderer.render(**code).encode('utf-8'), self.EXPORT_FORMATS['svg']
+            
+            # Shallow copy: the cached symbol is shared, only the box size differs
+            preview = copy.copy(qr)
+            preview.box_size = max(1, size // (qr.modules_count + 2 * self.border))
+            image = self._render_image(preview, drawer, mask, logo_image)
+            buf = io.BytesIO()
+            image.save(buf, format='PNG', compress_level=1)
+            return buf.getvalue(), self.EXPORT_FORMATS['png']
+    
+    def generate_pdf_pages(self, data_list, module_drawer='square', color_mask='solid',
+                           logo_image=None, foreground_color=None, background_color=None,
+                           gradient_start=None, gradient_end=None):
+        """
+        Generate a multi-page vector PDF with one QR code per page.
+        
+        Args:
+            data_list (list): Payloads to encode, one per page
+            (other arguments as for ``generate_qr_code``)
+            
+        Returns:
+            tuple: (BytesIO buffer, mimetype, filename)
+        """
+        if not data_list:
+            raise ValueError("At least one payload is required for a PDF")
+        
+        style = dict(module_drawer=module_drawer, color_mask=color_mask, logo_image=logo_image,
+                     foreground_color=foreground_color, background_color=background_color,
+                     gradient_start=gradient_start, gradient_end=gradient_end)
+        codes = (self.vector_code(data, **style) for data in data_list)
+        
+        with metrics.span('qr_pdf_render'):
+            buf = io.BytesIO(self.vector_renderer.render_pdf(codes))
+        
+        return buf, self.EXPORT_FORMATS['pdf'], self.output_filename('pdf')
+    
+    def render_image(self, data, max_size=None, module_drawer='square', color_mask='solid',
+                     logo_image=None, foreground_color=None, background_color=None,
+                     gradient_start=None, gradient_end=None):
+        """
+        Render a styled QR code as a PIL image without encoding it to a file.
+        
+        Args:
+            data (str): The data to encode in the QR code
+            max_size (int): Largest edge in pixels; the box size is chosen so
+                the code fits (defaults to the generator's box size)
+            (other arguments as for ``generate_qr_code``)
+            
+        Returns:
+            PIL.Image: The rendered code
+        """
+        qr = self._make_qr(data, logo_image)
+        if max_size:
+            qr.box_size = max(1, max_size // (qr.modules_count + 2 * self.border))
+        drawer, mask, fill_color, back_color = self._select_style(
+            module_drawer, color_mask, foreground_color, background_color,
+            gradient_start, gradient_end
+        )
+        return self._render_image(qr, drawer, mask, logo_image)
+    
+    def _render_image(self, qr, drawer, mask, logo_image):
+        """Draw the styled raster image for an encoded QRCode."""
+        # Only pass drawer and mask if they are not None
+        kwargs = {'image_factory': StyledPilImage}
+        if drawer is not None:
+            kwargs['module_drawer'] = drawer
+        if mask is not None:
+            kwargs['color_mask'] = mask
+        
+        with metrics.span('qr_style'):
+            qr_img = qr.make_image(**kwargs)
+        
+        # Add logo if provided (LOGO_SIZE pixels at the default box size)
+        if logo_image:
+            with metrics.span('qr_logo'):
+                logo_size = max(1, self.LOGO_SIZE * qr.box_size // self.box_size)
+                logo = logo_image.copy()
+                logo.thumbnail((logo_size, logo_size))
+                pos = ((qr_img.size[0] - logo.size[0]) // 2, 
+                       (qr_img.size[1] - logo.size[1]) // 2)
+                qr_img.paste(logo, pos)
+        
+        return qr_img.get_image()
+    
+    def plan_symbol(self, data, logo_image=None):
+        """
+        Choose the version and error correction level for a payload.
+        
+        In auto mode the lowest level (and, failing that, the smallest
+        larger version at level H) whose symbol survives the area covered
+        by the logo is chosen. With a fixed level the smallest version that
+        fits is used and the decodability report says whether the logo is
+        likely to break the code.
+        
+        Args:
+            data (str): The data to encode
+            logo_image (PIL.Image): Optional logo pasted over the center
+            
+        Returns:
+            dict: {'version': int, 'error_correction': 'L' | 'M' | 'Q' | 'H',
+                   'decodability': report from ``check_decodability``}
+        """
+        with metrics.span('qr_plan'):
+            levels = ('L', 'M', 'Q', 'H') if self.auto_error_correction else (self._level_name(),)
+            logo_extent = self._logo_extent(logo_image)
+            
+            for level in levels:
+                version = self._fit_version(data, level)
+                report = self._check_logo(version, level, logo_extent)
+                if report['decodable'] or not self.auto_error_correction:
+                    return {'version': version, 'error_correction': level, 'decodability': report}
+            
+            # Even level H cannot absorb the logo: a larger symbol shrinks its share
+            while version < 40:
+                version += 1
+                report = self._check_logo(version, 'H', logo_extent)
+                if report['decodable']:
+                    break
+            return {'version': version, 'error_correction': 'H', 'decodability': report}
+    
+    def _level_name(self):
+        for name, level in self.ERROR_CORRECTION_LEVELS.items():
+            if level == self.error_correction:
+                return name
+    
+    def _fit_version(self, data, level):
+        """Smallest version holding the payload at the given level (no mask evaluation)."""
+        return self._fit(data, self.ERROR_CORRECTION_LEVELS[level])[0]
+    
+    def _fit(self, data, error_correction, start=None):
+        """Smallest version and optimal mode segments for a payload or sequence part."""
+        if isinstance(data, SequencePart):
+            return fit_segments(data.data, error_correction, start or self.version, header_bits=HEADER_BITS)
+        return fit_segments(data, error_correction, start or self.version)
+    
+    def plan_segments(self, data, logo_image=None):
+        """
+        Mode segments chosen for a payload, and the modules they save.
+        
+        Runs of digits and of uppercase alphanumeric characters are encoded
+        in numeric or alphanumeric mode wherever that takes fewer bits than
+        bytes, including the cost of the extra segment headers. The saving
+        is measured against qrcode's own split, which only gives runs of 20
+        or more characters their own segment.
+        
+        Args:
+            data (str): The data to encode
+            logo_image (PIL.Image): Optional logo, as it affects the level
+            
+        Returns:
+            dict: {'version': int, 'error_correction': str, 'segments':
+                   [{'mode', 'length'}], 'modules': int, 'baseline_version':
+                   int or None (too large without optimization),
+                   'modules_saved': int}
+        """
+        plan = self.plan_symbol(data, logo_image)
+        level = self.ERROR_CORRECTION_LEVELS[plan['error_correction']]
+        version, segments = self._fit(data, level, start=plan['version'])
+        
+        baseline = qrcode.QRCode(version=self.version, error_correction=level)
+        baseline.add_data(data)
+        try:
+            baseline_version = max(baseline.best_fit(start=self.version), version)
+        except qrcode.exceptions.DataOverflowError:
+            baseline_version = None
+        modules = (version * 4 + 17) ** 2
+        baseline_modules = (baseline_version * 4 + 17) ** 2 if baseline_version else (40 * 4 + 17) ** 2
+        return {
+            'version': version,
+            'error_correction': plan['error_correction'],
+            'segments': describe(segments),
+            'modules': modules,
+            'baseline_version': baseline_version,
+            'modules_saved': baseline_modules - modules,
+        }
+    
+    def _logo_extent(self, logo_image):
+        """Logo width and height in modules, as it is placed by the renderers."""
+        if logo_image is None:
+            return 0, 0
+        width, height = logo_image.size
+        scale = min(1, self.LOGO_SIZE / max(width, height))
+        return width * scale / self.box_size, height * scale / self.box_size
+    
+    def _check_logo(self, version, level, logo_extent):
+        obscured = obscured_modules(version * 4 + 17, *logo_extent)
+        return check_decodability(version, self.ERROR_CORRECTION_LEVELS[level], obscured,
+                                  error_budget=self.LOGO_ERROR_BUDGET)
+    
+    def vector_code(self, data, module_drawer='square', color_mask='solid', logo_image=None,
+                    foreground_color=None, background_color=None, gradient_start=None,
+                    gradient_end=None):
+        """
+        Encode a payload and resolve its style for the vector renderers.
+        
+        The payload is encoded afresh rather than through the module matrix
+        cache, so batch callers (multi-page PDFs, label sheets) do not evict
+        interactive previews; they keep their own cache of the results.
+        
+        Args:
+            data (str): The data to encode
+            (other arguments as for ``generate_qr_code``)
+            
+        Returns:
+            dict: Keyword arguments for ``VectorExporter`` / ``SVGRenderer``
+                (modules, module_drawer, fill_color, back_color, gradient,
+                logo_image)
+        """
+        _, mask, fill_color, back_color = self._select_style(
+            module_drawer, color_mask, foreground_color, background_color,
+            gradient_start, gradient_end
+        )
+        qr = self._make_qr(data, logo_image)
+        return self._vector_code(qr.modules, module_drawer, mask, fill_color, back_color, logo_image)
+    
+    def module_matrix(self, data, logo_image=None):
+        """
+        Encoded symbol for a payload, from a small LRU cache.
+        
+        The symbol only depends on the payload and the logo size (which
+        drives automatic error correction), so styling changes and repeated
+        renders of the same payload skip encoding. Callers must not modify
+        the returned object.
+        
+        Returns:
+            qrcode.QRCode: Symbol with its module matrix built
+        """
+        key = (data, logo_image.size if logo_image is not None else None)
+        with self._matrix_lock:
+            qr = self._matrix_cache.get(key)
+            if qr is not None:
+                self._matrix_cache.move_to_end(key)
+        if qr is not None:
+            metrics.cache_hit('qr_matrix')
+            return qr
+        
+        metrics.cache_miss('qr_matrix')
+        qr = self._make_qr(data, logo_image)
+        with self._matrix_lock:
+            self._matrix_cache[key] = qr
+            while len(self._matrix_cache) > self.matrix_cache_size:
+                self._matrix_cache.popitem(last=False)
+        return qr
+    
+    def _make_qr(self, data, logo_image=None):
+        """Encode the payload into a QRCode object with its module matrix built."""
+        if self.auto_error_correction and logo_image is not None:
+            plan = self.plan_symbol(data, logo_image)
+            version = plan['version']
+            error_correction = self.ERROR_CORRECTION_LEVELS[plan['error_correction']]
         else:
-            image_factory = StyledPilImage
+            version = self.version
+            error_correction = self.error_correction
+        
+        with metrics.span('qr_encode'):
+            version, segments = self._fit(data, error_correction, start=version)
+            if isinstance(data, SequencePart):
+                return make_symbol(data, segments, version, error_correction, self.box_size, self.border)
+            
+            qr = qrcode.QRCode(
+                version=version,
+                error_correction=error_correction,
+                box_size=self.box_size,
+                border=self.border,
+            )
+            for segment in segments:
+                qr.add_data(segment)
+            qr.make(fit=False)
+        return qr
+    
+    def _select_style(self, module_drawer, color_mask, foreground_color=None,
+                      background_color=None, gradient_start=None, gradient_end=None):
+        """
+        Resolve styling options into qrcode drawer/mask objects.
         
+        Returns:
+            tuple: (module drawer or None, color mask or None, fill color, back color)
+            
+        Raises:
+            ValueError: If a custom color cannot be read
+        """
         # Select module drawer
         drawer = None
         if module_drawer == 'rounded':
@@ -87,58 +620,92 @@ class QRCodeGenerator:
                     edge_color=edge_rgb,
                     center_color=center_rgb
                 )
+            else:
+                # StyledPilImage ignores fill_color/back_color, so solid
+                # custom colors are drawn through a mask as well
+                mask = SolidFillColorMask(
+                    back_color=parse_color(back_color),
+                    front_color=parse_color(fill_color)
+                )
         elif color_mask == 'radial':
             mask = RadialGradiantColorMask()
         elif color_mask == 'square':
             mask = SquareGradiantColorMask()
         
-        # Create QR code image
-        if export_format == 'svg':
-            # SVG format has limited styling support
-            # Try to apply styling if supported, fallback to basic SVG
-            try:
-                kwargs = {'image_factory': image_factory}
-                # SVG format doesn't support all styling options
-                # We can still try basic generation with some options
-                qr_img = qr.make_image(**kwargs)
-            except Exception:
-                # Fallback to basic SVG generation
-                qr_img = qr.make_image(image_factory=image_factory)
-        else:
-            # Only pass drawer and mask if they are not None
-            kwargs = {'image_factory': image_factory}
-            if drawer is not None:
-                kwargs['module_drawer'] = drawer
-            if mask is not None:
-                kwargs['color_mask'] = mask
-            
-            # Add custom colors if using custom color mode without gradient
-            if color_mask == 'custom' and not mask:
-                kwargs['fill_color'] = fill_color
-                kwargs['back_color'] = back_color
-            
-            qr_img = qr.make_image(**kwargs)
-            
-            # Add logo if provided
-            if logo_image:
-                logo_size = 50
-                logo_image.thumbnail((logo_size, logo_size))
-                pos = ((qr_img.size[0] - logo_image.size[0]) // 2, 
-                       (qr_img.size[1] - logo_image.size[1]) // 2)
-                qr_img.paste(logo_image, pos)
+        return drawer, mask, fill_color, back_color
+    
+    @staticmethod
+    def _is_gradient(mask):
+        """Whether a resolved color mask varies over the code."""
+        return isinstance(mask, (RadialGradiantColorMask, SquareGradiantColorMask))
+    
+    @classmethod
+    def _vector_code(cls, modules, module_drawer, mask, fill_color, back_color, logo_image):
+        """Translate the resolved style into keyword arguments for the vector renderers."""
+        gradient = None
+        if cls._is_gradient(mask):
+            gradient = {
+                'type': 'square' if isinstance(mask, SquareGradiantColorMask) else 'radial',
+                'center_color': mask.center_color,
+                'edge_color': mask.edge_color
+            }
+            back_color = mask.back_color
+        return {
+            'modules': modules,
+            'module_drawer': module_drawer,
+            'fill_color': fill_color,
+            'back_color': back_color,
+            'gradient': gradient,
+            'logo_image': logo_image
+        }
+    
+    def _save_png(self, img, buf, profile_name):
+        """
+        Encode an image as PNG using the given output profile.
         
-        # Save to buffer
-        buf = io.BytesIO()
-        if export_format == 'svg':
-            qr_img.save(buf)
-            mimetype = 'image/svg+xml'
-        else:
-            qr_img.save(buf, format='PNG')
-            mimetype = 'image/png'
-        buf.seek(0)
+        Images with few distinct colors are losslessly converted to 1-bit or
+        palette mode before compression, which shrinks two-color codes to a
+        fraction of their RGB size.
+        
+        Args:
+            img (PIL.Image): Rendered QR code image
+            buf (BytesIO): Output buffer
+            profile_name (str): Key into PNG_PROFILES
+        """
+        if profile_name not in self.PNG_PROFILES:
+            raise ValueError(f"Unknown PNG profile: {profile_name}. Choose from {', '.join(self.PNG_PROFILES)}")
+        profile = self.PNG_PROFILES[profile_name]
+        
+        img = self._reduce_colors(img, profile['max_palette_colors'])
+        img.save(buf, format='PNG',
+                 compress_level=profile['compress_level'],
+                 optimize=profile['optimize'])
+    
+    @staticmethod
+    def _reduce_colors(img, max_colors):
+        """
+        Losslessly convert an image to the smallest PNG color mode.
+        
+        Returns:
+            PIL.Image: A mode '1' image for pure black/white renders, a
+            palette image for up to ``max_colors`` colors, or the original
+        """
+        if img.mode not in ('RGB', 'L'):
+            return img
+        
+        colors = img.getcolors(max_colors)
+        if colors is None:
+            return img
         
-        # Generate filename
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = f"{timestamp}_qrcode.{export_format}"
+        rgb_colors = sorted(color if img.mode == 'RGB' else (color,) * 3 for _, color in colors)
+        if rgb_colors in ([(0, 0, 0), (255, 255, 255)], [(0, 0, 0)], [(255, 255, 255)]):
+            return img.convert('1', dither=Image.Dither.NONE)
         
-        return buf, mimetype, filename
\ No newline at end of file
+        # Median cut with one box per distinct color is exact; fall back to
+        # the original if the palette ever differs from the source colors
+        reduced = img.convert('RGB').quantize(colors=len(rgb_colors), method=Image.Quantize.MEDIANCUT,
+                                              dither=Image.Dither.NONE)
+        flat = reduced.getpalette()[:3 * len(rgb_colors)]
+        if sorted(zip(flat[0::3], flat[1::3], flat[2::3])) != rgb_colors:
+            return img
+        return reduced
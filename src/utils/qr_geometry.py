@@ -0,0 +1,138 @@
+"""Shared vector geometry for QR module matrices.
+
+All coordinates are in module units relative to the top-left module,
+with y growing downwards; renderers add the quiet-zone offset and scale.
+"""
+
+# Cubic Bezier control distance for a quarter circle of radius 1
+KAPPA = 0.5522847498
+
+
+def dark_runs(row):
+    """Yield (start, end) column spans of consecutive dark modules (end exclusive)."""
+    start = None
+    for x, dark in enumerate(row):
+        if dark and start is None:
+            start = x
+        elif not dark and start is not None:
+            yield start, x
+            start = None
+    if start is not None:
+        yield start, len(row)
+
+
+def merged_rectangles(modules):
+    """
+    Cover the dark modules with non-overlapping rectangles.
+
+    Horizontal runs are extended downwards while the row below has the
+    exact same run, which merges finder patterns and vertical bars.
+
+    Returns:
+        list: (x, y, width, height) tuples
+    """
+    rects = []
+    open_rects = {}
+    for y, row in enumerate(modules):
+        runs = set(dark_runs(row))
+        for span in list(open_rects):
+            if span not in runs:
+                top = open_rects.pop(span)
+                rects.append((span[0], top, span[1] - span[0], y - top))
+        for span in runs:
+            open_rects.setdefault(span, y)
+    for span, top in open_rects.items():
+        rects.append((span[0], top, span[1] - span[0], len(modules) - top))
+    return rects
+
+
+def rounded_runs(modules, radius=0.5):
+    """
+    Horizontal runs with the corner rounding of qrcode's RoundedModuleDrawer.
+
+    A corner is rounded when both of its orthogonal neighbours are light;
+    inside a horizontal run only the end modules can qualify.
+
+    Returns:
+        list: (x, y, width, (nw, ne, se, sw)) tuples with per-corner radii
+    """
+    count = len(modules)
+
+    def dark(x, y):
+        return 0 <= y < count and 0 <= x < count and modules[y][x]
+
+    runs = []
+    for y, row in enumerate(modules):
+        for x0, x1 in dark_runs(row):
+            last = x1 - 1
+            corners = (
+                0 if dark(x0, y - 1) else radius,
+                0 if dark(last, y - 1) else radius,
+                0 if dark(last, y + 1) else radius,
+                0 if dark(x0, y + 1) else radius,
+            )
+            runs.append((x0, y, x1 - x0, corners))
+    return runs
+
+
+def dark_modules(modules):
+    """Yield (x, y) for every dark module."""
+    for y, row in enumerate(modules):
+        for x, is_dark in enumerate(row):
+            if is_dark:
+                yield x, y
+
+
+def rounded_run_outline(x, y, width, corners):
+    """
+    Outline of a rounded run as absolute move/line/curve operations.
+
+    Quarter arcs are approximated with cubic Beziers so the result can be
+    emitted by formats without an arc primitive (PDF, PostScript).
+
+    Returns:
+        list: ('M', x, y), ('L', x, y) and ('C', x1, y1, x2, y2, x, y) tuples
+    """
+    nw, ne, se, sw = corners
+    right = x + width
+    bottom = y + 1
+    ops = [('M', x + nw, y), ('L', right - ne, y)]
+    if ne:
+        k = ne * KAPPA
+        ops.append(('C', right - ne + k, y, right, y + ne - k, right, y + ne))
+    ops.append(('L', right, bottom - se))
+    if se:
+        k = se * KAPPA
+        ops.append(('C', right, bottom - se + k, right - se + k, bottom, right - se, bottom))
+    ops.append(('L', x + sw, bottom))
+    if sw:
+        k = sw * KAPPA
+        ops.append(('C', x + sw - k, bottom, x, bottom - sw + k, x, bottom - sw))
+    ops.append(('L', x, y + nw))
+    if nw:
+        k = nw * KAPPA
+        ops.append(('C', x, y + nw - k, x + nw - k, y, x + nw, y))
+
+    # Drop zero-length edges (e.g. between two rounded corners of one module)
+    outline = [ops[0]]
+    for op in ops[1:]:
+        if op[0] == 'L' and op[1:] == outline[-1][-2:]:
+            continue
+        outline.append(op)
+    if outline[-1][0] == 'L' and outline[-1][1:] == ops[0][1:]:
+        # Closing the path draws the final edge back to the start
+        outline.pop()
+    return outline
+
+
+def circle_outline(x, y, radius=0.5):
+    """Outline of the circle inscribed in module (x, y) as four Bezier arcs."""
+    cx, cy = x + 0.5, y + 0.5
+    k = radius * KAPPA
+    return [
+        ('M', cx + radius, cy),
+        ('C', cx + radius, cy + k, cx + k, cy + radius, cx, cy + radius),
+        ('C', cx - k, cy + radius, cx - radius, cy + k, cx - radius, cy),
+        ('C', cx - radius, cy - k, cx - k, cy - radius, cx, cy - radius),
+        ('C', cx + k, cy - radius, cx + radius, cy - k, cx + radius, cy),
+    ]
@@ -0,0 +1,513 @@
+"""Read rendered QR codes back, to verify that a styled code still decodes.
+
+The reader is not a camera scanner: it expects a straight, unrotated
+render with a quiet zone, as this tool writes them, and samples the
+image on the module grid. The grid is known from the symbol when
+verifying a fresh render, or located from the dark-pixel bounding box
+and the quiet zone for image files. The sampled matrix is then decoded
+like a scanner would (format information, unmasking, deinterleaving,
+Reed-Solomon correction, segment parsing), and the errors corrected per
+block give the margin left before the code stops decoding.
+"""
+
+import functools
+
+import numpy as np
+import qrcode
+from PIL import Image
+from qrcode import util
+from qrcode.base import rs_blocks
+
+from .metrics import metrics
+from .qr_decodability import data_module_order, _block_layout
+
+
+# GF(256) with the QR code polynomial x^8 + x^4 + x^3 + x^2 + 1
+_EXP = np.zeros(512, dtype=np.int64)
+_LOG = np.zeros(256, dtype=np.int64)
+_value = 1
+for _i in range(255):
+    _EXP[_i] = _value
+    _LOG[_value] = _i
+    _value <<= 1
+    if _value & 0x100:
+        _value ^= 0x11d
+_EXP[255:510] = _EXP[:255]
+
+LEVEL_NAMES = {
+    qrcode.constants.ERROR_CORRECT_L: 'L',
+    qrcode.constants.ERROR_CORRECT_M: 'M',
+    qrcode.constants.ERROR_CORRECT_Q: 'Q',
+    qrcode.constants.ERROR_CORRECT_H: 'H',
+}
+
+# Mode indicators that carry no character data
+_MODE_ECI = 7
+_MODE_STRUCTURED_APPEND = 3
+
+
+def _mul(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return int(_EXP[_LOG[a] + _LOG[b]])
+
+
+def _div(a, b):
+    if a == 0:
+        return 0
+    return int(_EXP[(_LOG[a] - _LOG[b]) % 255])
+
+
+def _poly_eval(coefficients, x):
+    """Value at ``x`` of a polynomial given lowest degree first."""
+    result = 0
+    for coefficient in reversed(coefficients):
+        result = _mul(result, x) ^ coefficient
+    return result
+
+
+def _berlekamp_massey(syndromes):
+    """Error locator polynomial (lowest degree first) for the syndromes."""
+    locator = [1]
+    previous = [1]
+    errors = 0
+    shift = 1
+    last_discrepancy = 1
+    for n, syndrome in enumerate(syndromes):
+        discrepancy = syndrome
+        for i in range(1, errors + 1):
+            discrepancy ^= _mul(locator[i], syndromes[n - i])
+        if discrepancy == 0:
+            shift += 1
+            continue
+        scale = _div(discrepancy, last_discrepancy)
+        updated = locator + [0] * max(0, len(previous) + shift - len(locator))
+        for i, coefficient in enumerate(previous):
+            updated[i + shift] ^= _mul(scale, coefficient)
+        if 2 * errors <= n:
+            previous = locator
+            errors = n + 1 - errors
+            last_discrepancy = discrepancy
+            shift = 1
+        else:
+            shift += 1
+        locator = updated
+    return locator[:errors + 1]
+
+
+def rs_correct(block, ecc_count):
+    """
+    Correct a Reed-Solomon block in place.
+
+    Syndromes and the root search are evaluated with NumPy over the whole
+    block; the locator and error values use plain GF(256) arithmetic,
+    which only runs when the block has errors.
+
+    Args:
+        block (ndarray): Data and error correction codewords (ints)
+        ecc_count (int): Error correction codewords at the end of the block
+
+    Returns:
+        int: Number of corrected codewords
+
+    Raises:
+        ValueError: If the block has more errors than it can correct
+    """
+    n = len(block)
+    degrees = np.arange(n - 1, -1, -1)
+
+    def syndromes():
+        nonzero = block != 0
+        exponents = (_LOG[block][None, :] + np.arange(ecc_count)[:, None] * degrees[None, :]) % 255
+        return np.bitwise_xor.reduce(np.where(nonzero[None, :], _EXP[exponents], 0), axis=1)
+
+    values = syndromes()
+    if not values.any():
+        return 0
+    values = [int(value) for value in values]
+    locator = _berlekamp_massey(values)
+    errors = len(locator) - 1
+    if errors == 0 or 2 * errors > ecc_count:
+        raise ValueError("Too many errors to correct")
+
+    # Chien search: an error at degree p makes the locator vanish at alpha^-p
+    exponents = (-np.outer(np.arange(n), np.arange(errors + 1))) % 255
+    terms = np.where(np.array(locator)[None, :] != 0,
+                     _EXP[(exponents + _LOG[np.array(locator)][None, :]) % 255], 0)
+    positions = np.flatnonzero(np.bitwise_xor.reduce(terms, axis=1) == 0)
+    if len(positions) != errors:
+        raise ValueError("Too many errors to correct")
+
+    # Forney: e = X * omega(X^-1) / locator'(X^-1) for roots starting at alpha^0
+    evaluator = [0] * ecc_count
+    for i, syndrome in enumerate(values):
+        for j, coefficient in enumerate(locator):
+            if i + j < ecc_count:
+                evaluator[i + j] ^= _mul(syndrome, coefficient)
+    derivative = [coefficient if i % 2 else 0 for i, coefficient in enumerate(locator)][1:]
+    for degree in positions:
+        x = int(_EXP[degree])
+        x_inverse = int(_EXP[(255 - degree) % 255])
+        magnitude = _div(_mul(x, _poly_eval(evaluator, x_inverse)), _poly_eval(derivative, x_inverse))
+        block[n - 1 - degree] ^= magnitude
+
+    if syndromes().any():
+        raise ValueError("Too many errors to correct")
+    return errors
+
+
+@functools.lru_cache(maxsize=None)
+def _format_positions(count):
+    """(row, col) of the 15 format bits, bit 0 first, for both copies."""
+    first = [(i if i < 6 else i + 1 if i < 8 else count - 15 + i, 8) for i in range(15)]
+    second = [(8, count - i - 1 if i < 8 else 15 - i if i < 9 else 15 - i - 1) for i in range(15)]
+    return np.array(first).T, np.array(second).T
+
+
+@functools.lru_cache(maxsize=None)
+def _format_codes():
+    """Format bit patterns of all 32 level/mask combinations."""
+    return np.array([util.BCH_type_info(value) for value in range(32)])
+
+
+@functools.lru_cache(maxsize=None)
+def _mask(count, pattern):
+    """Boolean mask pattern over a symbol."""
+    mask_func = util.mask_func(pattern)
+    return np.array([[bool(mask_func(r, c)) for c in range(count)] for r in range(count)])
+
+
+@functools.lru_cache(maxsize=None)
+def _data_indexes(version):
+    """Row and column index arrays of the data modules, in placement order."""
+    order = np.array(data_module_order(version))
+    return order[:, 0], order[:, 1]
+
+
+@functools.lru_cache(maxsize=None)
+def _block_indexes(version, error_correction):
+    """Stream positions of each block's codewords (data first), and its error correction count."""
+    blocks = rs_blocks(version, error_correction)
+    positions = [[] for _ in blocks]
+    index = 0
+    for i in range(max(block.data_count for block in blocks)):
+        for b, block in enumerate(blocks):
+            if i < block.data_count:
+                positions[b].append(index)
+                index += 1
+    for i in range(max(block.total_count - block.data_count for block in blocks)):
+        for b, block in enumerate(blocks):
+            if i < block.total_count - block.data_count:
+                positions[b].append(index)
+                index += 1
+    return tuple((np.array(p), block.data_count, block.total_count - block.data_count)
+                 for p, block in zip(positions, blocks))
+
+
+class _BitReader:
+    def __init__(self, data):
+        self.bits = np.unpackbits(np.asarray(data, dtype=np.uint8))
+        self.position = 0
+
+    def remaining(self):
+        return len(self.bits) - self.position
+
+    def read(self, count):
+        if count > self.remaining():
+            raise ValueError("Segment runs past the end of the data")
+        value = 0
+        for bit in self.bits[self.position:self.position + count]:
+            value = (value << 1) | int(bit)
+        self.position += count
+        return value
+
+    def read_bytes(self, count):
+        if count * 8 > self.remaining():
+            raise ValueError("Segment runs past the end of the data")
+        value = np.packbits(self.bits[self.position:self.position + count * 8]).tobytes()
+        self.position += count * 8
+        return value
+
+
+def parse_segments(data, version):
+    """
+    Decode the segments of the corrected data codewords.
+
+    Returns:
+        dict: ``payload`` (bytes), ``segments`` ([{'mode', 'length'}]) and
+            ``structured_append`` ({'index', 'total', 'parity'} or None)
+
+    Raises:
+        ValueError: If a segment is malformed
+    """
+    reader = _BitReader(data)
+    payload = bytearray()
+    segments = []
+    structured_append = None
+    while reader.remaining() >= 4:
+        mode = reader.read(4)
+        if mode == 0:
+            break
+        if mode == _MODE_STRUCTURED_APPEND:
+            index, total, parity = reader.read(4), reader.read(4), reader.read(8)
+            structured_append = {'index': index, 'total': total + 1, 'parity': parity}
+            continue
+        if mode == _MODE_ECI:
+            reader.read(8)
+            continue
+        if mode not in (util.MODE_NUMBER, util.MODE_ALPHA_NUM, util.MODE_8BIT_BYTE, util.MODE_KANJI):
+            raise ValueError(f"Unknown segment mode {mode}")
+        length = reader.read(util.length_in_bits(mode, version))
+        if mode == util.MODE_NUMBER:
+            digits = ''
+            for start in range(0, length, 3):
+                size = min(3, length - start)
+                digits += str(reader.read((4, 7, 10)[size - 1])).zfill(size)
+            payload += digits.encode('ascii')
+        elif mode == util.MODE_ALPHA_NUM:
+            for start in range(0, length, 2):
+                if length - start >= 2:
+                    pair = reader.read(11)
+                    payload += bytes([util.ALPHA_NUM[pair // 45], util.ALPHA_NUM[pair % 45]])
+                else:
+                    payload.append(util.ALPHA_NUM[reader.read(6)])
+        elif mode == util.MODE_8BIT_BYTE:
+            payload += reader.read_bytes(length)
+        else:
+            text = ''
+            for _ in range(length):
+                value = reader.read(13)
+                value = (value // 0xC0) << 8 | value % 0xC0
+                value += 0x8140 if value < 0x1F00 else 0xC140
+                text += value.to_bytes(2, 'big').decode('shift_jis')
+            payload += text.encode('utf-8')
+        segments.append({'mode': {1: 'numeric', 2: 'alphanumeric', 4: 'byte', 8: 'kanji'}[mode],
+                         'length': length})
+    return {'payload': bytes(payload), 'segments': segments, 'structured_append': structured_append}
+
+
+class QRCodeReader:
+    """
+    Decodes QR code renders by sampling them on the module grid.
+
+    Args:
+        border (int): Quiet zone in modules of the images to read
+    """
+
+    def __init__(self, border=4):
+        self.border = border
+
+    @staticmethod
+    def _luminance(image):
+        """Grayscale pixels as a uint8 array, with transparency flattened onto white."""
+        if image.mode in ('RGBA', 'LA', 'PA') or (image.mode == 'P' and 'transparency' in image.info):
+            image = image.convert('RGBA')
+            background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+            image = Image.alpha_composite(background, image)
+        return np.asarray(image.convert('L'))
+
+    @staticmethod
+    def threshold(values):
+        """Otsu threshold of uint8 values: dark is below it."""
+        histogram = np.bincount(np.asarray(values, dtype=np.uint8).ravel(), minlength=256).astype(float)
+        weights = np.cumsum(histogram)
+        sums = np.cumsum(histogram * np.arange(256))
+        total, total_sum = weights[-1], sums[-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dark_mean = sums / weights
+            light_mean = (total_sum - sums) / (total - weights)
+            spread = weights * (total - weights) * (dark_mean - light_mean) ** 2
+        spread = np.nan_to_num(spread)
+        if not spread.any():
+            return 128
+        return int(np.argmax(spread)) + 1
+
+    def locate(self, image):
+        """
+        Module grid of a render whose quiet zone is ``border`` modules.
+
+        Returns:
+            tuple: (modules per side, module size in pixels, left, top)
+
+        Raises:
+            ValueError: If the image holds no code
+        """
+        if self.border <= 0:
+            raise ValueError("A quiet zone is needed to locate the module grid")
+        luminance = self._luminance(image)
+        dark = luminance < self.threshold(luminance)
+        rows = np.flatnonzero(dark.any(axis=1))
+        cols = np.flatnonzero(dark.any(axis=0))
+        if len(rows) == 0:
+            raise ValueError("No dark modules found")
+        width = cols[-1] - cols[0] + 1
+        height = rows[-1] - rows[0] + 1
+        extent = (width + height) / 2
+        # The quiet zone gives the module size; versions only come in steps of 4 modules
+        module = (luminance.shape[1] - width + luminance.shape[0] - height) / (4 * self.border)
+        count = extent / module
+        version = min(40, max(1, round((count - 17) / 4)))
+        count = version * 4 + 17
+        return count, extent / count, cols[0], rows[0]
+
+    def sample(self, image, count=None, module=None, left=None, top=None):
+        """
+        Dark/light matrix of a render, sampled around every module center.
+
+        Args:
+            image (PIL.Image): The render
+            count (int): Modules per side; located from the image when None
+            module (float): Module size in pixels
+            left, top (float): Pixel position of the first module
+
+        Returns:
+            ndarray: (count, count) boolean matrix, True for dark
+        """
+        if count is None:
+            count, module, left, top = self.locate(image)
+        luminance = self._luminance(image)
+        centers = (np.arange(count) + 0.5) * module
+        spread = np.round(np.array([-1, 0, 1]) * module / 5).astype(int) if module >= 3 else np.zeros(1, int)
+        ys = np.clip(np.floor(top + centers).astype(int)[:, None] + spread, 0, luminance.shape[0] - 1)
+        xs = np.clip(np.floor(left + centers).astype(int)[:, None] + spread, 0, luminance.shape[1] - 1)
+        # (row, sample y, col, sample x) averaged over the samples of each module
+        values = luminance[ys[:, :, None, None], xs[None, None, :, :]].mean(axis=(1, 3))
+        return values < self.threshold(np.rint(values))
+
+    def decode(self, modules):
+        """
+        Decode a sampled module matrix.
+
+        Returns:
+            dict: ``data`` (str), ``payload`` (bytes), ``version``,
+                ``error_correction``, ``mask_pattern``, ``segments``,
+                ``structured_append``, ``format_errors`` (bits off the
+                nearest format code), per-block ``block_errors`` and
+                ``block_capacities``, ``codeword_errors`` and
+                ``worst_block_usage``
+
+        Raises:
+            ValueError: If the matrix cannot be decoded
+        """
+        modules = np.asarray(modules, dtype=bool)
+        count = len(modules)
+        version = (count - 17) // 4
+        if count != version * 4 + 17 or not 1 <= version <= 40:
+            raise ValueError(f"{count} modules per side is not a QR code size")
+
+        # Format information: the nearest valid code over both copies
+        weights = 1 << np.arange(15)
+        codes = _format_codes()
+        distances = []
+        for rows, cols in _format_positions(count):
+            read = int((modules[rows, cols] * weights).sum())
+            distances.append([bin(read ^ int(code)).count('1') for code in codes])
+        distances = np.array(distances)
+        best = np.unravel_index(np.argmin(distances), distances.shape)
+        format_errors = int(distances[best])
+        if format_errors > 3:
+            raise ValueError("Format information is unreadable")
+        error_correction, mask_pattern = divmod(int(best[1]), 8)
+
+        # Unmask the data modules and collect the codeword stream
+        rows, cols = _data_indexes(version)
+        bits = modules[rows, cols] ^ _mask(count, mask_pattern)[rows, cols]
+        layout = _block_indexes(version, error_correction)
+        total = sum(len(positions) for positions, _, _ in layout)
+        stream = np.packbits(bits[:total * 8]).astype(np.int64)
+
+        data = []
+        block_errors = []
+        for positions, data_count, ecc_count in layout:
+            block = stream[positions].copy()
+            block_errors.append(rs_correct(block, ecc_count))
+            data.extend(block[:data_count].tolist())
+        capacities = list(_block_layout(version, error_correction)[1])
+
+        result = parse_segments(data, version)
+        try:
+            text = result['payload'].decode('utf-8')
+        except UnicodeDecodeError:
+            text = result['payload'].decode('latin-1')
+        usage = max((errors / capacity if capacity > 0 else (float('inf') if errors else 0.0))
+                    for errors, capacity in zip(block_errors, capacities))
+        result.update(
+            data=text,
+            version=version,
+            error_correction=LEVEL_NAMES[error_correction],
+            mask_pattern=mask_pattern,
+            format_errors=format_errors,
+            block_errors=block_errors,
+            block_capacities=capacities,
+            codeword_errors=sum(block_errors),
+            worst_block_usage=round(usage, 3),
+        )
+        return result
+
+    def verify(self, image, data=None, expected_modules=None, module=None, left=None, top=None):
+        """
+        Read a render back and compare it with what it should hold.
+
+        Args:
+            image (PIL.Image): The render
+            data (str): Payload the code must decode to; None only checks
+                that it decodes
+            expected_modules: Module matrix the render was drawn from; gives
+                the grid and a count of misread modules
+            module (float): Module size in pixels (default: from the image
+                size and the quiet zone when the matrix is given)
+            left, top (float): Pixel position of the first module
+
+        Returns:
+            dict: ``ok``, ``decoded``, ``matches``, the decoded ``data``,
+                ``error_margin`` (share of the worst block's correction
+                capacity still unused), ``module_errors`` (None without
+                a matrix), ``error`` when decoding failed, and the
+                details from ``decode``
+        """
+        with metrics.span('qr_verify'):
+            report = {'ok': False, 'decoded': False, 'matches': False, 'data': None,
+                      'error_margin': 0.0, 'module_errors': None}
+            try:
+                if expected_modules is not None:
+                    expected = np.asarray(expected_modules, dtype=bool)
+                    count = len(expected)
+                    if module is None:
+                        module = image.width / (count + 2 * self.border)
+                        left = top = self.border * module
+                    sampled = self.sample(image, count, module, left, top)
+                    report['module_errors'] = int((sampled != expected).sum())
+                else:
+                    sampled = self.sample(image)
+                report.update(self.decode(sampled))
+            except ValueError as e:
+                report['error'] = str(e)
+                return report
+            report.pop('payload')
+            report['decoded'] = True
+            report['matches'] = data is None or report['data'] == data
+            report['error_margin'] = round(max(0.0, 1 - report['worst_block_usage']), 3)
+            report['ok'] = report['matches'] and report['worst_block_usage'] <= 1
+            return report
+
+    def verify_files(self, paths, expected=None):
+        """
+        Batch check of existing image files.
+
+        Args:
+            paths (iterable): Image file paths
+            expected (dict): Optional payload per path to compare with
+
+        Yields:
+            tuple: (path, report from ``verify``)
+        """
+        expected = expected or {}
+        for path in paths:
+            try:
+                with Image.open(path) as image:
+                    image.load()
+            except (OSError, ValueError) as e:
+                yield path, {'ok': False, 'decoded': False, 'matches': False, 'data': None,
+                             'error_margin': 0.0, 'module_errors': None, 'error': str(e)}
+                continue
+            yield path, self.verify(image, expected.get(path))
@@ -0,0 +1,143 @@
+"""Optimal segment modes for QR payloads.
+
+Digits cost 10 bits per 3 in numeric mode, ``0-9 A-Z $%*+-./:`` cost 11
+bits per 2 in alphanumeric mode and anything else 8 bits per byte. Every
+mode switch costs a 4-bit mode indicator plus a character count field
+whose size depends on the version, so whether a run is worth its own
+segment depends on its length and neighbours. The split with the fewest
+bits is found by dynamic programming over the payload bytes, once per
+character count size class (versions 1-9, 10-26 and 27-40).
+"""
+
+import functools
+
+from qrcode import util
+from qrcode.exceptions import DataOverflowError
+
+
+# Modes in the order of the cost table, and their cost per byte in sixths of a bit
+MODES = (util.MODE_8BIT_BYTE, util.MODE_ALPHA_NUM, util.MODE_NUMBER)
+_CHAR_COSTS = (48, 33, 20)
+
+MODE_NAMES = {util.MODE_NUMBER: 'numeric', util.MODE_ALPHA_NUM: 'alphanumeric', util.MODE_8BIT_BYTE: 'byte'}
+
+# Versions sharing the same character count field sizes
+_SIZE_CLASSES = ((1, 9), (10, 26), (27, 40))
+
+_DIGITS = frozenset(b'0123456789')
+_ALPHANUMERIC = frozenset(util.ALPHA_NUM)
+
+
+def optimal_segments(payload, version):
+    """
+    Split a payload into the mode segments taking the fewest bits.
+
+    Args:
+        payload (str or bytes): The data (text is encoded as UTF-8)
+        version (int): Any version of the character count size class to
+            optimize for
+
+    Returns:
+        tuple: qrcode QRData segments (shared between calls; do not modify)
+    """
+    first = next(first for first, last in _SIZE_CLASSES if version <= last)
+    return _optimal_segments(util.to_bytestring(payload), first)
+
+
+@functools.lru_cache(maxsize=256)
+def _optimal_segments(payload, version):
+    if not payload:
+        return (util.QRData(payload, mode=util.MODE_8BIT_BYTE, check_data=False),)
+    sizes = util.mode_sizes_for_version(version)
+    head_costs = [(4 + sizes[mode]) * 6 for mode in MODES]
+
+    # modes_at[i][j]: mode of byte i on the cheapest path whose segment
+    # after byte i is in MODES[j]
+    modes_at = []
+    costs = list(head_costs)
+    for byte in payload:
+        allowed = (True, byte in _ALPHANUMERIC, byte in _DIGITS)
+        current = [costs[j] + _CHAR_COSTS[j] if allowed[j] else None for j in range(3)]
+        chosen = [j if allowed[j] else None for j in range(3)]
+        # Closing a segment (rounded up to whole bits) and opening another:
+        # the cheapest segment to close is the same whatever follows
+        closing = min((k for k in range(3) if current[k] is not None), key=lambda k: current[k])
+        closed = (current[closing] + 5) // 6 * 6
+        for j in range(3):
+            switched = closed + head_costs[j]
+            if chosen[j] is None or switched < current[j]:
+                current[j] = switched
+                chosen[j] = closing
+        modes_at.append(chosen)
+        costs = current
+
+    # Walk back from the cheapest final mode
+    mode = min(range(3), key=lambda j: costs[j])
+    byte_modes = [0] * len(payload)
+    for i in range(len(payload) - 1, -1, -1):
+        mode = modes_at[i][mode]
+        byte_modes[i] = mode
+
+    segments = []
+    start = 0
+    for i in range(1, len(payload) + 1):
+        if i == len(payload) or byte_modes[i] != byte_modes[start]:
+            mode = MODES[byte_modes[start]]
+            # Runs longer than the character count field holds become several segments
+            limit = (1 << sizes[mode]) - 1
+            for chunk_start in range(start, i, limit):
+                chunk = payload[chunk_start:min(i, chunk_start + limit)]
+                segments.append(util.QRData(chunk, mode=mode, check_data=False))
+            start = i
+    return tuple(segments)
+
+
+def segment_bits(segments, version):
+    """Bits taken by segments (mode, length and data) in a symbol of the given version."""
+    total = 0
+    for segment in segments:
+        length = len(segment)
+        if segment.mode == util.MODE_NUMBER:
+            data = 10 * (length // 3) + (0, 4, 7)[length % 3]
+        elif segment.mode == util.MODE_ALPHA_NUM:
+            data = 11 * (length // 2) + 6 * (length % 2)
+        else:
+            data = 8 * length
+        total += 4 + util.length_in_bits(segment.mode, version) + data
+    return total
+
+
+def fit_segments(payload, error_correction, start=1, header_bits=0):
+    """
+    Smallest version from ``start`` holding a payload, with its optimal segments.
+
+    Args:
+        payload (str or bytes): The data
+        error_correction (int): qrcode.constants.ERROR_CORRECT_* level
+        start (int): Smallest version to consider
+        header_bits (int): Bits taken before the first segment (structured
+            append header)
+
+    Returns:
+        tuple: (version, tuple of QRData segments)
+
+    Raises:
+        DataOverflowError: If not even version 40 is large enough
+    """
+    payload = util.to_bytestring(payload)
+    limits = util.BIT_LIMIT_TABLE[error_correction]
+    for first, last in _SIZE_CLASSES:
+        # Skip classes that cannot hold the payload even if it were all digits
+        if last < start or header_bits + len(payload) * 10 // 3 > limits[last]:
+            continue
+        segments = optimal_segments(payload, first)
+        needed = header_bits + segment_bits(segments, first)
+        for version in range(max(first, start), last + 1):
+            if needed <= limits[version]:
+                return version, segments
+    raise DataOverflowError("Data too large for a QR code")
+
+
+def describe(segments):
+    """Modes and lengths of segments, for reports."""
+    return [{'mode': MODE_NAMES[segment.mode], 'length': len(segment)} for segment in segments]
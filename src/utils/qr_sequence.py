@@ -0,0 +1,96 @@
+"""Structured append: one payload spread over a sequence of up to 16 QR codes.
+
+Every symbol of a sequence starts with a structured append header (its
+position, the number of symbols and a parity byte of the whole payload),
+so readers that support it reassemble the original data in order.
+"""
+
+import functools
+import collections
+
+import qrcode
+from qrcode import util
+from qrcode.base import rs_blocks
+from qrcode.exceptions import DataOverflowError
+
+
+# Most symbols a structured append sequence can have
+MAX_PARTS = 16
+
+# Mode indicator and header size: mode, position, count - 1 and parity
+MODE_STRUCTURED_APPEND = 3
+HEADER_BITS = 4 + 4 + 4 + 8
+
+
+SequencePart = collections.namedtuple('SequencePart', ['data', 'index', 'total', 'parity'])
+SequencePart.__doc__ = """One symbol of a structured append sequence (``index`` counts from 0)."""
+
+
+def parity(payload):
+    """Structured append parity: XOR of every byte of the whole payload."""
+    return functools.reduce(lambda a, b: a ^ b, util.to_bytestring(payload), 0)
+
+
+def split_payload(data, parts):
+    """
+    Split a payload into ``parts`` pieces of nearly equal byte length.
+
+    Cuts never fall inside a UTF-8 character, so every piece is valid text.
+
+    Returns:
+        list: SequencePart tuples in order
+    """
+    if not 1 <= parts <= MAX_PARTS:
+        raise ValueError(f"A sequence has 1 to {MAX_PARTS} codes")
+    payload = util.to_bytestring(data)
+    check = parity(payload)
+    cuts = [0]
+    for i in range(1, parts):
+        cut = max(cuts[-1], round(i * len(payload) / parts))
+        while cut < len(payload) and payload[cut] & 0xC0 == 0x80:
+            cut += 1
+        cuts.append(cut)
+    cuts.append(len(payload))
+    return [SequencePart(payload[start:end].decode('utf-8'), index, parts, check)
+            for index, (start, end) in enumerate(zip(cuts, cuts[1:]))]
+
+
+def make_symbol(part, segments, version, error_correction, box_size=10, border=4):
+    """
+    Build a structured append symbol.
+
+    qrcode has no structured append support, so the codeword stream is
+    assembled here (header, segments, terminator and padding as in
+    ``qrcode.util.create_data``) and handed to the QRCode object, which
+    then only places it and picks the mask.
+
+    Returns:
+        qrcode.QRCode: Symbol with its module matrix built
+    """
+    blocks = rs_blocks(version, error_correction)
+    bit_limit = sum(block.data_count * 8 for block in blocks)
+    buffer = util.BitBuffer()
+    buffer.put(MODE_STRUCTURED_APPEND, 4)
+    buffer.put(part.index, 4)
+    buffer.put(part.total - 1, 4)
+    buffer.put(part.parity, 8)
+    for segment in segments:
+        buffer.put(segment.mode, 4)
+        buffer.put(len(segment), util.length_in_bits(segment.mode, version))
+        segment.write(buffer)
+    if len(buffer) > bit_limit:
+        raise DataOverflowError(f"Code length overflow. Data size ({len(buffer)}) > size available ({bit_limit})")
+
+    for _ in range(min(bit_limit - len(buffer), 4)):
+        buffer.put_bit(False)
+    if len(buffer) % 8:
+        for _ in range(8 - len(buffer) % 8):
+            buffer.put_bit(False)
+    for i in range((bit_limit - len(buffer)) // 8):
+        buffer.put(util.PAD0 if i % 2 == 0 else util.PAD1, 8)
+
+    qr = qrcode.QRCode(version=version, error_correction=error_correction, box_size=box_size, border=border)
+    qr.data_list = list(segments)
+    qr.data_cache = util.create_bytes(buffer, blocks)
+    qr.make(fit=False)
+    return qr
@@ -0,0 +1,173 @@
+"""Render cache shared by all local worker processes, stored in SQLite (WAL mode)."""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from .metrics import metrics
+
+
+class SharedRenderCache:
+    """
+    LRU cache for rendered QR output shared across processes.
+
+    Entries live in one SQLite database in WAL mode, so every worker on
+    the machine reads and writes the same keyspace concurrently without
+    an external service. Each entry records its last access time; once
+    the stored bytes exceed ``max_bytes`` the least recently used entries
+    are deleted.
+
+    Args:
+        directory (str): Directory holding the cache database
+        max_bytes (int): Total size of cached values to keep
+        name (str): Label for cache hit/miss metrics
+        touch_interval (float): Seconds between access-time updates of one
+            entry, which keeps hot reads from turning into writes
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            mimetype TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            accessed REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+
+        -- Running total of stored bytes, kept by triggers in the writing transaction
+        BEGIN IMMEDIATE;
+        CREATE TABLE IF NOT EXISTS cache_size (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            total INTEGER NOT NULL
+        );
+        CREATE TRIGGER IF NOT EXISTS entries_size_insert AFTER INSERT ON entries
+            BEGIN UPDATE cache_size SET total = total + new.size; END;
+        CREATE TRIGGER IF NOT EXISTS entries_size_delete AFTER DELETE ON entries
+            BEGIN UPDATE cache_size SET total = total - old.size; END;
+        CREATE TRIGGER IF NOT EXISTS entries_size_update AFTER UPDATE OF size ON entries
+            BEGIN UPDATE cache_size SET total = total - old.size + new.size; END;
+        INSERT OR IGNORE INTO cache_size (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM entries;
+        COMMIT;
+    """
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, name='render', touch_interval=1.0):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'render_cache.sqlite3')
+        self.max_bytes = max_bytes
+        self.name = name
+        self.touch_interval = touch_interval
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self):
+        """One connection per thread and process (connections must not cross a fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def make_key(kind, params):
+        """
+        Stable key for a render.
+
+        Args:
+            kind (str): Namespace, e.g. 'render' or 'preview'
+            params (dict): JSON-serializable render parameters
+
+        Returns:
+            str: Hex digest
+        """
+        encoded = json.dumps(params, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(f'{kind}:{encoded}'.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        Look up an entry.
+
+        Returns:
+            tuple: (bytes, mimetype), or None on a miss
+        """
+        conn = self._connection()
+        row = conn.execute('SELECT value, mimetype, accessed FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            metrics.cache_miss(self.name)
+            return None
+
+        metrics.cache_hit(self.name)
+        value, mimetype, accessed = row
+        now = time.time()
+        if now - accessed > self.touch_interval:
+            try:
+                conn.execute('UPDATE entries SET accessed = ? WHERE key = ?', (now, key))
+            except sqlite3.OperationalError:
+                # Another process holds the write lock; recency is best effort
+                pass
+        return value, mimetype
+
+    def put(self, key, value, mimetype):
+        """Store an entry and evict least recently used ones beyond ``max_bytes``."""
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        conn = self._connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete skips the size triggers
+            conn.execute('INSERT INTO entries (key, value, mimetype, size, accessed) VALUES (?, ?, ?, ?, ?) '
+                         'ON CONFLICT (key) DO UPDATE SET value = excluded.value, mimetype = excluded.mimetype, '
+                         'size = excluded.size, accessed = excluded.accessed',
+                         (key, sqlite3.Binary(value), mimetype, size, time.time()))
+            total = conn.execute('SELECT total FROM cache_size').fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(conn, total - self.max_bytes)
+            conn.execute('COMMIT')
+        except sqlite3.OperationalError:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+
+    def _evict(self, conn, excess):
+        freed = 0
+        victims = []
+        for key, size in conn.execute('SELECT key, size FROM entries ORDER BY accessed'):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany('DELETE FROM entries WHERE key = ?', victims)
+        metrics.inc('cache_evictions_total', len(victims), cache=self.name)
+
+    def get_or_render(self, key, render):
+        """
+        Return the cached entry, or call ``render()`` and store its result.
+
+        Args:
+            key (str): Key from ``make_key``
+            render (callable): Returns (bytes, mimetype)
+
+        Returns:
+            tuple: (bytes, mimetype)
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        value, mimetype = render()
+        self.put(key, value, mimetype)
+        return value, mimetype
+
+    def stats(self):
+        """Entry count and stored bytes."""
+        count, total = self._connection().execute(
+            'SELECT (SELECT COUNT(*) FROM entries), total FROM cache_size').fetchone()
+        return {'entries': count, 'bytes': total, 'max_bytes': self.max_bytes}
+
+    def clear(self):
+        self._connection().execute('DELETE FROM entries')
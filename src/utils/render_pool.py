@@ -0,0 +1,255 @@
+"""Process pool for QR rendering with results returned through shared memory."""
+
+import os
+import queue
+import zipfile
+import threading
+import collections
+import multiprocessing
+from multiprocessing import shared_memory
+
+from .metrics import metrics
+from .qr_generator import QRCodeGenerator
+
+
+# Per-process state of a pool worker, set up once by ``_init_worker``
+_worker = {}
+
+
+def _init_worker(shm_name, slot_size, png_profile, error_correction):
+    _worker['shm'] = shared_memory.SharedMemory(name=shm_name)
+    _worker['slot_size'] = slot_size
+    _worker['generator'] = QRCodeGenerator(png_profile=png_profile, error_correction=error_correction)
+
+
+def _render_to_slot(slot, data, options):
+    """
+    Render one code in a worker and copy the encoded file into its slot.
+
+    Only the length and metadata travel back through the result pipe;
+    output that does not fit the slot is returned inline instead.
+    """
+    buf, mimetype, filename = _worker['generator'].generate_qr_code(data, **options)
+    view = buf.getbuffer()
+    try:
+        size = view.nbytes
+        if size > _worker['slot_size']:
+            return size, bytes(view), mimetype, filename
+        start = slot * _worker['slot_size']
+        _worker['shm'].buf[start:start + size] = view
+        return size, None, mimetype, filename
+    finally:
+        view.release()
+
+
+class RenderResult:
+    """
+    An encoded QR code held in a pool slot.
+
+    ``data`` is a memoryview over the shared segment, so it can be written
+    to a file, socket or archive without copying. Call ``release`` (or use
+    the result as a context manager) once it has been consumed; the slot
+    is then reused and the view becomes invalid.
+    """
+
+    def __init__(self, pool, slot, data, mimetype, filename):
+        self._pool = pool
+        self._slot = slot
+        self.data = data
+        self.mimetype = mimetype
+        self.filename = filename
+
+    def __len__(self):
+        return self.data.nbytes
+
+    def release(self):
+        if self.data is None:
+            return
+        self.data.release()
+        self.data = None
+        if self._slot is not None:
+            self._pool._release_slot(self._slot, self)
+            self._slot = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class QRRenderPool:
+    """
+    Renders QR codes in worker processes.
+
+    The pool owns one shared memory segment split into fixed-size slots.
+    Each task is assigned a free slot, the worker writes the encoded file
+    straight into it and the parent hands it out as a memoryview, so
+    images are not pickled back through the result pipe. At most ``slots``
+    results are in flight or held by callers at any time.
+
+    Args:
+        processes (int): Worker processes (defaults to the CPU count)
+        slots (int): Number of result slots (defaults to twice the workers)
+        slot_size (int): Bytes per slot; larger results fall back to being
+            returned inline
+        png_profile (str): PNG profile of the workers' generators
+        error_correction (str): Error correction mode of the workers' generators
+    """
+
+    def __init__(self, processes=None, slots=None, slot_size=1024 * 1024, png_profile='balanced',
+                 error_correction='auto'):
+        # Validate the settings before any worker is started; also plans sequences
+        self.planner = QRCodeGenerator(png_profile=png_profile, error_correction=error_correction)
+        self.processes = processes or os.cpu_count() or 1
+        self.slots = slots or 2 * self.processes
+        self.slot_size = slot_size
+
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * slot_size)
+        self._free = queue.Queue()
+        for slot in range(self.slots):
+            self._free.put(slot)
+        self._held = {}
+        self._lock = threading.Lock()
+        self._pool = multiprocessing.Pool(
+            self.processes, initializer=_init_worker,
+            initargs=(self._shm.name, slot_size, png_profile, error_correction)
+        )
+
+    def render(self, data, **options):
+        """
+        Render a single code, blocking until a slot is free.
+
+        Args:
+            data (str): The data to encode
+            **options: Keyword arguments for ``QRCodeGenerator.generate_qr_code``
+
+        Returns:
+            RenderResult: The encoded file; release it when done
+        """
+        return self._collect(self._submit(self._free.get(), data, options))
+
+    def imap(self, items, **options):
+        """
+        Render many codes in parallel, yielding results in input order.
+
+        Items are submitted as slots become free, so an arbitrarily long
+        iterable is processed with bounded memory. Release each result
+        before the consumer holds ``slots`` of them, otherwise the
+        generator waits for a slot forever.
+
+        If a render fails or the consumer stops early, the tasks still in
+        flight are waited for and their slots returned to the pool.
+        """
+        pending = collections.deque()
+        try:
+            for data in items:
+                while True:
+                    try:
+                        slot = self._free.get_nowait()
+                        break
+                    except queue.Empty:
+                        if not pending:
+                            slot = self._free.get()
+                            break
+                        yield self._collect(pending.popleft())
+                pending.append(self._submit(slot, data, options))
+            while pending:
+                yield self._collect(pending.popleft())
+        finally:
+            # A worker may still be writing into the slot, so wait before reusing it
+            for slot, async_result in pending:
+                async_result.wait()
+                self._free.put(slot)
+
+    def write_archive(self, items, fileobj, **options):
+        """
+        Render codes into a ZIP archive (qr-0001.png, ...).
+
+        Each result is written from its slot and released immediately.
+
+        Returns:
+            int: Number of codes written
+        """
+        count = 0
+        extension = options.get('export_format', 'png')
+        with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for result in self.imap(items, **options):
+                with result:
+                    count += 1
+                    archive.writestr(f'qr-{count:04d}.{extension}', result.data)
+        return count
+
+    def write_sequence(self, parts, fileobj, **options):
+        """
+        Render the codes of a structured append sequence in parallel into a
+        ZIP archive (qr-01-of-03.png, ...).
+
+        Args:
+            parts (list): Sequence from ``QRCodeGenerator.plan_sequence``
+            fileobj: Writable binary file for the archive
+            **options: Keyword arguments for ``QRCodeGenerator.generate_qr_code``
+
+        Returns:
+            int: Number of codes written
+        """
+        extension = options.get('export_format', 'png')
+        with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for index, result in enumerate(self.imap(parts, **options)):
+                with result:
+                    archive.writestr(QRCodeGenerator.sequence_filename(index, len(parts), extension), result.data)
+        return len(parts)
+
+    def _submit(self, slot, data, options):
+        try:
+            return slot, self._pool.apply_async(_render_to_slot, (slot, data, options))
+        except Exception:
+            self._free.put(slot)
+            raise
+
+    def _collect(self, task):
+        slot, async_result = task
+        try:
+            with metrics.span('render_pool_wait'):
+                size, inline, mimetype, filename = async_result.get()
+        except Exception:
+            self._free.put(slot)
+            raise
+
+        if inline is not None:
+            # Too large for a slot; the worker sent the bytes through the pipe
+            self._free.put(slot)
+            metrics.inc('render_pool_overflow_total')
+            return RenderResult(self, None, memoryview(inline), mimetype, filename)
+
+        start = slot * self.slot_size
+        result = RenderResult(self, slot, self._shm.buf[start:start + size], mimetype, filename)
+        with self._lock:
+            self._held[slot] = result
+        return result
+
+    def _release_slot(self, slot, result):
+        with self._lock:
+            if self._held.get(slot) is result:
+                del self._held[slot]
+                self._free.put(slot)
+
+    def close(self):
+        """Stop the workers and free the shared segment; outstanding results are invalidated."""
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+        with self._lock:
+            held = list(self._held.values())
+        for result in held:
+            result.release()
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,64 @@
+"""Content-hash fingerprinting of static assets."""
+
+import os
+import hashlib
+
+
+class StaticAssetManifest:
+    """
+    Maps static files to names containing a hash of their content.
+
+    ``css/style.css`` becomes ``css/style.3f2a9c1d0b7e.css``. A changed
+    file gets a new URL, so fingerprinted URLs can be cached by browsers
+    and proxies forever. Precompressed ``.gz``/``.br`` copies are not
+    listed; they are found next to their source when serving.
+
+    Args:
+        root (str): Static folder
+        hash_length (int): Hex digits of the SHA-256 kept in the name
+    """
+
+    SKIPPED_SUFFIXES = ('.gz', '.br')
+
+    def __init__(self, root, hash_length=12):
+        self.root = root
+        self.hash_length = hash_length
+        self._hashed = {}
+        self._original = {}
+        self.build()
+
+    def build(self):
+        """
+        Hash every file below ``root``.
+
+        Returns:
+            dict: Original name -> fingerprinted name
+        """
+        hashed = {}
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(self.SKIPPED_SUFFIXES):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    digest = hashlib.sha256(f.read()).hexdigest()[:self.hash_length]
+                stem, extension = os.path.splitext(name)
+                hashed[name] = f"{stem}.{digest}{extension}"
+
+        self._hashed = hashed
+        self._original = {value: key for key, value in hashed.items()}
+        return dict(hashed)
+
+    def hashed(self, filename):
+        """Fingerprinted name of a static file, or the name itself if it is unknown."""
+        return self._hashed.get(filename, filename)
+
+    def resolve(self, filename):
+        """
+        Original name of a fingerprinted file.
+
+        Returns:
+            str: The original name, or None if ``filename`` is not a current fingerprint
+        """
+        return self._original.get(filename)
@@ -3,39 +3,47 @@
 import tempfile
 import os
 from lxml import etree
+import numpy as np
 import webcolors
 
+from .metrics import metrics
+from .svg_geometry import analyze_geometry, iter_shapes
+from .svg_styles import StyleResolver, has_stroke
+from .svg_units import stroke_widths_mm, width_compliance
+
 
 class SVGColorValidator:
     """Handles SVG color validation and analysis."""
     
+    REQUIRED_WIDTH_MM = 1.0
+    
     def __init__(self):
         self.namespaces = {'svg': 'http://www.w3.org/2000/svg'}
     
-    def validate_svg_colors(self, svg_content):
+    def validate_svg_colors(self, svg_content, width_tolerance=0.01):
         """
         Validate SVG colors and return analysis.
         
+        Stroke widths are compared in printed millimetres, so '3.7795px',
+        '0.1cm' or plain numbers scaled by the viewBox or transforms count
+        as 1mm when they are within ``width_tolerance`` of it.
+        
         Args:
             svg_content (str): SVG content as string
+            width_tolerance (float): Allowed stroke width deviation in mm
             
         Returns:
             dict: Analysis results with color information
         """
         try:
             # Parse SVG content
-            root = etree.fromstring(svg_content.encode('utf-8'))
-            
-            # Find shape elements
-            shapes = root.xpath(
-                '//svg:path | //svg:rect | //svg:circle | //svg:ellipse | //svg:line | //svg:polyline',
-                namespaces=self.namespaces
-            )
+            with metrics.span('svg_parse'):
+                root = etree.fromstring(svg_content.encode('utf-8'))
             
-            if not shapes:
-                shapes = root.xpath(
-                    '//path | //rect | //circle | //ellipse | //line | //polyline'
-                )
+            # Find shape elements and resolve their effective styles
+            with metrics.span('svg_resolve_styles'):
+                resolver = StyleResolver(root)
+                shapes = list(iter_shapes(root, resolver))
             
             analysis = {
                 'total_shapes': len(shapes),
@@ -51,49 +59,57 @@ class SVGColorValidator:
                     'correct_width': 0,
                     'correct_opacity': 0,
                     'total_with_stroke': 0
-                }
+                },
+                'unsupported_selectors': resolver.stylesheet.unsupported_selectors,
+                'width_tolerance': width_tolerance
             }
             
-            for i, shape in enumerate(shapes):
-                tag_name = etree.QName(shape).localname
-                shape_id = shape.get('id', f"{tag_name}_{i+1}")
-                
-                shape_info = {
-                    'id': shape_id,
-                    'tag': tag_name,
-                    'stroke': self._analyze_color(shape.get('stroke')),
-                    'fill': self._analyze_color(shape.get('fill')),
-                    'stroke_width': shape.get('stroke-width'),
-                    'stroke_opacity': shape.get('stroke-opacity', '1')
-                }
-                
-                # Check compliance for original svg_checker.py requirements
-                if shape_info['stroke']['color']:
-                    analysis['compliance']['total_with_stroke'] += 1
+            with metrics.span('svg_stroke_widths'):
+                widths_mm = stroke_widths_mm(root, [(transform, style) for _, _, _, transform, _, style in shapes])
+                width_ok = width_compliance(widths_mm, self.REQUIRED_WIDTH_MM, width_tolerance)
+            analysis['compliance']['correct_width'] = int(width_ok.sum())
+            
+            with metrics.span('svg_analyze_shapes'):
+                for i, shape, tag_name, _, _, style in shapes:
+                    shape_id = shape.get('id', f"{tag_name}_{i+1}")
+                    
+                    shape_info = {
+                        'id': shape_id,
+                        'tag': tag_name,
+                        'stroke': self._analyze_color(style.get('stroke')),
+                        'fill': self._analyze_color(style.get('fill')),
+                        'stroke_width': style.get('stroke-width'),
+                        'stroke_width_mm': None if np.isnan(widths_mm[i]) else round(float(widths_mm[i]), 4),
+                        'width_ok': bool(width_ok[i]),
+                        'stroke_opacity': style.get('stroke-opacity', '1')
+                    }
+                    
+                    # Check compliance for original svg_checker.py requirements
+                    if shape_info['stroke']['color']:
+                        analysis['compliance']['total_with_stroke'] += 1
+                        
+                        # Check for red stroke (100% red)
+                        stroke_color = shape_info['stroke']['color'].lower()
+                        if stroke_color in ['red', '#ff0000', '#f00', 'rgb(255,0,0)']:
+                            analysis['compliance']['red_strokes'] += 1
+                    
+                    # Check stroke opacity (1)
+                    if shape_info['stroke_opacity'] == '1':
+                        analysis['compliance']['correct_opacity'] += 1
+                    
+                    # Add colors to summary
+                    if shape_info['stroke']['color']:
+                        analysis['color_summary']['stroke_colors'].add(shape_info['stroke']['color'])
+                        analysis['color_summary']['unique_colors'].add(shape_info['stroke']['color'])
                     
-                    # Check for red stroke (100% red)
-                    stroke_color = shape_info['stroke']['color'].lower()
-                    if stroke_color in ['red', '#ff0000', '#f00', 'rgb(255,0,0)']:
-                        analysis['compliance']['red_strokes'] += 1
-                
-                # Check stroke width (1mm)
-                if shape_info['stroke_width'] == '1mm':
-                    analysis['compliance']['correct_width'] += 1
-                
-                # Check stroke opacity (1)
-                if shape_info['stroke_opacity'] == '1':
-                    analysis['compliance']['correct_opacity'] += 1
-                
-                # Add colors to summary
-                if shape_info['stroke']['color']:
-                    analysis['color_summary']['stroke_colors'].add(shape_info['stroke']['color'])
-                    analysis['color_summary']['unique_colors'].add(shape_info['stroke']['color'])
-                
-                if shape_info['fill']['color']:
-                    analysis['color_summary']['fill_colors'].add(shape_info['fill']['color'])
-                    analysis['color_summary']['unique_colors'].add(shape_info['fill']['color'])
-                
-                analysis['shapes'].append(shape_info)
+                    if shape_info['fill']['color']:
+                        analysis['color_summary']['fill_colors'].add(shape_info['fill']['color'])
+                        analysis['color_summary']['unique_colors'].add(shape_info['fill']['color'])
+                    
+                    if 'url_reference' in (shape_info['stroke']['type'], shape_info['fill']['type']):
+                        analysis['color_summary']['has_gradients'] = True
+                    
+                    analysis['shapes'].append(shape_info)
             
             # Convert sets to lists for JSON serialization
             analysis['color_summary']['unique_colors'] = list(analysis['color_summary']['unique_colors'])
@@ -115,6 +131,31 @@ class SVGColorValidator:
                 }
             }
     
+    def analyze_geometry(self, svg_content, tolerance=0.01):
+        """
+        Analyze the cut geometry of an SVG.
+        
+        Finds shapes that are exact copies of each other and strokes that
+        run along the same line, which a laser would cut twice, and sums
+        the cut length. Only shapes whose effective style has a stroke
+        are cut lines.
+        
+        Args:
+            svg_content (str): SVG content as string
+            tolerance (float): Distance in user units under which points match
+            
+        Returns:
+            dict: Geometry report with cut_length, duplicates, overlaps and
+                their lengths in user units
+        """
+        try:
+            with metrics.span('svg_parse'):
+                root = etree.fromstring(svg_content.encode('utf-8'))
+            with metrics.span('svg_geometry'):
+                return analyze_geometry(root, tolerance=tolerance, is_cut=has_stroke)
+        except Exception as e:
+            return {'error': f"Error analyzing SVG geometry: {str(e)}"}
+    
     def _analyze_color(self, color_value):
         """
         Analyze a color value and extract information.
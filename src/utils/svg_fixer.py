@@ -0,0 +1,236 @@
+"""Streaming rewrite of SVG stroke settings to the laser-cut requirements."""
+
+import io
+import math
+
+from lxml import etree
+
+from .metrics import metrics
+from .svg_geometry import SHAPE_TAGS, NON_RENDERED, IDENTITY, parse_transform, multiply
+from .svg_styles import StyleResolver, has_stroke
+from .svg_units import document_scale, to_user_units, MM_PER_PX
+
+RED_STROKES = ('red', '#ff0000', '#f00', 'rgb(255,0,0)')
+# Fixed properties and their names in ``stats``
+FIXED_PROPERTIES = {'stroke': 'color', 'stroke-width': 'width', 'stroke-opacity': 'opacity'}
+
+
+class SVGFixer:
+    """
+    Rewrites the stroke color, width and opacity of every cut line.
+
+    The document is read twice with ``iterparse``: once for its
+    ``<style>`` sheets, then once more while the output is written
+    element by element through ``etree.xmlfile``. Finished elements are
+    dropped from the parse tree as soon as they are written, so only the
+    chain of open elements is ever in memory.
+
+    Shapes with an effective stroke are fixed; the new values go into
+    their ``style`` attribute, which overrides presentation attributes
+    and style sheet rules. Widths are written in the shape's user units,
+    so the printed stroke is ``width_mm`` whatever the viewBox and
+    transforms; plain '1mm' is kept where no scaling applies.
+
+    Args:
+        color (str): Required stroke color
+        width_mm (float): Required printed stroke width
+        opacity (str): Required stroke opacity
+        tolerance (float): Width deviation in mm that is left alone
+        fix_color, fix_width, fix_opacity (bool): Which settings to rewrite
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, color='#ff0000', width_mm=1.0, opacity='1', tolerance=0.01,
+                 fix_color=True, fix_width=True, fix_opacity=True):
+        self.color = color
+        self.width_mm = width_mm
+        self.opacity = opacity
+        self.tolerance = tolerance
+        self.fix_color = fix_color
+        self.fix_width = fix_width
+        self.fix_opacity = fix_opacity
+        self.stats = {'shapes': 0, 'fixed': 0, 'color': 0, 'width': 0, 'opacity': 0}
+
+    @staticmethod
+    def _open(source):
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        return source
+
+    @staticmethod
+    def _iterparse(source, events):
+        return etree.iterparse(source, events=events, remove_comments=False,
+                               resolve_entities=False, huge_tree=True)
+
+    def read_stylesheet(self, source):
+        """
+        First pass: collect the ``<style>`` sheets without keeping the tree.
+
+        Raises:
+            etree.XMLSyntaxError: If the document is not well-formed
+        """
+        css = []
+        for _, element in self._iterparse(self._open(source), ('end',)):
+            tag = element.tag
+            if isinstance(tag, str) and (tag == 'style' or tag.endswith('}style')):
+                css.append(element.text or '')
+            element.clear(keep_tail=True)
+        return '\n'.join(css)
+
+    def _fixes(self, style, transform, mm_per_unit, reference):
+        """New declarations for a shape, or None if it is compliant."""
+        fixes = {}
+        if self.fix_color and (style.get('stroke') or '').lower() not in RED_STROKES + (self.color.lower(),):
+            fixes['stroke'] = self.color
+        if self.fix_width:
+            a, b, c, d = transform[:4]
+            scale = mm_per_unit * math.sqrt(abs(a * d - b * c))
+            width = to_user_units(style.get('stroke-width', '1'), reference)
+            if scale and (width is None or abs(width * scale - self.width_mm) > self.tolerance):
+                if abs(scale - MM_PER_PX) < 1e-12:
+                    fixes['stroke-width'] = f"{self.width_mm:g}mm"
+                else:
+                    fixes['stroke-width'] = f"{self.width_mm / scale:.6g}"
+        if self.fix_opacity and style.get('stroke-opacity', '1') != self.opacity:
+            fixes['stroke-opacity'] = self.opacity
+        return fixes or None
+
+    @staticmethod
+    def _apply(attrib, fixes):
+        """Attributes of a shape with the fixes merged into its ``style``."""
+        attrib = {name: value for name, value in attrib.items() if name not in fixes}
+        kept = [declaration for declaration in attrib.get('style', '').split(';')
+                if declaration.strip() and declaration.partition(':')[0].strip().lower() not in fixes]
+        kept.extend(f"{name}:{value}" for name, value in fixes.items())
+        attrib['style'] = ';'.join(kept)
+        return attrib
+
+    def stream(self, source):
+        """
+        Fix a document, yielding the corrected SVG in chunks.
+
+        The style sheet pass runs before this returns, so malformed input
+        fails here rather than halfway through a streamed response.
+
+        Args:
+            source: File path or seekable binary file object
+
+        Returns:
+            generator: UTF-8 encoded chunks of the fixed document; ``stats``
+                is complete once it is exhausted
+
+        Raises:
+            etree.XMLSyntaxError: If the document is not well-formed
+        """
+        with metrics.span('svg_fix_stylesheet'):
+            resolver = StyleResolver(css=self.read_stylesheet(source))
+        return self._rewrite(source, resolver)
+
+    def _rewrite(self, source, resolver):
+        sink = _ChunkSink()
+        # Open elements: [element, writer context, text written, last child, transform, style, rendered]
+        stack = []
+        mm_per_unit, reference = MM_PER_PX, None
+
+        def flush(entry):
+            if not entry[2]:
+                if entry[0].text:
+                    xf.write(entry[0].text)
+                entry[2] = True
+            if entry[3] is not None:
+                if entry[3].tail:
+                    xf.write(entry[3].tail)
+                entry[0].remove(entry[3])
+                entry[3] = None
+
+        with etree.xmlfile(sink, encoding='utf-8', buffered=False) as xf:
+            xf.write_declaration()
+            for event, element in self._iterparse(self._open(source), ('start', 'end', 'comment', 'pi')):
+                if event in ('comment', 'pi'):
+                    if stack:
+                        flush(stack[-1])
+                        stack[-1][3] = element
+                    xf.write(element, with_tail=False)
+                elif event == 'start':
+                    tag = element.tag
+                    if tag[0] == '{':
+                        tag = tag[tag.index('}') + 1:]
+                    if stack:
+                        parent = stack[-1]
+                        flush(parent)
+                        transform, parent_style, rendered = parent[4], parent[5], parent[6]
+                        nsmap = element.nsmap if element.nsmap != parent[0].nsmap else None
+                    else:
+                        mm_per_unit, reference = document_scale(element)
+                        transform, parent_style, rendered = IDENTITY, {}, True
+                        nsmap = element.nsmap
+                    value = element.get('transform')
+                    if value:
+                        transform = multiply(transform, parse_transform(value))
+                    style = resolver.computed(element, tag, parent_style)
+                    rendered = rendered and tag not in NON_RENDERED and style.get('display') != 'none'
+
+                    attrib = element.attrib
+                    if tag in SHAPE_TAGS and rendered and has_stroke(style):
+                        self.stats['shapes'] += 1
+                        fixes = self._fixes(style, transform, mm_per_unit, reference)
+                        if fixes:
+                            attrib = self._apply(attrib, fixes)
+                            style = {**style, **fixes}
+                            self.stats['fixed'] += 1
+                            for name in fixes:
+                                self.stats[FIXED_PROPERTIES[name]] += 1
+
+                    writer = xf.element(element.tag, attrib, nsmap)
+                    writer.__enter__()
+                    stack.append([element, writer, False, None, transform, style, rendered])
+                else:
+                    entry = stack.pop()
+                    flush(entry)
+                    entry[1].__exit__(None, None, None)
+                    if stack:
+                        stack[-1][3] = element
+                if sink.size >= self.CHUNK_SIZE:
+                    yield sink.take()
+        yield sink.take()
+
+    def fix(self, source, output):
+        """
+        Fix a document into a file.
+
+        Args:
+            source: File path or seekable binary file object
+            output: Binary file object to write to
+
+        Returns:
+            dict: Counts of shapes with a stroke, shapes fixed, and fixes
+                per setting ('color', 'width', 'opacity')
+        """
+        for chunk in self.stream(source):
+            output.write(chunk)
+        return self.stats
+
+    def fix_string(self, svg_content):
+        """Fix an SVG held in a string and return the corrected string."""
+        output = io.BytesIO()
+        self.fix(io.BytesIO(svg_content.encode('utf-8')), output)
+        return output.getvalue().decode('utf-8')
+
+
+class _ChunkSink:
+    """File-like target for ``xmlfile`` that hands out what was written."""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, data):
+        self.parts.append(data)
+        self.size += len(data)
+
+    def take(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        self.size = 0
+        return data
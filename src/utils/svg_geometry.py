@@ -0,0 +1,641 @@
+"""Geometry of SVG shapes for cut-path analysis.
+
+Shapes are flattened into line segments held in NumPy arrays (curves and
+arcs are sampled), with transforms applied. A uniform grid over the
+segment bounding boxes finds candidate pairs, so duplicate and
+overlapping strokes are found without comparing every segment with every
+other one.
+"""
+
+import re
+import math
+
+import numpy as np
+
+from .svg_styles import StyleResolver
+
+
+# Shape elements analysed by the checker, in the same set as the color checks
+SHAPE_TAGS = frozenset(('path', 'rect', 'circle', 'ellipse', 'line', 'polyline'))
+# Containers whose content is never drawn directly
+NON_RENDERED = frozenset(('defs', 'clipPath', 'mask', 'symbol', 'pattern', 'marker', 'metadata'))
+
+# Samples per curve segment and per full ellipse
+CURVE_STEPS = 16
+ELLIPSE_STEPS = 64
+
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_PATH_TOKEN = re.compile(r'[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+_COMMANDS = frozenset('MmLlHhVvCcSsQqTtAaZz')
+_TRANSFORM = re.compile(r'(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)')
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def _bernstein(degree, steps):
+    t = np.linspace(0.0, 1.0, steps + 1)[1:, None]
+    return np.hstack([math.comb(degree, k) * t ** k * (1 - t) ** (degree - k) for k in range(degree + 1)])
+
+
+# Precomputed Bernstein bases: curve points = basis @ control points
+_QUADRATIC = _bernstein(2, CURVE_STEPS)
+_CUBIC = _bernstein(3, CURVE_STEPS)
+_ELLIPSE = np.stack([np.cos(np.linspace(0, 2 * math.pi, ELLIPSE_STEPS + 1)),
+                     np.sin(np.linspace(0, 2 * math.pi, ELLIPSE_STEPS + 1))], axis=1)
+
+
+def parse_transform(value):
+    """
+    Parse an SVG ``transform`` attribute.
+
+    Returns:
+        tuple: Affine matrix (a, b, c, d, e, f) as in ``matrix(...)``
+    """
+    result = IDENTITY
+    if not value:
+        return result
+    for name, args in _TRANSFORM.findall(value):
+        v = [float(n) for n in _NUMBER.findall(args)]
+        if name == 'matrix' and len(v) == 6:
+            m = tuple(v)
+        elif name == 'translate' and v:
+            m = (1.0, 0.0, 0.0, 1.0, v[0], v[1] if len(v) > 1 else 0.0)
+        elif name == 'scale' and v:
+            m = (v[0], 0.0, 0.0, v[1] if len(v) > 1 else v[0], 0.0, 0.0)
+        elif name == 'rotate' and v:
+            a = math.radians(v[0])
+            cos, sin = math.cos(a), math.sin(a)
+            cx, cy = (v[1], v[2]) if len(v) == 3 else (0.0, 0.0)
+            m = (cos, sin, -sin, cos, cx - cos * cx + sin * cy, cy - sin * cx - cos * cy)
+        elif name == 'skewX' and v:
+            m = (1.0, 0.0, math.tan(math.radians(v[0])), 1.0, 0.0, 0.0)
+        elif name == 'skewY' and v:
+            m = (1.0, math.tan(math.radians(v[0])), 0.0, 1.0, 0.0, 0.0)
+        else:
+            continue
+        result = multiply(result, m)
+    return result
+
+
+def multiply(m1, m2):
+    """Compose two affine matrices (``m2`` applied first)."""
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (a1 * a2 + c1 * b2, b1 * a2 + d1 * b2,
+            a1 * c2 + c1 * d2, b1 * c2 + d1 * d2,
+            a1 * e2 + c1 * f2 + e1, b1 * e2 + d1 * f2 + f1)
+
+
+def _arc_points(x0, y0, rx, ry, phi, large_arc, sweep, x1, y1):
+    """Sample an elliptical arc (SVG endpoint parameterization, spec F.6.5)."""
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0 or (x0 == x1 and y0 == y1):
+        return [(x1, y1)]
+    cos, sin = math.cos(math.radians(phi)), math.sin(math.radians(phi))
+    dx, dy = (x0 - x1) / 2, (y0 - y1) / 2
+    x1p, y1p = cos * dx + sin * dy, -sin * dx + cos * dy
+    scale = (x1p / rx) ** 2 + (y1p / ry) ** 2
+    if scale > 1:
+        rx, ry = rx * math.sqrt(scale), ry * math.sqrt(scale)
+    num = rx * rx * ry * ry - rx * rx * y1p * y1p - ry * ry * x1p * x1p
+    den = rx * rx * y1p * y1p + ry * ry * x1p * x1p
+    coef = math.sqrt(max(0.0, num / den)) if den else 0.0
+    if large_arc == sweep:
+        coef = -coef
+    cxp, cyp = coef * rx * y1p / ry, -coef * ry * x1p / rx
+    cx = cos * cxp - sin * cyp + (x0 + x1) / 2
+    cy = sin * cxp + cos * cyp + (y0 + y1) / 2
+
+    start = math.atan2((y1p - cyp) / ry, (x1p - cxp) / rx)
+    end = math.atan2((-y1p - cyp) / ry, (-x1p - cxp) / rx)
+    delta = end - start
+    if sweep and delta < 0:
+        delta += 2 * math.pi
+    elif not sweep and delta > 0:
+        delta -= 2 * math.pi
+
+    steps = max(2, int(math.ceil(abs(delta) / (2 * math.pi) * ELLIPSE_STEPS)))
+    angles = start + delta * np.arange(1, steps + 1) / steps
+    ex, ey = rx * np.cos(angles), ry * np.sin(angles)
+    points = np.stack([cos * ex - sin * ey + cx, sin * ex + cos * ey + cy], axis=1)
+    points[-1] = (x1, y1)
+    return points.tolist()
+
+
+def parse_path(d):
+    """
+    Flatten path data into polylines.
+
+    Args:
+        d (str): The ``d`` attribute
+
+    Returns:
+        list: One (n, 2) array of points per subpath; closed subpaths end at
+            their start point
+    """
+    subpaths = []
+    points = []
+    tokens = _PATH_TOKEN.findall(d)
+    count = len(tokens)
+    i = 0
+    x = y = 0.0
+    start_x = start_y = 0.0
+    command = None
+    last_control = None  # (kind, point) reflected by S/s and T/t
+
+    def number():
+        nonlocal i
+        if i >= count:
+            raise ValueError("Path data ends in the middle of a command")
+        try:
+            value = float(tokens[i])
+        except ValueError:
+            raise ValueError(f"Invalid path data: expected a number, got {tokens[i]!r}")
+        i += 1
+        return value
+
+    def flag():
+        # Flags may be packed with what follows ("a1 1 0 00.5 1"): take one digit
+        nonlocal i
+        if i >= count or tokens[i][0] not in '01':
+            raise ValueError("Invalid arc flag in path data")
+        token = tokens[i]
+        if len(token) > 1:
+            tokens[i] = token[1:]
+        else:
+            i += 1
+        return token[0] == '1'
+
+    def finish():
+        if len(points) > 1:
+            subpaths.append(np.asarray(points, dtype=float))
+
+    while i < count:
+        token = tokens[i]
+        if token.isalpha():
+            if token not in _COMMANDS or (command is None and token not in 'Mm'):
+                raise ValueError(f"Invalid path command: {token!r}")
+            command = token
+            i += 1
+            if command in 'Zz':
+                if points:
+                    points.append((start_x, start_y))
+                finish()
+                points = []
+                x, y = start_x, start_y
+                last_control = None
+                continue
+        elif command is None or command in 'Zz':
+            raise ValueError("Path data must start with a moveto command")
+
+        relative = command.islower()
+        ox, oy = (x, y) if relative else (0.0, 0.0)
+        upper = command.upper()
+        control = None
+
+        if upper == 'M':
+            finish()
+            x, y = ox + number(), oy + number()
+            start_x, start_y = x, y
+            points = [(x, y)]
+            # Further coordinate pairs are implicit line-tos
+            command = 'l' if relative else 'L'
+        elif upper == 'L':
+            x, y = ox + number(), oy + number()
+            points.append((x, y))
+        elif upper == 'H':
+            x = ox + number()
+            points.append((x, y))
+        elif upper == 'V':
+            y = oy + number()
+            points.append((x, y))
+        elif upper in 'CS':
+            if upper == 'C':
+                c1 = (ox + number(), oy + number())
+            elif last_control and last_control[0] == 'C':
+                c1 = (2 * x - last_control[1][0], 2 * y - last_control[1][1])
+            else:
+                c1 = (x, y)
+            control = (ox + number(), oy + number())
+            end = (ox + number(), oy + number())
+            points.extend((_CUBIC @ np.array([(x, y), c1, control, end])).tolist())
+            x, y = end
+        elif upper in 'QT':
+            if upper == 'Q':
+                control = (ox + number(), oy + number())
+            elif last_control and last_control[0] == 'Q':
+                control = (2 * x - last_control[1][0], 2 * y - last_control[1][1])
+            else:
+                control = (x, y)
+            end = (ox + number(), oy + number())
+            points.extend((_QUADRATIC @ np.array([(x, y), control, end])).tolist())
+            x, y = end
+        elif upper == 'A':
+            rx, ry, phi = number(), number(), number()
+            large_arc, sweep = flag(), flag()
+            end_x, end_y = ox + number(), oy + number()
+            points.extend(_arc_points(x, y, rx, ry, phi, large_arc, sweep, end_x, end_y))
+            x, y = end_x, end_y
+
+        # S and T reflect the last control point of a preceding curve of their kind
+        last_control = (('C' if upper in 'CS' else 'Q'), control) if control is not None else None
+
+        if not points:
+            points = [(x, y)]
+
+    finish()
+    return subpaths
+
+
+def _float(element, name, default=0.0):
+    value = element.get(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        # Lengths with units are read as user units here
+        match = _NUMBER.match(value.strip())
+        return float(match.group()) if match else default
+
+
+def shape_polylines(element, tag):
+    """
+    Polylines of one shape element in its own user space.
+
+    Args:
+        element: The lxml element
+        tag (str): Its local tag name
+
+    Returns:
+        list: (n, 2) point arrays
+    """
+    if tag == 'path':
+        return parse_path(element.get('d', ''))
+    if tag == 'line':
+        return [np.array([[_float(element, 'x1'), _float(element, 'y1')],
+                          [_float(element, 'x2'), _float(element, 'y2')]])]
+    if tag == 'polyline':
+        values = [float(n) for n in _NUMBER.findall(element.get('points', ''))]
+        if len(values) < 4:
+            return []
+        return [np.array(values[:len(values) // 2 * 2], dtype=float).reshape(-1, 2)]
+    if tag in ('circle', 'ellipse'):
+        if tag == 'circle':
+            rx = ry = _float(element, 'r')
+        else:
+            rx, ry = _float(element, 'rx'), _float(element, 'ry')
+        if rx <= 0 or ry <= 0:
+            return []
+        return [_ELLIPSE * (rx, ry) + (_float(element, 'cx'), _float(element, 'cy'))]
+    if tag == 'rect':
+        x, y = _float(element, 'x'), _float(element, 'y')
+        w, h = _float(element, 'width'), _float(element, 'height')
+        if w <= 0 or h <= 0:
+            return []
+        rx = element.get('rx')
+        ry = element.get('ry')
+        rx = _float(element, 'rx') if rx is not None else _float(element, 'ry')
+        ry = _float(element, 'ry') if ry is not None else rx
+        rx, ry = min(rx, w / 2), min(ry, h / 2)
+        if rx > 0 and ry > 0:
+            return parse_path(
+                f"M{x + rx},{y} H{x + w - rx} A{rx},{ry} 0 0 1 {x + w},{y + ry} V{y + h - ry} "
+                f"A{rx},{ry} 0 0 1 {x + w - rx},{y + h} H{x + rx} A{rx},{ry} 0 0 1 {x},{y + h - ry} "
+                f"V{y + ry} A{rx},{ry} 0 0 1 {x + rx},{y} Z"
+            )
+        return [np.array([[x, y], [x + w, y], [x + w, y + h], [x, y + h], [x, y]])]
+    return []
+
+
+def iter_shapes(root, resolver=None):
+    """
+    Walk the document once, top-down, tracking the accumulated transform.
+
+    Args:
+        root: Parsed SVG root element
+        resolver (StyleResolver): Also compute each element's effective
+            style from its parent's; elements with ``display: none`` and
+            their content are then not rendered
+
+    Yields:
+        tuple: (index, element, tag, transform, rendered, style) for every
+            shape element in document order; ``index`` counts all shapes,
+            ``rendered`` is False inside ``<defs>`` and similar containers,
+            and ``style`` is the computed style dict (empty without resolver)
+    """
+    index = 0
+    stack = [(root, IDENTITY, True, {})]
+    while stack:
+        element, parent_transform, rendered, parent_style = stack.pop()
+        tag = element.tag
+        if not isinstance(tag, str):
+            continue
+        if tag[0] == '{':
+            tag = tag[tag.index('}') + 1:]
+        transform = parent_transform
+        value = element.get('transform')
+        if value:
+            transform = multiply(parent_transform, parse_transform(value))
+        rendered = rendered and tag not in NON_RENDERED
+        style = parent_style
+        if resolver is not None:
+            style = resolver.computed(element, tag, parent_style)
+            rendered = rendered and style.get('display') != 'none'
+
+        if tag in SHAPE_TAGS:
+            yield index, element, tag, transform, rendered, style
+            index += 1
+        if len(element):
+            # Reversed so children are visited in document order
+            stack.extend([(child, transform, rendered, style) for child in reversed(element)])
+
+
+class SegmentGrid:
+    """
+    Uniform grid over segment bounding boxes.
+
+    The cell size starts at the median segment length and grows until the
+    number of (segment, cell) entries stays proportional to the number of
+    segments, so long diagonal segments cannot blow up the index.
+
+    Args:
+        x0, y0, x1, y1 (ndarray): Segment end points
+        padding (float): Added around each bounding box (the match tolerance)
+    """
+
+    def __init__(self, x0, y0, x1, y1, padding=0.0):
+        self.count = len(x0)
+        min_x = np.minimum(x0, x1) - padding
+        max_x = np.maximum(x0, x1) + padding
+        min_y = np.minimum(y0, y1) - padding
+        max_y = np.maximum(y0, y1) + padding
+
+        self.origin = (float(min_x.min()), float(min_y.min())) if self.count else (0.0, 0.0)
+        extent = max(float(max_x.max()) - self.origin[0], float(max_y.max()) - self.origin[1], 1e-9) \
+            if self.count else 1.0
+        lengths = np.hypot(x1 - x0, y1 - y0)
+        cell = max(float(np.median(lengths)) if self.count else 1.0, extent / 4096, 1e-9)
+
+        while True:
+            cx0 = ((min_x - self.origin[0]) // cell).astype(np.int64)
+            cx1 = ((max_x - self.origin[0]) // cell).astype(np.int64)
+            cy0 = ((min_y - self.origin[1]) // cell).astype(np.int64)
+            cy1 = ((max_y - self.origin[1]) // cell).astype(np.int64)
+            widths = cx1 - cx0 + 1
+            cells = widths * (cy1 - cy0 + 1)
+            if cells.sum() <= 4 * max(self.count, 1) or cell >= extent:
+                break
+            cell *= 2
+
+        self.cell_size = cell
+        columns = int(cx1.max()) + 1 if self.count else 1
+        segment = np.repeat(np.arange(self.count), cells)
+        offset = np.arange(len(segment)) - np.repeat(np.cumsum(cells) - cells, cells)
+        cell_x = cx0[segment] + offset % widths[segment]
+        cell_y = cy0[segment] + offset // widths[segment]
+        cell_id = cell_y * columns + cell_x
+
+        # One packed sort (much faster than an argsort) groups the entries by cell
+        packed = np.sort(cell_id * max(self.count, 1) + segment)
+        self._cell_id = packed // max(self.count, 1)
+        self._segment = packed % max(self.count, 1)
+
+    @property
+    def occupied_cells(self):
+        if not len(self._cell_id):
+            return 0
+        return int(np.count_nonzero(np.diff(self._cell_id)) + 1)
+
+    def candidate_pairs(self):
+        """
+        Pairs of segments sharing at least one cell.
+
+        Returns:
+            tuple: (first, second) index arrays with first < second, unique
+        """
+        firsts = []
+        seconds = []
+        cell_id = self._cell_id
+        # Positions whose cell continues ``distance`` entries further on;
+        # entries are sorted by cell, so the set only shrinks
+        active = np.arange(len(cell_id) - 1)
+        distance = 1
+        while len(active):
+            active = active[active + distance < len(cell_id)]
+            active = active[cell_id[active + distance] == cell_id[active]]
+            firsts.append(self._segment[active])
+            seconds.append(self._segment[active + distance])
+            distance += 1
+        if not firsts:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        first = np.concatenate(firsts)
+        second = np.concatenate(seconds)
+        low, high = np.minimum(first, second), np.maximum(first, second)
+        keys = np.sort(low * self.count + high)
+        keys = keys[np.concatenate(([True], keys[1:] != keys[:-1]))]
+        return keys // self.count, keys % self.count
+
+
+def collinear_overlaps(x0, y0, x1, y1, first, second, tolerance):
+    """
+    Length by which each candidate pair of segments runs along the same line.
+
+    The longer segment of a pair is the reference line; both end points of
+    the other must lie within ``tolerance`` of it.
+
+    Returns:
+        ndarray: Overlap length per pair (0 where they do not overlap)
+    """
+    lengths = np.hypot(x1 - x0, y1 - y0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dir_x = (x1 - x0) / lengths
+        dir_y = (y1 - y0) / lengths
+
+    # Cheap pre-filter: collinear segments are (nearly) parallel
+    length_a, length_b = lengths[first], lengths[second]
+    shorter = np.minimum(length_a, length_b)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        parallel = np.abs(dir_x[first] * dir_y[second] - dir_y[first] * dir_x[second]) \
+            <= 2 * tolerance / shorter + 1e-9
+    overlap = np.zeros(len(first))
+    candidates = np.flatnonzero(parallel)
+    first, second = first[candidates], second[candidates]
+    length_a, length_b = length_a[candidates], length_b[candidates]
+
+    swap = length_b > length_a
+    ref = np.where(swap, second, first)
+    other = np.where(swap, first, second)
+    ref_length = np.maximum(length_a, length_b)
+    ux, uy = dir_x[ref], dir_y[ref]
+    ax, ay = x0[other] - x0[ref], y0[other] - y0[ref]
+    bx, by = x1[other] - x0[ref], y1[other] - y0[ref]
+
+    on_line = (np.abs(ux * ay - uy * ax) <= tolerance) & (np.abs(ux * by - uy * bx) <= tolerance)
+    t0, t1 = ux * ax + uy * ay, ux * bx + uy * by
+    length = np.minimum(ref_length, np.maximum(t0, t1)) - np.maximum(0.0, np.minimum(t0, t1))
+    overlap[candidates] = np.where(on_line & (length > tolerance), length, 0.0)
+    return np.nan_to_num(overlap)
+
+
+def _shape_hashes(q, shape_of):
+    """
+    Order-independent hash of each shape's snapped segments.
+
+    Every segment is hashed on its own and the hashes of a shape are summed
+    (with wrap-around), so the same set of segments in any order and
+    direction gives the same key.
+    """
+    # Direction-independent: the lexicographically smaller end point first
+    flip = (q[:, 0] > q[:, 2]) | ((q[:, 0] == q[:, 2]) & (q[:, 1] > q[:, 3]))
+    q = np.where(flip[:, None], q[:, [2, 3, 0, 1]], q).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        h1 = np.zeros(len(q), dtype=np.uint64)
+        h2 = np.zeros(len(q), dtype=np.uint64)
+        for column, (m1, m2) in enumerate(((0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F),
+                                           (0xBF58476D1CE4E5B9, 0x165667B19E3779F9),
+                                           (0x94D049BB133111EB, 0x27D4EB2F165667C5),
+                                           (0xD6E8FEB86659FD93, 0xFF51AFD7ED558CCD))):
+            h1 = (h1 ^ q[:, column]) * np.uint64(m1)
+            h2 = (h2 + q[:, column]) * np.uint64(m2)
+            h1 ^= h1 >> np.uint64(29)
+            h2 ^= h2 >> np.uint64(31)
+        starts = np.flatnonzero(np.concatenate(([True], shape_of[1:] != shape_of[:-1])))
+        sum1 = np.add.reduceat(h1, starts)
+        sum2 = np.add.reduceat(h2, starts)
+    counts = np.diff(np.append(starts, len(q)))
+    return np.stack([counts.astype(np.uint64), sum1, sum2], axis=1), shape_of[starts]
+
+
+def analyze_geometry(root, tolerance=0.01, is_cut=None, max_reported=100):
+    """
+    Cut length, duplicated shapes and overlapping strokes of a document.
+
+    Shapes are only parsed one by one; transforms, lengths, duplicate keys
+    and the overlap search all run on flat arrays of every segment.
+
+    Args:
+        root: Parsed SVG root element
+        tolerance (float): Distance in user units under which points match
+        is_cut (callable): ``is_cut(style)`` tells from a shape's effective
+            style whether it is cut; defaults to every rendered shape
+        max_reported (int): Longest list of duplicates/overlaps returned
+
+    Returns:
+        dict: Geometry report (lengths in user units)
+
+    Raises:
+        ValueError: If ``tolerance`` is not a positive finite number
+    """
+    if not 0 < tolerance < float('inf'):
+        raise ValueError(f"Tolerance must be a positive distance, got {tolerance}")
+    ids = []
+    transforms = []
+    chunks = []
+    chunk_shape = []
+
+    resolver = StyleResolver(root) if is_cut is not None else None
+    for index, element, tag, transform, rendered, style in iter_shapes(root, resolver):
+        if not rendered or (is_cut is not None and not is_cut(style)):
+            continue
+        polylines = shape_polylines(element, tag)
+        if not polylines:
+            continue
+        shape = len(ids)
+        ids.append(element.get('id', f"{tag}_{index + 1}"))
+        transforms.append(transform)
+        chunks.extend(polylines)
+        chunk_shape.extend([shape] * len(polylines))
+
+    report = {
+        'shapes': len(ids),
+        'segments': 0,
+        'cut_length': 0.0,
+        'duplicate_length': 0.0,
+        'overlap_length': 0.0,
+        'unique_cut_length': 0.0,
+        'duplicates': [],
+        'duplicate_count': 0,
+        'overlaps': [],
+        'overlap_count': 0,
+        'tolerance': tolerance,
+        'index': {'cell_size': 0.0, 'cells': 0},
+    }
+    if not ids:
+        return report
+
+    # All points, with their shape's transform applied
+    sizes = np.fromiter((len(chunk) for chunk in chunks), dtype=np.int64, count=len(chunks))
+    points = np.concatenate(chunks)
+    point_shape = np.repeat(np.asarray(chunk_shape, dtype=np.int64), sizes)
+    a, b, c, d, e, f = np.asarray(transforms, dtype=float).T[:, point_shape]
+    px = a * points[:, 0] + c * points[:, 1] + e
+    py = b * points[:, 0] + d * points[:, 1] + f
+
+    # A segment joins each point to the next one of the same polyline
+    is_start = np.ones(len(points), dtype=bool)
+    is_start[np.cumsum(sizes) - 1] = False
+    starts = np.flatnonzero(is_start)
+    x0, y0, x1, y1 = px[starts], py[starts], px[starts + 1], py[starts + 1]
+    shape_of = point_shape[starts]
+    keep = (x0 != x1) | (y0 != y1)
+    x0, y0, x1, y1, shape_of = x0[keep], y0[keep], x1[keep], y1[keep], shape_of[keep]
+    lengths = np.hypot(x1 - x0, y1 - y0)
+    shape_length = np.bincount(shape_of, weights=lengths, minlength=len(ids))
+
+    # Exact copies: equal keys of snapped segments, first occurrence kept
+    q = np.round(np.stack([x0, y0, x1, y1], axis=1) / tolerance).astype(np.int64)
+    keys, keyed_shapes = _shape_hashes(q, shape_of)
+    order = np.lexsort((keyed_shapes, keys[:, 2], keys[:, 1], keys[:, 0]))
+    keys, keyed_shapes = keys[order], keyed_shapes[order]
+    same = np.all(keys[1:] == keys[:-1], axis=1)
+    group_start = np.concatenate(([True], ~same))
+    original = keyed_shapes[np.flatnonzero(group_start)[np.cumsum(group_start) - 1]]
+    copies = keyed_shapes[~group_start]
+    copy_of = original[~group_start]
+
+    groups = {}
+    for copy, source in zip(copies.tolist(), copy_of.tolist()):
+        groups.setdefault(source, []).append(copy)
+    report['duplicates'] = [
+        {'ids': [ids[source]] + [ids[copy] for copy in group], 'length': float(shape_length[source])}
+        for source, group in sorted(groups.items(), key=lambda item: -shape_length[item[0]] * len(item[1]))
+    ][:max_reported]
+    report['duplicate_count'] = int(len(copies))
+    duplicate_length = float(shape_length[copies].sum())
+
+    # Partial overlaps among the remaining shapes
+    is_copy = np.zeros(len(ids), dtype=bool)
+    is_copy[copies] = True
+    unique = ~is_copy[shape_of]
+    ux0, uy0, ux1, uy1, ushape = x0[unique], y0[unique], x1[unique], y1[unique], shape_of[unique]
+
+    grid = SegmentGrid(ux0, uy0, ux1, uy1, padding=tolerance)
+    first, second = grid.candidate_pairs()
+    overlap = collinear_overlaps(ux0, uy0, ux1, uy1, first, second, tolerance)
+    hit = overlap > 0
+    shape_a, shape_b = ushape[first[hit]], ushape[second[hit]]
+    low, high = np.minimum(shape_a, shape_b), np.maximum(shape_a, shape_b)
+    pair_keys, inverse = np.unique(low * len(ids) + high, return_inverse=True)
+    pair_length = np.bincount(inverse, weights=overlap[hit], minlength=len(pair_keys))
+    top = np.argsort(-pair_length)[:max_reported]
+    report['overlaps'] = [
+        {'ids': [ids[int(pair_keys[i] // len(ids))], ids[int(pair_keys[i] % len(ids))]],
+         'length': float(pair_length[i])}
+        for i in top
+    ]
+    report['overlap_count'] = int(len(pair_keys))
+
+    cut_length = float(lengths.sum())
+    overlap_length = float(pair_length.sum())
+    report.update(
+        segments=int(len(lengths)),
+        cut_length=cut_length,
+        duplicate_length=duplicate_length,
+        overlap_length=overlap_length,
+        unique_cut_length=max(0.0, cut_length - duplicate_length - overlap_length),
+        index={'cell_size': grid.cell_size, 'cells': grid.occupied_cells},
+    )
+    return report
@@ -0,0 +1,189 @@
+"""Styled vector SVG rendering for QR codes with merged module paths."""
+
+import io
+import math
+import base64
+from xml.sax.saxutils import quoteattr
+
+from .qr_geometry import merged_rectangles, rounded_runs, dark_modules
+
+
+def _svg_color(color):
+    """Format an RGB tuple or color string for an SVG paint attribute."""
+    if isinstance(color, (tuple, list)):
+        return '#{:02x}{:02x}{:02x}'.format(*color[:3])
+    return color
+
+
+def _num(value):
+    """Format a coordinate compactly (no trailing zeros)."""
+    if value == int(value):
+        return str(int(value))
+    return f"{value:.4f}".rstrip('0').rstrip('.')
+
+
+class QRSvgRenderer:
+    """
+    Renders a QR module matrix directly to SVG.
+
+    Dark modules are merged into a single ``<path>`` instead of one
+    ``<rect>`` per module: square modules are grouped into rectangles
+    (horizontal runs stacked over identical runs in following rows),
+    rounded modules into runs with per-corner arcs, and circles into arc
+    subpaths. Gradients map onto ``<radialGradient>``/``<linearGradient>``
+    definitions that reproduce qrcode's PIL color masks.
+    """
+
+    def __init__(self, box_size=10, border=4):
+        self.box_size = box_size
+        self.border = border
+
+    def render(self, modules, module_drawer='square', fill_color='black',
+               back_color='white', gradient=None, logo_image=None, logo_size=50):
+        """
+        Render a module matrix as an SVG document.
+
+        Args:
+            modules (list): Square matrix of booleans (True = dark), without border
+            module_drawer (str): 'square', 'rounded', or 'circle'
+            fill_color: Foreground color (hex string, name or RGB tuple)
+            back_color: Background color (hex string, name or RGB tuple)
+            gradient (dict): Optional {'type': 'radial' | 'square',
+                'center_color': ..., 'edge_color': ...}
+            logo_image (PIL.Image): Optional logo embedded at the center
+            logo_size (int): Maximum logo edge in pixels, as for PNG output
+
+        Returns:
+            str: SVG document
+        """
+        count = len(modules)
+        size = count + 2 * self.border
+        dimension = _num(size * self.box_size / 10)
+
+        if module_drawer == 'rounded':
+            path_data = self._rounded_path(modules)
+        elif module_drawer == 'circle':
+            path_data = self._circle_path(modules)
+        else:
+            path_data = self._square_path(modules)
+
+        defs = []
+        body = [f'<rect width="{size}" height="{size}" fill={quoteattr(_svg_color(back_color))}/>']
+
+        if gradient and gradient.get('type') == 'square':
+            # Chebyshev-distance gradient: four triangles, each a linear gradient
+            # running from the center towards its own edge
+            defs.append(f'<path id="qr-modules" d="{path_data}"/>')
+            half = _num(size / 2)
+            triangles = {
+                'n': (f'0,0 {size},0 {half},{half}', (half, half, half, 0)),
+                'e': (f'{size},0 {size},{size} {half},{half}', (half, half, size, half)),
+                's': (f'0,{size} {size},{size} {half},{half}', (half, half, half, size)),
+                'w': (f'0,0 0,{size} {half},{half}', (half, half, 0, half)),
+            }
+            for side, (points, (x1, y1, x2, y2)) in triangles.items():
+                defs.append(
+                    f'<linearGradient id="qr-grad-{side}" gradientUnits="userSpaceOnUse" '
+                    f'x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}">'
+                    f'{self._gradient_stops(gradient)}</linearGradient>'
+                    f'<clipPath id="qr-clip-{side}"><polygon points="{points}"/></clipPath>'
+                )
+                body.append(f'<use xlink:href="#qr-modules" fill="url(#qr-grad-{side})" '
+                            f'clip-path="url(#qr-clip-{side})"/>')
+        else:
+            if gradient and gradient.get('type') == 'radial':
+                center = _num(size / 2)
+                radius = _num(math.sqrt(2) * size / 2)
+                defs.append(
+                    f'<radialGradient id="qr-grad" gradientUnits="userSpaceOnUse" '
+                    f'cx="{center}" cy="{center}" r="{radius}">'
+                    f'{self._gradient_stops(gradient)}</radialGradient>'
+                )
+                fill = 'url(#qr-grad)'
+            else:
+                fill = _svg_color(fill_color)
+            body.append(f'<path d="{path_data}" fill={quoteattr(fill)}/>')
+
+        if logo_image is not None:
+            body.append(self._logo_element(logo_image, size, logo_size))
+
+        # Axis-aligned rectangles render without seams when antialiasing is off
+        rendering = ' shape-rendering="crispEdges"' if module_drawer not in ('rounded', 'circle') else ''
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n',
+            f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+            f'width="{dimension}mm" height="{dimension}mm" viewBox="0 0 {size} {size}"{rendering}>',
+        ]
+        if defs:
+            parts.append('<defs>' + ''.join(defs) + '</defs>')
+        parts.extend(body)
+        parts.append('</svg>\n')
+        return ''.join(parts)
+
+    def _square_path(self, modules):
+        """Merged rectangles; the closing edge of each is implied by 'z'."""
+        offset = self.border
+        return ''.join(
+            f'M{x + offset} {y + offset}h{width}v{height}h{-width}z'
+            for x, y, width, height in merged_rectangles(modules)
+        )
+
+    def _rounded_path(self, modules):
+        """Horizontal runs with arcs on corners that RoundedModuleDrawer rounds."""
+        offset = self.border
+        commands = []
+        for x, y, width, (nw, ne, se, sw) in rounded_runs(modules):
+            d = [f'M{_num(x + offset + nw)} {y + offset}']
+            top = width - nw - ne
+            if top:
+                d.append(f'h{_num(top)}')
+            if ne:
+                d.append('a.5 .5 0 0 1 .5 .5')
+            right = 1 - ne - se
+            if right:
+                d.append(f'v{_num(right)}')
+            if se:
+                d.append('a.5 .5 0 0 1 -.5 .5')
+            bottom = width - se - sw
+            if bottom:
+                d.append(f'h{_num(-bottom)}')
+            if sw:
+                d.append('a.5 .5 0 0 1 -.5 -.5')
+            left = 1 - sw - nw
+            if left and nw:
+                # Without a rounded NW corner 'z' draws the left edge
+                d.append(f'v{_num(-left)}')
+            if nw:
+                d.append('a.5 .5 0 0 1 .5 -.5')
+            d.append('z')
+            commands.append(''.join(d))
+        return ''.join(commands)
+
+    def _circle_path(self, modules):
+        """One circular subpath (two half arcs) per dark module."""
+        offset = self.border
+        return ''.join(
+            f'M{x + offset} {_num(y + offset + 0.5)}a.5 .5 0 1 0 1 0a.5 .5 0 1 0 -1 0'
+            for x, y in dark_modules(modules)
+        )
+
+    @staticmethod
+    def _gradient_stops(gradient):
+        return (f'<stop offset="0" stop-color="{_svg_color(gradient["center_color"])}"/>'
+                f'<stop offset="1" stop-color="{_svg_color(gradient["edge_color"])}"/>')
+
+    def _logo_element(self, logo_image, size, logo_size):
+        """Embed the logo as a base64 PNG centered on the code."""
+        logo = logo_image.copy()
+        logo.thumbnail((logo_size, logo_size))
+        logo_buf = io.BytesIO()
+        logo.save(logo_buf, format='PNG')
+        encoded = base64.b64encode(logo_buf.getvalue()).decode('ascii')
+
+        # Same pixel footprint as the PNG path, expressed in module units
+        width = logo.size[0] / self.box_size
+        height = logo.size[1] / self.box_size
+        x = (size - width) / 2
+        y = (size - height) / 2
+        return (f'<image x="{_num(x)}" y="{_num(y)}" width="{_num(width)}" height="{_num(height)}" '
+                f'xlink:href="data:image/png;base64,{encoded}"/>')
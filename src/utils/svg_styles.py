@@ -0,0 +1,234 @@
+"""Effective (cascaded and inherited) styles of SVG elements.
+
+Colors and stroke settings can come from presentation attributes,
+``style="..."`` attributes, ``<style>`` sheets (as written by Illustrator)
+and ancestor groups (as written by Inkscape). ``StyleResolver`` computes
+an element's style from its own declarations and its parent's computed
+style, so a single top-down walk resolves a whole document.
+"""
+
+import re
+import functools
+
+
+# Properties the checker looks at
+PROPERTIES = frozenset((
+    'fill', 'stroke', 'stroke-width', 'stroke-opacity', 'fill-opacity', 'opacity',
+    'color', 'display', 'visibility',
+))
+# The subset children inherit from their parent
+INHERITED = frozenset((
+    'fill', 'stroke', 'stroke-width', 'stroke-opacity', 'fill-opacity', 'color', 'visibility',
+))
+
+_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_RULE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+_SIMPLE_SELECTOR = re.compile(r'^(\*|[A-Za-z][\w-]*)?((?:[.#][\w-]+)*)$')
+_SELECTOR_PART = re.compile(r'([.#])([\w-]+)')
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_declarations(text):
+    """
+    Parse a declaration block (a ``style`` attribute or rule body).
+
+    Exports repeat the same style strings thousands of times, so results
+    are cached.
+
+    Returns:
+        tuple: ((property, value, important), ...) for the known properties
+    """
+    declarations = []
+    for declaration in text.split(';'):
+        name, sep, value = declaration.partition(':')
+        if not sep:
+            continue
+        name = name.strip().lower()
+        if name not in PROPERTIES:
+            continue
+        value = value.strip()
+        important = value.lower().endswith('!important')
+        if important:
+            value = value[:-len('!important')].rstrip()
+        if value:
+            declarations.append((name, value, important))
+    return tuple(declarations)
+
+
+def _strip_at_rules(css):
+    """Drop @media/@font-face/... blocks and @import-like statements."""
+    out = []
+    i = 0
+    while True:
+        at = css.find('@', i)
+        if at < 0:
+            out.append(css[i:])
+            return ''.join(out)
+        out.append(css[i:at])
+        brace, semicolon = css.find('{', at), css.find(';', at)
+        if semicolon >= 0 and (brace < 0 or semicolon < brace):
+            i = semicolon + 1
+            continue
+        if brace < 0:
+            return ''.join(out)
+        depth = 0
+        i = brace
+        while i < len(css):
+            if css[i] == '{':
+                depth += 1
+            elif css[i] == '}':
+                depth -= 1
+                if depth == 0:
+                    break
+            i += 1
+        i += 1
+
+
+class Stylesheet:
+    """
+    Rules from a document's ``<style>`` elements.
+
+    Selectors made of a type, classes and an id (``rect``, ``.cls-1``,
+    ``path.cut``, ``#outline``, ``*``) are supported; selectors with
+    combinators or pseudo-classes are skipped and counted in
+    ``unsupported_selectors``.
+
+    Args:
+        css (str): Concatenated style sheet text
+    """
+
+    def __init__(self, css=''):
+        self.rules = []
+        self.unsupported_selectors = 0
+        css = _strip_at_rules(_COMMENT.sub('', css))
+        for order, (selectors, body) in enumerate(_RULE.findall(css)):
+            declarations = parse_declarations(body)
+            if not declarations:
+                continue
+            for selector in selectors.split(','):
+                parsed = self._parse_selector(selector.strip())
+                if parsed is None:
+                    self.unsupported_selectors += 1
+                    continue
+                tag, ids, classes = parsed
+                specificity = (len(ids), len(classes), 1 if tag else 0)
+                self.rules.append((specificity, order, tag, ids, classes, declarations))
+        # Cascade order: lower specificity first, then source order
+        self.rules.sort(key=lambda rule: (rule[0], rule[1]))
+        self._cache = {}
+
+    @staticmethod
+    def _parse_selector(selector):
+        match = _SIMPLE_SELECTOR.match(selector)
+        if not selector or match is None:
+            return None
+        tag = match.group(1)
+        ids = frozenset(name for kind, name in _SELECTOR_PART.findall(match.group(2)) if kind == '#')
+        classes = frozenset(name for kind, name in _SELECTOR_PART.findall(match.group(2)) if kind == '.')
+        return (None if tag in (None, '*') else tag), ids, classes
+
+    def match(self, tag, class_attr, element_id):
+        """
+        Declarations of all rules matching an element, in cascade order.
+
+        Results are cached per (tag, class, id) combination, which repeats
+        heavily in exported drawings.
+
+        Returns:
+            tuple: (normal declarations, important declarations)
+        """
+        key = (tag, class_attr, element_id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        classes = frozenset(class_attr.split()) if class_attr else frozenset()
+        normal = []
+        important = []
+        for _, _, rule_tag, ids, rule_classes, declarations in self.rules:
+            if rule_tag is not None and rule_tag != tag:
+                continue
+            if ids and (element_id is None or ids != {element_id}):
+                continue
+            if not rule_classes <= classes:
+                continue
+            for name, value, is_important in declarations:
+                (important if is_important else normal).append((name, value))
+        result = (tuple(normal), tuple(important))
+        self._cache[key] = result
+        return result
+
+
+class StyleResolver:
+    """
+    Computes effective styles, one element at a time, parent first.
+
+    Args:
+        root: Parsed SVG root element; its ``<style>`` elements are read once
+        css (str): Style sheet text to use instead, for documents that are
+            streamed rather than parsed into a tree
+    """
+
+    def __init__(self, root=None, css=None):
+        if css is None:
+            css = '\n'.join(element.text or '' for element in root.iter('{*}style', 'style'))
+        self.stylesheet = Stylesheet(css)
+
+    def computed(self, element, tag, parent):
+        """
+        Computed style of an element.
+
+        Precedence, lowest first: inherited values, presentation attributes,
+        style sheet rules, the ``style`` attribute, then ``!important`` rules
+        and declarations. ``inherit`` takes the parent's value and
+        ``currentColor`` the computed ``color``.
+
+        Args:
+            element: The lxml element
+            tag (str): Its local tag name
+            parent (dict): The parent's computed style
+
+        Returns:
+            dict: Property -> value; the parent's dict itself (not a copy)
+                when the element declares nothing, so it must not be mutated
+        """
+        declared = []
+        attrib = element.attrib
+        for name in PROPERTIES.intersection(attrib.keys()):
+            declared.append((name, attrib[name].strip()))
+        important = []
+        if self.stylesheet.rules:
+            normal, important = self.stylesheet.match(tag, attrib.get('class'), attrib.get('id'))
+            declared.extend(normal)
+            important = list(important)
+        style_attr = attrib.get('style')
+        if style_attr:
+            for name, value, is_important in parse_declarations(style_attr):
+                (important if is_important else declared).append((name, value))
+        declared.extend(important)
+
+        if INHERITED.issuperset(parent):
+            inherited = parent
+        else:
+            inherited = {name: value for name, value in parent.items() if name in INHERITED}
+        if not declared:
+            return inherited
+
+        style = dict(inherited)
+        for name, value in declared:
+            if value == 'inherit':
+                if name in parent:
+                    style[name] = parent[name]
+                else:
+                    style.pop(name, None)
+            else:
+                style[name] = value
+        for name in ('fill', 'stroke'):
+            if style.get(name, '').lower() == 'currentcolor':
+                style[name] = style.get('color', 'black')
+        return style
+
+
+def has_stroke(style):
+    """Whether a computed style draws a stroke (i.e. the shape is a cut line)."""
+    stroke = style.get('stroke')
+    return bool(stroke) and stroke.lower() not in ('none', 'transparent')
@@ -0,0 +1,133 @@
+"""Conversion of SVG lengths to physical millimetres."""
+
+import re
+import functools
+
+import numpy as np
+
+
+MM_PER_PX = 25.4 / 96
+# User units (CSS px) per unit; '' is a plain number, i.e. user units
+PX_PER_UNIT = {
+    '': 1.0,
+    'px': 1.0,
+    'mm': 96 / 25.4,
+    'cm': 96 / 2.54,
+    'q': 96 / 101.6,
+    'in': 96.0,
+    'pt': 96 / 72,
+    'pc': 16.0,
+}
+
+_LENGTH = re.compile(r'^\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*([a-zA-Z]*|%)\s*$')
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_length(value):
+    """
+    Split a length into its number and unit.
+
+    Returns:
+        tuple: (number, unit) with the unit lower-cased ('' for plain
+            numbers), or None if ``value`` is not a length
+    """
+    if value is None:
+        return None
+    match = _LENGTH.match(value)
+    if match is None:
+        return None
+    return float(match.group(1)), match.group(2).lower()
+
+
+def to_user_units(value, reference=None):
+    """
+    Convert a length to user units.
+
+    Args:
+        value (str): Length such as '1mm', '3.7795px' or '2'
+        reference (float): What 100% is, in user units
+
+    Returns:
+        float: The length in user units, or None for unknown units (and
+            percentages without a reference)
+    """
+    parsed = parse_length(value)
+    if parsed is None:
+        return None
+    number, unit = parsed
+    if unit == '%':
+        return number * reference / 100 if reference else None
+    factor = PX_PER_UNIT.get(unit)
+    return number * factor if factor is not None else None
+
+
+def document_scale(root):
+    """
+    Physical size of the root element's user units.
+
+    The root ``width``/``height`` give the printed size; a ``viewBox``
+    maps its user units onto it (uniformly, as for the default
+    ``preserveAspectRatio``). Without an absolute size a user unit is
+    one CSS pixel (1/96 in).
+
+    Returns:
+        tuple: (millimetres per user unit, user units that 100% of a
+            stroke width refers to, or None)
+    """
+    viewbox = [float(n) for n in _NUMBER.findall(root.get('viewBox', ''))]
+    width = to_user_units(root.get('width'))
+    height = to_user_units(root.get('height'))
+
+    if len(viewbox) == 4 and viewbox[2] > 0 and viewbox[3] > 0:
+        box_width, box_height = viewbox[2], viewbox[3]
+        scales = [size / box for size, box in ((width, box_width), (height, box_height)) if size]
+        scale = min(scales) if scales else 1.0
+    else:
+        box_width, box_height = width, height
+        scale = 1.0
+
+    reference = None
+    if box_width and box_height:
+        # Percentages of stroke widths refer to the normalized viewport diagonal
+        reference = ((box_width ** 2 + box_height ** 2) / 2) ** 0.5
+    return scale * MM_PER_PX, reference
+
+
+def stroke_widths_mm(root, shapes):
+    """
+    Printed stroke widths of many shapes at once.
+
+    Only the unit lookup runs per shape (cached per distinct value); the
+    scaling by transforms and the document is done on arrays. A shape's
+    transform scales its stroke by the square root of its determinant,
+    the average for non-uniform scales.
+
+    Args:
+        root: Parsed SVG root element
+        shapes (list): (transform, style) pairs, as yielded by
+            ``iter_shapes`` with a style resolver
+
+    Returns:
+        ndarray: Widths in millimetres, NaN where the width cannot be read
+    """
+    mm_per_unit, reference = document_scale(root)
+    widths = np.fromiter(
+        ((width if width is not None else np.nan)
+         for width in (to_user_units(style.get('stroke-width', '1'), reference) for _, style in shapes)),
+        dtype=float, count=len(shapes),
+    )
+    if not len(shapes):
+        return widths
+    a, b, c, d = np.asarray([transform[:4] for transform, _ in shapes], dtype=float).T
+    return widths * np.sqrt(np.abs(a * d - b * c)) * mm_per_unit
+
+
+def width_compliance(widths_mm, target_mm=1.0, tolerance_mm=0.01):
+    """
+    Which widths are within a tolerance of the target.
+
+    Returns:
+        ndarray: Boolean per width; unreadable (NaN) widths never comply
+    """
+    return np.abs(np.asarray(widths_mm, dtype=float) - target_mm) <= tolerance_mm
@@ -0,0 +1,390 @@
+"""PDF and EPS output for QR codes, drawn directly from the module matrix."""
+
+import io
+import zlib
+import math
+
+from PIL import ImageColor
+
+from .qr_geometry import (merged_rectangles, rounded_runs, dark_modules,
+                          rounded_run_outline, circle_outline)
+
+
+MM_TO_PT = 72 / 25.4
+
+
+def _fmt(value):
+    """Format a number compactly for PDF/PostScript content."""
+    if value == int(value):
+        return str(int(value))
+    return f"{value:.4f}".rstrip('0').rstrip('.')
+
+
+def _rgb(color):
+    """Normalize an RGB tuple, hex string or color name to 0-1 floats."""
+    if isinstance(color, str):
+        color = ImageColor.getrgb(color)
+    return tuple(channel / 255 for channel in color[:3])
+
+
+def _rgb_operands(color):
+    return ' '.join(_fmt(round(channel, 4)) for channel in _rgb(color))
+
+
+class PDFWriter:
+    """
+    Minimal incremental PDF writer.
+
+    Objects are written to the output as soon as they are added, so a
+    document with many pages only keeps the byte offsets and page object
+    numbers in memory.
+    """
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self.offsets = [0]
+        self.page_refs = []
+        self.position = 0
+        # Embedded images by source id and size, with the source kept alive so ids stay unique
+        self._images = {}
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        # Object numbers 1 and 2 are reserved for the catalog and page tree
+        self.offsets.extend([None, None])
+
+    def _write(self, data):
+        self.fileobj.write(data)
+        self.position += len(data)
+
+    def reserve(self):
+        """Reserve an object number to be written later."""
+        self.offsets.append(None)
+        return len(self.offsets) - 1
+
+    def add_object(self, body, number=None, stream=None):
+        """
+        Write an object (optionally with a stream) and return its number.
+
+        Args:
+            body (str): Dictionary or value source
+            number (int): Previously reserved object number
+            stream (bytes): Stream data; /Length is appended to ``body``
+        """
+        if number is None:
+            number = self.reserve()
+        self.offsets[number] = self.position
+        if stream is not None:
+            body = body[:-2] + f' /Length {len(stream)} >>'
+            self._write(f'{number} 0 obj\n{body}\nstream\n'.encode('latin-1'))
+            self._write(stream)
+            self._write(b'\nendstream\nendobj\n')
+        else:
+            self._write(f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1'))
+        return number
+
+    def add_page(self, width, height, content, resources='<< >>'):
+        """
+        Add a page with a Flate-compressed content stream.
+
+        Args:
+            width (float): Page width in points
+            height (float): Page height in points
+            content (str): Content stream operators
+            resources (str): Resource dictionary source
+        """
+        content_ref = self.add_object('<< /Filter /FlateDecode >>',
+                                      stream=zlib.compress(content.encode('latin-1')))
+        page_ref = self.add_object(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_fmt(width)} {_fmt(height)}] '
+            f'/Resources {resources} /Contents {content_ref} 0 R >>'
+        )
+        self.page_refs.append(page_ref)
+        return page_ref
+
+    def add_image(self, image, source=None):
+        """
+        Embed a PIL image as a Flate-compressed RGB image XObject.
+
+        An image is embedded only once per document; later calls with the
+        same image (or a same-sized image derived from the same ``source``)
+        return the existing object number.
+
+        Args:
+            image (PIL.Image): Image to embed
+            source: Object the image was derived from, such as the logo
+                before thumbnailing
+
+        Returns:
+            int: Object number of the image
+        """
+        source = image if source is None else source
+        key = (id(source), image.size)
+        if key in self._images:
+            return self._images[key][1]
+        rgb = image.convert('RGB')
+        number = self.add_object(
+            f'<< /Type /XObject /Subtype /Image /Width {rgb.size[0]} /Height {rgb.size[1]} '
+            f'/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode >>',
+            stream=zlib.compress(rgb.tobytes())
+        )
+        self._images[key] = (source, number)
+        return number
+
+    def close(self):
+        """Write the page tree, catalog, xref table and trailer."""
+        kids = ' '.join(f'{ref} 0 R' for ref in self.page_refs)
+        self.add_object(f'<< /Type /Pages /Kids [{kids}] /Count {len(self.page_refs)} >>', number=2)
+        self.add_object('<< /Type /Catalog /Pages 2 0 R >>', number=1)
+
+        xref_position = self.position
+        lines = [f'xref\n0 {len(self.offsets)}\n', '0000000000 65535 f \n']
+        for offset in self.offsets[1:]:
+            lines.append(f'{offset:010d} 00000 n \n')
+        lines.append(f'trailer\n<< /Size {len(self.offsets)} /Root 1 0 R >>\n'
+                     f'startxref\n{xref_position}\n%%EOF\n')
+        self._write(''.join(lines).encode('latin-1'))
+
+
+class PDFPageResources:
+    """Names and writes the shadings, images and fonts used by one page."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.shadings = []
+        self.images = []
+        self.fonts = []
+
+    def shading(self, shading_dict):
+        """Write a shading object and return the operator that paints it."""
+        name = f'Sh{len(self.shadings)}'
+        self.shadings.append((name, self.writer.add_object(shading_dict)))
+        return f'/{name} sh'
+
+    def image(self, image, source=None):
+        """Embed an image (once per document) and return its XObject resource name."""
+        ref = self.writer.add_image(image, source)
+        for name, existing in self.images:
+            if existing == ref:
+                return name
+        name = f'Im{len(self.images)}'
+        self.images.append((name, ref))
+        return name
+
+    def font(self, base_font):
+        """Reference a standard Type 1 font and return its resource name."""
+        for name, ref in self.fonts:
+            if ref == base_font:
+                return name
+        name = f'F{len(self.fonts) + 1}'
+        self.fonts.append((name, base_font))
+        return name
+
+    def dictionary(self):
+        """Resource dictionary source for the page object."""
+        parts = []
+        if self.shadings:
+            parts.append('/Shading << ' + ' '.join(f'/{n} {ref} 0 R' for n, ref in self.shadings) + ' >>')
+        if self.images:
+            parts.append('/XObject << ' + ' '.join(f'/{n} {ref} 0 R' for n, ref in self.images) + ' >>')
+        if self.fonts:
+            parts.append('/Font << ' + ' '.join(
+                f'/{n} << /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>'
+                for n, base in self.fonts) + ' >>')
+        return '<< ' + ' '.join(parts) + ' >>'
+
+
+# Operator spellings per output language; the EPS prolog defines the
+# PDF-style short names so both share one drawing routine
+_PDF_OPS = {'clip': 'W n', 'save': 'q', 'restore': 'Q', 'fill': 'f'}
+_PS_OPS = {'clip': 'clip newpath', 'save': 'q', 'restore': 'Q', 'fill': 'f'}
+
+_EPS_PROLOG = """/qrdict 16 dict def qrdict begin
+/m {moveto} bind def /l {lineto} bind def /c {curveto} bind def /h {closepath} bind def
+/re {4 2 roll moveto 1 index 0 rlineto 0 exch rlineto neg 0 rlineto closepath} bind def
+/f {fill} bind def /rg {setrgbcolor} bind def /q {gsave} bind def /Q {grestore} bind def
+"""
+
+
+class QRVectorRenderer:
+    """
+    Renders QR module matrices as PDF pages or EPS files.
+
+    Geometry matches ``QRSvgRenderer``: merged rectangles for square
+    modules, Bezier-rounded runs for rounded modules and Bezier circles;
+    gradients become axial/radial shadings clipped to the modules.
+    """
+
+    def __init__(self, box_size=10, border=4):
+        self.box_size = box_size
+        self.border = border
+
+    def module_size_pt(self):
+        """Edge length of one module in points (box_size / 10 mm, as for SVG)."""
+        return self.box_size / 10 * MM_TO_PT
+
+    def page_size_pt(self, modules):
+        return (len(modules) + 2 * self.border) * self.module_size_pt()
+
+    def render_pdf(self, codes):
+        """
+        Render one PDF page per code.
+
+        Args:
+            codes (iterable): Dicts with a 'modules' matrix and optional
+                'module_drawer', 'fill_color', 'back_color', 'gradient' and
+                'logo_image' entries (see ``QRSvgRenderer.render``)
+
+        Returns:
+            bytes: The PDF document
+        """
+        buf = io.BytesIO()
+        writer = PDFWriter(buf)
+        for code in codes:
+            self.add_pdf_page(writer, **code)
+        writer.close()
+        return buf.getvalue()
+
+    def add_pdf_page(self, writer, modules, **style):
+        """Append a single code as a page of an open ``PDFWriter``."""
+        page = self.page_size_pt(modules)
+        scale = self.module_size_pt()
+        resources = PDFPageResources(writer)
+        content = [f'{_fmt(scale)} 0 0 {_fmt(-scale)} 0 {_fmt(page)} cm']
+        content.extend(self.pdf_code_ops(modules, resources, **style))
+        writer.add_page(page, page, '\n'.join(content) + '\n', resources=resources.dictionary())
+
+    def pdf_code_ops(self, modules, resources, module_drawer='square', fill_color='black',
+                     back_color='white', gradient=None, logo_image=None, logo_size=50):
+        """
+        PDF content operators for one code in module units.
+
+        The caller sets up a y-down coordinate system with one unit per
+        module (origin at the outer corner of the quiet zone).
+
+        Args:
+            modules (list): Module matrix without border
+            resources (PDFPageResources): Collects shadings and images for the page
+
+        Returns:
+            list: Content stream lines
+        """
+        content = self._draw(modules, module_drawer, fill_color, back_color, gradient,
+                             _PDF_OPS, resources.shading)
+        if logo_image is not None:
+            logo, x, y, width, height = self._logo_placement(logo_image, modules, logo_size)
+            name = resources.image(logo, source=logo_image)
+            content.append(f'q {_fmt(width)} 0 0 {_fmt(-height)} {_fmt(x)} {_fmt(y + height)} cm /{name} Do Q')
+        return content
+
+    def render_eps(self, modules, module_drawer='square', fill_color='black',
+                   back_color='white', gradient=None, logo_image=None, logo_size=50):
+        """
+        Render a single code as Encapsulated PostScript (LanguageLevel 3).
+
+        Returns:
+            bytes: The EPS document
+        """
+        page = self.page_size_pt(modules)
+        scale = self.module_size_pt()
+        bbox = math.ceil(page)
+
+        lines = [
+            '%!PS-Adobe-3.0 EPSF-3.0',
+            f'%%BoundingBox: 0 0 {bbox} {bbox}',
+            f'%%HiResBoundingBox: 0 0 {_fmt(page)} {_fmt(page)}',
+            '%%LanguageLevel: 3',
+            '%%Creator: Utility Tools QR Code Generator',
+            '%%EndComments',
+            _EPS_PROLOG.rstrip('\n'),
+            'save',
+            f'0 {_fmt(page)} translate {_fmt(scale)} {_fmt(-scale)} scale',
+        ]
+        lines.extend(self._draw(modules, module_drawer, fill_color, back_color, gradient,
+                                _PS_OPS, lambda shading_dict: f'{shading_dict} shfill'))
+
+        if logo_image is not None:
+            logo, x, y, width, height = self._logo_placement(logo_image, modules, logo_size)
+            logo = logo.convert('RGB')
+            w, h = logo.size
+            lines.append(
+                f'q {_fmt(x)} {_fmt(y)} translate {_fmt(width)} {_fmt(height)} scale /DeviceRGB setcolorspace '
+                f'<< /ImageType 1 /Width {w} /Height {h} /BitsPerComponent 8 /Decode [0 1 0 1 0 1] '
+                f'/ImageMatrix [{w} 0 0 {h} 0 0] /DataSource currentfile /ASCIIHexDecode filter >> image'
+            )
+            data = logo.tobytes().hex()
+            lines.extend(data[i:i + 78] for i in range(0, len(data), 78))
+            lines.append('> Q')
+
+        lines.extend(['restore', 'end', 'showpage', '%%EOF', ''])
+        return '\n'.join(lines).encode('latin-1')
+
+    def _draw(self, modules, module_drawer, fill_color, back_color, gradient, ops, shade):
+        """
+        Emit drawing operators in module units (y down, origin at the page corner).
+
+        ``shade`` turns a shading dictionary into the operator that paints
+        it, which differs between PDF (named resource) and PostScript.
+        """
+        size = len(modules) + 2 * self.border
+        out = [f'{_rgb_operands(back_color)} rg 0 0 {size} {size} re {ops["fill"]}']
+        path = self._module_path(modules, module_drawer)
+
+        if not gradient:
+            out.append(f'{_rgb_operands(fill_color)} rg')
+            out.append(path)
+            out.append(ops['fill'])
+            return out
+
+        function = (f'<< /FunctionType 2 /Domain [0 1] /C0 [{_rgb_operands(gradient["center_color"])}] '
+                    f'/C1 [{_rgb_operands(gradient["edge_color"])}] /N 1 >>')
+        half = _fmt(size / 2)
+
+        if gradient.get('type') == 'square':
+            # Chebyshev-distance gradient: one axial shading per triangle
+            triangles = (
+                (f'0 0 m {size} 0 l {half} {half} l h', f'{half} {half} {half} 0'),
+                (f'{size} 0 m {size} {size} l {half} {half} l h', f'{half} {half} {size} {half}'),
+                (f'0 {size} m {size} {size} l {half} {half} l h', f'{half} {half} {half} {size}'),
+                (f'0 0 m 0 {size} l {half} {half} l h', f'{half} {half} 0 {half}'),
+            )
+            for triangle, coords in triangles:
+                paint = shade(f'<< /ShadingType 2 /ColorSpace /DeviceRGB /Coords [{coords}] '
+                              f'/Function {function} /Extend [true true] >>')
+                out.extend([ops['save'], path, ops['clip'], triangle, ops['clip'], paint, ops['restore']])
+        else:
+            radius = _fmt(math.sqrt(2) * size / 2)
+            paint = shade(f'<< /ShadingType 3 /ColorSpace /DeviceRGB /Coords [{half} {half} 0 {half} {half} {radius}] '
+                          f'/Function {function} /Extend [true true] >>')
+            out.extend([ops['save'], path, ops['clip'], paint, ops['restore']])
+        return out
+
+    def _module_path(self, modules, module_drawer):
+        """Build the module outline with PDF-style path operators."""
+        offset = self.border
+        if module_drawer not in ('rounded', 'circle'):
+            return '\n'.join(
+                f'{x + offset} {y + offset} {width} {height} re'
+                for x, y, width, height in merged_rectangles(modules)
+            )
+
+        if module_drawer == 'rounded':
+            outlines = (rounded_run_outline(x + offset, y + offset, width, corners)
+                        for x, y, width, corners in rounded_runs(modules))
+        else:
+            outlines = (circle_outline(x + offset, y + offset) for x, y in dark_modules(modules))
+
+        commands = []
+        for outline in outlines:
+            for op, *coords in outline:
+                operands = ' '.join(_fmt(round(value, 4)) for value in coords)
+                commands.append(f'{operands} {op.lower()}')
+            commands.append('h')
+        return '\n'.join(commands)
+
+    def _logo_placement(self, logo_image, modules, logo_size):
+        """Thumbnail the logo like the PNG path and center it, in module units."""
+        logo = logo_image.copy()
+        logo.thumbnail((logo_size, logo_size))
+        size = len(modules) + 2 * self.border
+        width = logo.size[0] / self.box_size
+        height = logo.size[1] / self.box_size
+        return logo, (size - width) / 2, (size - height) / 2, width, height
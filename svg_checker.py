@@ -1,13 +1,26 @@
 from lxml import etree
 import argparse
+import os
+import tempfile
+import numpy as np
 import webcolors
 
-def check_svg(svg_file):
+from src.utils.svg_geometry import iter_shapes
+from src.utils.svg_styles import StyleResolver
+from src.utils.svg_units import stroke_widths_mm, width_compliance
+from src.utils.svg_fixer import SVGFixer
+
+def check_svg(svg_file, tolerance=0.01):
     """
     Parses an SVG file and checks the color and thickness of vector lines.
 
+    Styles are resolved as a browser would (attributes, style sheets and
+    inheritance from groups) and stroke widths are converted to printed
+    millimetres before they are compared.
+
     Args:
         svg_file: The path to the SVG file.
+        tolerance: Allowed stroke width deviation from 1mm, in mm.
     """
     try:
         tree = etree.parse(svg_file)
@@ -19,37 +32,33 @@ def check_svg(svg_file):
         print(f"Error: File not found at {svg_file}")
         return
 
-    namespaces = {'svg': 'http://www.w3.org/2000/svg'}
-    shapes = root.xpath(
-        '//svg:path | //svg:rect | //svg:circle | //svg:ellipse | //svg:line | //svg:polyline',
-        namespaces=namespaces
-    )
-
-    if not shapes:
-        shapes = root.xpath(
-            '//path | //rect | //circle | //ellipse | //line | //polyline'
-        )
+    resolver = StyleResolver(root)
+    shapes = list(iter_shapes(root, resolver))
 
     if not shapes:
         print("No shape elements found in the SVG file.")
         return
 
     print(f"Found {len(shapes)} shape element(s).\n")
-    
-    for i, shape in enumerate(shapes):
-        tag_name = etree.QName(shape).localname
+
+    widths_mm = stroke_widths_mm(root, [(transform, style) for _, _, _, transform, _, style in shapes])
+    width_ok = width_compliance(widths_mm, 1.0, tolerance)
+
+    for i, shape, tag_name, _, _, style in shapes:
         shape_id = shape.get('id', f"{tag_name}_{i+1}")
         print(f"--- Checking Shape '{shape_id}' ({tag_name}) ---")
 
-        # Check stroke width
-        stroke_width = shape.get('stroke-width')
-        if stroke_width == "1mm":
-            print(f"  - Stroke width: {stroke_width} (OK)")
+        # Check stroke width (in printed millimetres)
+        stroke_width = style.get('stroke-width')
+        width = stroke_width if stroke_width == "1mm" or np.isnan(widths_mm[i]) \
+            else f"{stroke_width} ({widths_mm[i]:.3f}mm)"
+        if width_ok[i]:
+            print(f"  - Stroke width: {width} (OK)")
         else:
-            print(f"  - Stroke width: {stroke_width} (Warning: Should be 1mm)")
+            print(f"  - Stroke width: {width} (Warning: Should be 1mm)")
 
         # Check stroke color
-        stroke_color = shape.get('stroke')
+        stroke_color = style.get('stroke')
         try:
             rgb_color = webcolors.name_to_rgb(stroke_color) if stroke_color.isalpha() else webcolors.hex_to_rgb(stroke_color)
             if rgb_color == (255, 0, 0):
@@ -60,15 +69,58 @@ def check_svg(svg_file):
             print(f"  - Stroke color: {stroke_color} (Warning: Could not determine color)")
 
         # Check stroke opacity
-        stroke_opacity = shape.get('stroke-opacity', '1') # Default to 1 if not present
+        stroke_opacity = style.get('stroke-opacity', '1') # Default to 1 if not present
         if stroke_opacity == "1":
             print(f"  - Stroke opacity: {stroke_opacity} (OK)")
         else:
             print(f"  - Stroke opacity: {stroke_opacity} (Warning: Should be 1)")
 
+def fix_svg(svg_file, output_file=None, tolerance=0.01):
+    """
+    Rewrites stroke color, width and opacity of all cut lines in one streaming pass.
+
+    Args:
+        svg_file: The path to the SVG file.
+        output_file: Where to write the fixed SVG (default: <name>-fixed.svg next to it).
+        tolerance: Allowed stroke width deviation from 1mm, in mm.
+    """
+    if output_file is None:
+        stem, extension = os.path.splitext(svg_file)
+        output_file = f"{stem}-fixed{extension or '.svg'}"
+
+    fixer = SVGFixer(tolerance=tolerance)
+    try:
+        chunks = fixer.stream(svg_file)
+    except etree.XMLSyntaxError as e:
+        print(f"Error parsing SVG file: {e}")
+        return
+    except OSError:
+        print(f"Error: File not found at {svg_file}")
+        return
+
+    # Written next to the target and moved into place, so the input may be overwritten
+    fd, temp_path = tempfile.mkstemp(suffix='.svg', dir=os.path.dirname(os.path.abspath(output_file)))
+    with os.fdopen(fd, 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(temp_path, output_file)
+
+    stats = fixer.stats
+    print(f"Fixed {stats['fixed']} of {stats['shapes']} stroked shape(s) "
+          f"(color: {stats['color']}, width: {stats['width']}, opacity: {stats['opacity']}).")
+    print(f"Written to {output_file}")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Check SVG file for line color and thickness.')
     parser.add_argument('svg_file', help='The path to the SVG file to check.')
+    parser.add_argument('--tolerance', type=float, default=0.01,
+                        help='Allowed stroke width deviation from 1mm, in mm (default: 0.01)')
+    parser.add_argument('--fix', action='store_true',
+                        help='Write a copy with red, 1mm, fully opaque strokes instead of checking.')
+    parser.add_argument('-o', '--output', help='Output file for --fix (default: <name>-fixed.svg).')
     args = parser.parse_args()
 
-    check_svg(args.svg_file)
\ No newline at end of file
+    if args.fix:
+        fix_svg(args.svg_file, args.output, tolerance=args.tolerance)
+    else:
+        check_svg(args.svg_file, tolerance=args.tolerance)
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""Shared pytest setup."""
+
+import os
+import tempfile
+
+
+def pytest_configure(config):
+    # Importing the app configures a rotating log file; keep it out of the working tree
+    os.environ.setdefault('LOG_FILE', os.path.join(tempfile.mkdtemp(prefix='utildocker-logs-'), 'app.log'))
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Test the QR color contrast validator and its checks before rendering."""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from PIL import Image
+from qrcode.image.styles.colormasks import RadialGradiantColorMask, SquareGradiantColorMask
+
+from utils import QRCodeGenerator
+from utils.color_contrast import ColorContrastValidator
+
+
+def test_solid_colors():
+    validator = ColorContrastValidator()
+    assert validator.validate('black', 'white')['status'] == 'ok'
+
+    report = validator.validate('#ffcc00', '#ffffff')
+    assert report['status'] == 'error' and report['contrast'] == pytest.approx(1.51, abs=0.01)
+    assert validator.validate('#777777', '#ffffff')['status'] == 'warning'
+
+    report = validator.validate('#ffffff', '#000000')
+    assert report['contrast'] == 21 and report['inverted'] and report['status'] == 'warning'
+
+    with pytest.raises(ValueError):
+        validator.validate('not-a-color', '#ffffff')
+
+
+@pytest.mark.parametrize('mask_class, kind', [(RadialGradiantColorMask, 'radial'),
+                                              (SquareGradiantColorMask, 'square')])
+def test_gradient_field_matches_qrcode_masks(mask_class, kind):
+    """The vectorized field reproduces qrcode's per-pixel mask colors."""
+    mask = mask_class(center_color=(10, 20, 200), edge_color=(250, 120, 0))
+    image = Image.new('RGB', (290, 290))
+    points = np.random.default_rng(1).uniform(0, 29, size=(200, 2))
+    expected = [mask.get_fg_pixel(image, x * 10, y * 10) for x, y in points]
+    gradient = {'type': kind, 'center_color': mask.center_color, 'edge_color': mask.edge_color}
+    assert ColorContrastValidator.gradient_colors(gradient, 29, points).tolist() == [list(c) for c in expected]
+
+
+def test_gradient_checks_dark_modules():
+    generator = QRCodeGenerator()
+    style = dict(color_mask='custom', foreground_color='#000000', background_color='#ffffff',
+                 gradient_start='#000000', gradient_end='#aaaaaa')
+    report = generator.check_contrast('https://example.com/gradient', **style)
+    assert report['status'] == 'error'
+    assert report['gradient']['samples'] == sum(map(sum, generator.module_matrix('https://example.com/gradient').modules))
+    assert 0 < report['gradient']['low_contrast_share'] < 1
+    assert report['gradient']['max_contrast'] > 4.5
+
+    style['gradient_end'] = '#333333'
+    assert generator.check_contrast('https://example.com/gradient', **style)['status'] == 'ok'
+    # Without data a sample grid is checked
+    assert generator.check_contrast(None, **style)['gradient']['samples'] == 25 * 25
+    assert generator.check_contrast('x', color_mask='radial')['status'] == 'ok'
+
+
+def test_large_symbols_are_fast():
+    generator = QRCodeGenerator()
+    data = 'x' * 2000
+    generator.module_matrix(data)
+    start = time.perf_counter()
+    report = generator.check_contrast(data, color_mask='custom', gradient_start='#000000', gradient_end='#0000aa')
+    elapsed = time.perf_counter() - start
+    print(f"Checked {report['gradient']['samples']} modules in {elapsed * 1000:.1f}ms")
+    assert report['gradient']['samples'] > 5000
+
+
+def test_app_rejects_and_warns():
+    import app as app_module
+    client = app_module.app.test_client()
+    low = {'data': 'contrast', 'color_mask': 'custom', 'foreground_color': '#ffcc00', 'background_color': '#ffffff'}
+
+    response = client.post('/generate-qr', data=low)
+    assert response.status_code == 302
+    page = client.get('/').get_data(as_text=True)
+    assert 'Colors rejected' in page and 'show_qr' not in response.headers['Location']
+
+    response = client.post('/generate-qr', data=dict(low, foreground_color='#777777'), follow_redirects=True)
+    assert 'flash warning' in response.get_data(as_text=True)
+
+    preview = client.post('/api/qr/preview', data=low)
+    assert preview.status_code == 200
+    assert preview.headers['X-QR-Contrast-Status'] == 'error'
+    assert preview.headers['X-QR-Contrast'] == '1.51'
+
+    report = client.post('/api/qr/contrast', json={'foreground_color': '#ffcc00', 'background_color': '#ffffff',
+                                                   'color_mask': 'custom'}).get_json()
+    assert report['status'] == 'error'
+    report = client.post('/api/qr/contrast', json={'data': 'abc', 'color_mask': 'custom',
+                                                   'gradient_start': '#000000', 'gradient_end': '#222222'}).get_json()
+    assert report['status'] == 'ok' and 'gradient' in report
+    assert client.post('/api/qr/contrast', json={'color_mask': 'custom', 'foreground_color': 'nope'}).status_code == 400
+
+    # Colors without a color mask are checked as custom colors
+    report = client.post('/api/qr/contrast', json={'foreground_color': '#eeeeee',
+                                                   'background_color': '#ffffff'}).get_json()
+    assert report['status'] == 'error' and report['contrast'] < 1.2
+    # Malformed bodies are a JSON 400, not a server error
+    for body in ([1, 2], {'foreground_color': 5, 'color_mask': 'custom'}, {'data': ['x']}):
+        response = client.post('/api/qr/contrast', json=body)
+        assert response.status_code == 400 and 'error' in response.get_json()
+
+    # Solid colors are checked without encoding the payload; gradients on oversized data are a 400
+    oversized = 'x' * 4000
+    report = client.post('/api/qr/contrast', json={'data': oversized, 'color_mask': 'custom',
+                                                   'foreground_color': '#000000'}).get_json()
+    assert report['status'] == 'ok'
+    response = client.post('/api/qr/contrast', json={'data': oversized, 'color_mask': 'custom',
+                                                     'gradient_start': '#000000', 'gradient_end': '#222222'})
+    assert response.status_code == 400 and 'error' in response.get_json()
+    assert client.post('/api/qr/preview', data={'data': oversized}).status_code == 400
+
+
+if __name__ == "__main__":
+    test_solid_colors()
+    test_gradient_field_matches_qrcode_masks(RadialGradiantColorMask, 'radial')
+    test_gradient_field_matches_qrcode_masks(SquareGradiantColorMask, 'square')
+    test_gradient_checks_dark_modules()
+    test_large_symbols_are_fast()
+    test_app_rejects_and_warns()
+    print("\n🎉 Color contrast tests passed!")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Test gzip/brotli negotiation, SVG compression cache and precompressed static files."""
+
+import sys
+import os
+import gzip
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from flask import request
+from werkzeug.http import parse_accept_header
+from werkzeug.datastructures import Accept
+
+from utils import ResponseCompressor, metrics
+import app as app_module
+
+SVG_PATH = os.path.join(os.path.dirname(__file__), '..', 'test_svg_example.svg')
+
+
+def test_negotiation_respects_quality():
+    compressor = ResponseCompressor()
+    assert compressor.negotiate(parse_accept_header('gzip, deflate', Accept)) == 'gzip'
+    assert compressor.negotiate(parse_accept_header('gzip;q=0, identity', Accept)) is None
+    assert compressor.negotiate(parse_accept_header('', Accept)) is None
+    assert compressor.negotiate(parse_accept_header('*', Accept)) == compressor.encodings[0]
+
+
+def test_analysis_json_is_compressed():
+    """Large analysis responses are gzipped; small or non-accepting requests are not."""
+    print("🗜️  Testing response compression...")
+    client = app_module.app.test_client()
+    with open(SVG_PATH, encoding='utf-8') as f:
+        payload = {'svg_content': f.read()}
+
+    plain = client.post('/analyze-svg-colors', json=payload)
+    assert 'Content-Encoding' not in plain.headers
+
+    response = client.post('/analyze-svg-colors', json=payload, headers={'Accept-Encoding': 'gzip'})
+    assert len(plain.data) >= app_module.compressor.min_size
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data) == plain.data
+    assert 'Accept-Encoding' in response.headers['Vary']
+    print(f"  ✅ {len(plain.data)} -> {len(response.data)} bytes")
+
+
+def test_generated_svg_compressed_once():
+    metrics.reset()
+    client = app_module.app.test_client()
+    app_module.PREVIEW_MODE = 'stateless'
+    try:
+        client.post('/generate-qr', data={'data': 'compress me', 'export_format': 'svg',
+                                          'module_drawer': 'circle'})
+        token = client.get('/?show_qr=1').get_data(as_text=True).split('/qr/')[1].split('"')[0]
+        plain = client.get(f'/qr/{token}')
+        for _ in range(3):
+            response = client.get(f'/qr/{token}', headers={'Accept-Encoding': 'gzip'})
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert gzip.decompress(response.data) == plain.data
+        assert response.get_etag()[1]  # weak: same resource, different bytes
+
+        etag = response.headers['ETag']
+        cached = client.get(f'/qr/{token}', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert cached.status_code == 304
+    finally:
+        app_module.PREVIEW_MODE = 'session'
+
+    output = metrics.render()
+    assert 'cache_misses_total{cache="compressed_svg"} 1' in output
+    assert 'cache_hits_total{cache="compressed_svg"} 2' in output
+
+
+def test_static_files_use_precompressed_copies():
+    client = app_module.app.test_client()
+    plain = client.get('/static/css/style.css')
+    assert 'Content-Encoding' not in plain.headers
+
+    response = client.get('/static/css/style.css', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.mimetype == 'text/css'
+    assert gzip.decompress(response.data) == plain.data
+    assert client.get('/static/../app.py').status_code == 404
+    assert client.get('/static/css/missing.css').status_code == 404
+
+
+
+def test_stale_precompressed_copies_are_skipped(tmp_path):
+    """A source edited after precompression is served as itself until the copies are refreshed."""
+    compressor = ResponseCompressor()
+    source = tmp_path / 'app.js'
+    source.write_text('var version = 1;' * 100)
+    assert compressor.precompress_directory(str(tmp_path)) == len(compressor.encodings)
+
+    source.write_text('var version = 2;' * 100)
+    stale = os.path.getmtime(source) - 10
+    for encoding, suffix in compressor.STATIC_ENCODINGS:
+        if os.path.exists(str(source) + suffix):
+            os.utime(str(source) + suffix, (stale, stale))
+
+    with app_module.app.test_request_context(headers={'Accept-Encoding': 'gzip, br'}):
+        response = compressor.send_static(str(tmp_path), 'app.js', request)
+        response.direct_passthrough = False
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_data() == source.read_bytes()
+
+    compressor.precompress_directory(str(tmp_path))
+    with app_module.app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = compressor.send_static(str(tmp_path), 'app.js', request)
+        response.direct_passthrough = False
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.get_data()) == source.read_bytes()
+
+
+if __name__ == "__main__":
+    test_negotiation_respects_quality()
+    test_analysis_json_is_compressed()
+    test_generated_svg_compressed_once()
+    test_static_files_use_precompressed_copies()
+    import tempfile
+    import pathlib
+    with tempfile.TemporaryDirectory() as tmp:
+        test_stale_precompressed_copies_are_skipped(pathlib.Path(tmp))
+    print("\n🎉 Compression tests passed!")
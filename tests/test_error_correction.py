@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Test automatic error correction selection and the decodability check."""
+
+import sys
+import os
+import random
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+import qrcode
+import qrcode.util
+from PIL import Image
+from utils import QRCodeGenerator
+from utils.qr_decodability import (
+    DATA, FUNCTION, module_roles, codeword_map, obscured_modules, check_decodability
+)
+
+LOGO = Image.new('RGB', (200, 200), 'red')
+
+
+def _placement_order(count):
+    """Module positions in the order qrcode's map_data visits them."""
+    upwards = True
+    for col in range(count - 1, 0, -2):
+        if col <= 6:
+            col -= 1
+        rows = range(count - 1, -1, -1) if upwards else range(count)
+        for row in rows:
+            yield row, col
+            yield row, col - 1
+        upwards = not upwards
+
+
+@pytest.mark.parametrize('version', [1, 2, 7, 14, 21, 40])
+def test_codeword_map_matches_qrcode_placement(version):
+    """Every data module carries the bit the layout map says it does."""
+    qr = qrcode.QRCode(version=version, error_correction=qrcode.constants.ERROR_CORRECT_M, mask_pattern=3)
+    qr.add_data(''.join(random.choice('abcdef') for _ in range(8)))
+    qr.make(fit=False)
+    roles = module_roles(version)
+    owner = codeword_map(version)
+    mask = qrcode.util.mask_func(3)
+
+    # Bits within a codeword are placed most significant first
+    seen = {}
+    for row, col in _placement_order(len(owner)):
+        codeword = owner[row][col]
+        if codeword is None:
+            continue
+        bit = seen.get(codeword, 0)
+        seen[codeword] = bit + 1
+        expected = (qr.data_cache[codeword] >> (7 - bit)) & 1
+        assert qr.modules[row][col] ^ mask(row, col) == expected
+    assert len(seen) == len(qr.data_cache)
+    assert all(bits == 8 for bits in seen.values())
+    assert roles[0][0] == FUNCTION and roles[len(owner) - 1][len(owner) - 1] == DATA
+
+
+def test_uncovered_symbol_is_decodable():
+    report = check_decodability(1, qrcode.constants.ERROR_CORRECT_L, set())
+    assert report['decodable'] and report['damaged_codewords'] == 0
+
+
+def test_covered_finder_is_fatal():
+    report = check_decodability(5, qrcode.constants.ERROR_CORRECT_H, {(0, 0)})
+    assert not report['decodable'] and report['function_patterns_hit'] == 1
+
+
+def test_obscured_modules_cover_center():
+    # A 5x5 logo on a 25-module symbol sits exactly on module boundaries
+    assert obscured_modules(25, 5, 5) == {(r, c) for r in range(10, 15) for c in range(10, 15)}
+    # Off-grid edges count every module they touch
+    assert len(obscured_modules(25, 4, 4)) == 25
+
+
+def test_auto_mode_without_logo_matches_level_l():
+    """Without a logo, auto mode produces the same symbol as before."""
+    auto = QRCodeGenerator()
+    plan = auto.plan_symbol("https://example.com")
+    assert plan['error_correction'] == 'L'
+    assert auto._make_qr("https://example.com").error_correction == qrcode.constants.ERROR_CORRECT_L
+
+
+def test_auto_mode_raises_level_for_logo():
+    """A logo raises the error correction level until the code survives it."""
+    print("🛡️  Testing logo-aware error correction...")
+
+    generator = QRCodeGenerator()
+    for data in ["hi", "https://example.com", "https://example.com/" + "x" * 100]:
+        plan = generator.plan_symbol(data, LOGO)
+        assert plan['decodability']['decodable']
+        fixed = QRCodeGenerator(error_correction='L').plan_symbol(data, LOGO)
+        qr = generator._make_qr(data, LOGO)
+        assert qr.version == plan['version']
+        assert qr.error_correction == QRCodeGenerator.ERROR_CORRECTION_LEVELS[plan['error_correction']]
+        print(f"  ✅ {len(data)} chars: version {plan['version']}, level {plan['error_correction']} "
+              f"(fixed L decodable: {fixed['decodability']['decodable']})")
+
+
+def test_fixed_level_is_respected():
+    generator = QRCodeGenerator(error_correction='Q')
+    assert generator.plan_symbol("https://example.com", LOGO)['error_correction'] == 'Q'
+    assert generator._make_qr("https://example.com", LOGO).error_correction == qrcode.constants.ERROR_CORRECT_Q
+
+
+def test_unknown_level_rejected():
+    with pytest.raises(ValueError):
+        QRCodeGenerator(error_correction='X')
+
+
+if __name__ == "__main__":
+    test_codeword_map_matches_qrcode_placement(7)
+    test_uncovered_symbol_is_decodable()
+    test_covered_finder_is_fatal()
+    test_obscured_modules_cover_center()
+    test_auto_mode_without_logo_matches_level_l()
+    test_auto_mode_raises_level_for_logo()
+    test_fixed_level_is_respected()
+    test_unknown_level_rejected()
+    print("\n🎉 Error correction tests passed!")
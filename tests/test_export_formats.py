@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Test WebP, PDF and EPS export formats."""
+
+import re
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from PIL import Image
+from utils import QRCodeGenerator
+
+TEST_DATA = "https://example.com/export-format-test"
+
+
+def _check_xref(pdf):
+    """Every xref entry must point at the start of its object."""
+    start = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+    assert pdf[start:start + 4] == b'xref'
+    header = re.match(rb'xref\n0 (\d+)\n', pdf[start:])
+    count = int(header.group(1))
+    entries = pdf[start + header.end():].split(b'\n')[:count]
+    for number, entry in enumerate(entries[1:], start=1):
+        offset = int(entry[:10])
+        assert pdf[offset:].startswith(f'{number} 0 obj'.encode()), f"bad offset for object {number}"
+
+
+def test_webp_is_lossless():
+    """WebP output decodes to the same pixels as the PNG output."""
+    print("🖼️  Testing WebP export...")
+
+    qr_gen = QRCodeGenerator()
+    webp, mimetype, filename = qr_gen.generate_qr_code(TEST_DATA, export_format='webp', color_mask='radial')
+    png, _, _ = qr_gen.generate_qr_code(TEST_DATA, export_format='png', color_mask='radial')
+
+    assert mimetype == 'image/webp'
+    assert filename.endswith('.webp')
+    assert list(Image.open(webp).convert('RGB').getdata()) == list(Image.open(png).convert('RGB').getdata())
+    print(f"  ✅ WebP {len(webp.getvalue())} bytes vs PNG {len(png.getvalue())} bytes")
+
+
+@pytest.mark.parametrize('module_drawer,color_mask', [
+    ('square', 'solid'),
+    ('rounded', 'radial'),
+    ('circle', 'square'),
+])
+def test_single_page_pdf(module_drawer, color_mask):
+    """Single-page PDFs are well formed and contain vector paths, not images."""
+    qr_gen = QRCodeGenerator()
+    buf, mimetype, filename = qr_gen.generate_qr_code(
+        TEST_DATA, export_format='pdf', module_drawer=module_drawer, color_mask=color_mask
+    )
+    pdf = buf.getvalue()
+
+    assert mimetype == 'application/pdf'
+    assert filename.endswith('.pdf')
+    assert pdf.startswith(b'%PDF-1.4')
+    assert pdf.rstrip().endswith(b'%%EOF')
+    assert b'/Count 1' in pdf
+    assert b'/Subtype /Image' not in pdf
+    if color_mask != 'solid':
+        assert b'/Shading' in pdf
+    _check_xref(pdf)
+
+
+def test_multi_page_pdf_with_logo():
+    """generate_pdf_pages writes one page per payload."""
+    print("📄 Testing multi-page PDF...")
+
+    qr_gen = QRCodeGenerator()
+    payloads = [f"{TEST_DATA}/{i}" for i in range(5)]
+    buf, mimetype, _ = qr_gen.generate_pdf_pages(payloads, logo_image=Image.new('RGB', (80, 80), 'red'))
+    pdf = buf.getvalue()
+
+    assert mimetype == 'application/pdf'
+    assert b'/Count 5' in pdf
+    assert pdf.count(b'/Type /Page ') == 5
+    # The logo is embedded once and referenced from every page
+    assert pdf.count(b'/Subtype /Image') == 1
+    assert pdf.count(b'/XObject << /Im0 ') == 5
+    _check_xref(pdf)
+    print(f"  ✅ 5 pages, {len(pdf)} bytes")
+
+
+def test_eps_header_and_bounding_box():
+    """EPS output declares a bounding box matching the code size."""
+    qr_gen = QRCodeGenerator()
+    buf, mimetype, filename = qr_gen.generate_qr_code(TEST_DATA, export_format='eps', module_drawer='rounded')
+    eps = buf.getvalue().decode('latin-1')
+
+    assert mimetype == 'application/postscript'
+    assert filename.endswith('.eps')
+    assert eps.startswith('%!PS-Adobe-3.0 EPSF-3.0')
+    bbox = re.search(r'%%HiResBoundingBox: 0 0 ([\d.]+) ([\d.]+)', eps)
+    assert bbox and bbox.group(1) == bbox.group(2)
+    assert eps.rstrip().endswith('%%EOF')
+
+
+def test_unknown_format_rejected():
+    with pytest.raises(ValueError):
+        QRCodeGenerator().generate_qr_code(TEST_DATA, export_format='gif')
+
+
+if __name__ == "__main__":
+    test_webp_is_lossless()
+    test_single_page_pdf('rounded', 'radial')
+    test_multi_page_pdf_with_logo()
+    test_eps_header_and_bounding_box()
+    test_unknown_format_rejected()
+    print("\n🎉 Export format tests passed!")
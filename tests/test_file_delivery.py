@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Test direct and proxy-offloaded preview file delivery."""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from utils import FileDelivery
+import app as app_module
+
+
+@pytest.fixture
+def client():
+    app_module.app.config['TESTING'] = True
+    original = app_module.file_delivery
+    with app_module.app.test_client() as client:
+        yield client
+    app_module.file_delivery = original
+
+
+def _generate(client):
+    client.post('/generate-qr', data={'data': 'offload me', 'foreground_color': '#000000'})
+    with client.session_transaction() as sess:
+        return sess['qr_preview']
+
+
+def test_direct_mode_streams_file(client):
+    preview = _generate(client)
+    response = client.get(f"/preview/{preview['preview_id']}")
+    assert response.status_code == 200
+    assert response.data.startswith(b'\x89PNG')
+    assert 'X-Accel-Redirect' not in response.headers
+
+
+def test_x_accel_mode_sends_headers_only(client):
+    """The proxy gets the internal location; Python sends no image bytes."""
+    print("📤 Testing X-Accel-Redirect delivery...")
+    app_module.file_delivery = FileDelivery(app_module.TEMP_DIR, mode='x-accel')
+    preview = _generate(client)
+
+    response = client.get(f"/preview/{preview['preview_id']}")
+    assert response.status_code == 200
+    assert response.data == b''
+    assert response.headers['X-Accel-Redirect'] == f"/_protected/qr_previews/{preview['temp_file']}"
+    assert response.mimetype == 'image/png'
+
+    response = client.get('/download-qr')
+    assert response.data == b''
+    assert preview['filename'] in response.headers['Content-Disposition']
+    assert response.headers['Content-Disposition'].startswith('attachment')
+    print("  ✅ Preview and download handed to the proxy")
+
+
+def test_x_sendfile_mode_uses_absolute_path(client):
+    app_module.file_delivery = FileDelivery(app_module.TEMP_DIR, mode='x-sendfile')
+    preview = _generate(client)
+
+    response = client.get(f"/preview/{preview['preview_id']}")
+    assert response.headers['X-Sendfile'] == os.path.join(os.path.abspath(app_module.TEMP_DIR), preview['temp_file'])
+
+
+def test_missing_or_escaping_files(tmp_path):
+    delivery = FileDelivery(str(tmp_path), mode='x-accel')
+    (tmp_path / 'inside.png').write_bytes(b'x')
+    assert delivery.path('inside.png') == str(tmp_path / 'inside.png')
+    assert delivery.path('missing.png') is None
+    assert delivery.path('../inside.png') is None
+    assert delivery.path('/etc/passwd') is None
+
+    with pytest.raises(ValueError):
+        FileDelivery(str(tmp_path), mode='sendfile')
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
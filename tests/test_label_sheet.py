@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Test the label sheet compositor."""
+
+import io
+import re
+import sys
+import os
+import zipfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from PIL import Image
+from utils import QRCodeGenerator, LabelSheetCompositor, SheetLayout
+from utils.metrics import metrics
+
+
+def _payloads(count):
+    """Lazy payload stream, as the CLI reads it from a file."""
+    return (f"https://example.com/label/{i}" for i in range(count))
+
+
+def test_layout_fits_page():
+    """Cells tile the printable area and codes stay inside their cells."""
+    layout = SheetLayout(page_size='A4', rows=8, columns=3, margin=10, gap=4)
+
+    assert layout.per_page == 24
+    last_x, last_y = layout.cell_origin(23)
+    assert last_x + layout.cell_width == pytest.approx(200)
+    assert last_y + layout.cell_height == pytest.approx(287)
+    x, y = layout.code_origin(0)
+    assert x >= 10 and y >= 10
+    assert layout.code_size <= layout.cell_height - layout.caption_height
+
+
+def test_layout_rejects_bad_grids():
+    with pytest.raises(ValueError):
+        SheetLayout(page_size='B7')
+    with pytest.raises(ValueError):
+        SheetLayout(rows=0)
+    with pytest.raises(ValueError):
+        SheetLayout(page_size=(50, 50), rows=20, columns=20, margin=10)
+
+
+def test_pdf_sheet_pages_and_captions():
+    """Payloads are paginated onto a streamed vector PDF with captions."""
+    print("🏷️  Testing PDF label sheet...")
+
+    compositor = LabelSheetCompositor(QRCodeGenerator(), SheetLayout(rows=4, columns=3))
+    buf = io.BytesIO()
+    pages = compositor.write_pdf(_payloads(30), buf, module_drawer='rounded', color_mask='radial')
+    pdf = buf.getvalue()
+
+    assert pages == 3
+    assert b'/Count 3' in pdf
+    assert pdf.rstrip().endswith(b'%%EOF')
+    assert b'/BaseFont /Helvetica' in pdf
+    assert b'/Subtype /Image' not in pdf
+    # Page geometry is A4 in points
+    assert re.search(rb'/MediaBox \[0 0 595\.27\d* 841\.88\d*\]', pdf)
+    print(f"  ✅ 30 labels on {pages} pages, {len(pdf)} bytes")
+
+
+def test_repeated_payloads_encoded_once():
+    """Duplicate payloads in a batch hit the per-job code cache."""
+    metrics.reset()
+    compositor = LabelSheetCompositor(QRCodeGenerator(), SheetLayout(rows=2, columns=2, caption=False))
+    compositor.write_pdf(['same'] * 8, io.BytesIO())
+
+    output = metrics.render()
+    assert 'cache_misses_total{cache="sheet_codes"} 1' in output
+    assert 'cache_hits_total{cache="sheet_codes"} 7' in output
+
+
+def test_long_captions_are_truncated():
+    fit = LabelSheetCompositor._fit_caption('x' * 100, 10, len)
+    assert fit.endswith('...') and len(fit) <= 10
+    assert LabelSheetCompositor._fit_caption('short', 10, len) == 'short'
+
+
+def test_png_single_page():
+    """A batch that fits one page is written as a plain PNG at the requested DPI."""
+    compositor = LabelSheetCompositor(QRCodeGenerator(), SheetLayout(page_size='A5', rows=2, columns=2))
+    buf = io.BytesIO()
+    pages = compositor.write_png([('https://example.com', 'Example')], buf, dpi=100)
+
+    assert pages == 1
+    page = Image.open(io.BytesIO(buf.getvalue()))
+    assert page.format == 'PNG'
+    assert page.size == (round(148 / 25.4 * 100), round(210 / 25.4 * 100))
+    # The top-left cell holds a code, the empty bottom-right cell stays white
+    assert page.convert('L').crop((0, 0, page.size[0] // 2, page.size[1] // 2)).getextrema()[0] == 0
+    assert page.convert('L').crop((page.size[0] // 2, page.size[1] // 2) + page.size).getextrema() == (255, 255)
+
+
+def test_png_multi_page_zip():
+    """Several PNG pages are streamed into a ZIP archive."""
+    compositor = LabelSheetCompositor(QRCodeGenerator(), SheetLayout(rows=2, columns=2))
+    buf = io.BytesIO()
+    pages = compositor.write_png(_payloads(9), buf, dpi=50)
+
+    assert pages == 3
+    with zipfile.ZipFile(buf) as archive:
+        assert archive.namelist() == ['page-0001.png', 'page-0002.png', 'page-0003.png']
+
+
+def test_logo_embedded_once_per_document():
+    """Every label references the same logo XObject instead of its own copy."""
+    logo = Image.new('RGB', (64, 64), '#1b4f8a')
+    compositor = LabelSheetCompositor(QRCodeGenerator(), SheetLayout(rows=4, columns=3, caption=False))
+    buf = io.BytesIO()
+    assert compositor.write_pdf(_payloads(30), buf, logo_image=logo) == 3
+    pdf = buf.getvalue()
+
+    assert pdf.count(b'/Subtype /Image') == 1
+    assert len(set(re.findall(rb'/XObject << /Im0 (\d+) 0 R >>', pdf))) == 1
+    assert pdf.count(b'/XObject <<') == 3
+
+
+def test_empty_batches_rejected():
+    compositor = LabelSheetCompositor(QRCodeGenerator(), SheetLayout())
+    with pytest.raises(ValueError):
+        compositor.write_png([], io.BytesIO())
+    buf = io.BytesIO()
+    with pytest.raises(ValueError):
+        compositor.write_pdf(iter([]), buf)
+    assert buf.getvalue() == b''
+
+
+if __name__ == "__main__":
+    test_layout_fits_page()
+    test_layout_rejects_bad_grids()
+    test_pdf_sheet_pages_and_captions()
+    test_repeated_payloads_encoded_once()
+    test_long_captions_are_truncated()
+    test_png_single_page()
+    test_png_multi_page_zip()
+    test_logo_embedded_once_per_document()
+    test_empty_batches_rejected()
+    print("\n🎉 Label sheet tests passed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Test the live preview endpoint and the module matrix cache."""
+
+import io
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from PIL import Image
+from utils import QRCodeGenerator, metrics
+
+TEST_DATA = "https://example.com/live-preview-test"
+
+
+def test_matrix_cache_reused_across_styles():
+    """Style changes re-render from the cached symbol instead of re-encoding."""
+    metrics.reset()
+    qr_gen = QRCodeGenerator()
+    first = qr_gen.module_matrix(TEST_DATA)
+    qr_gen.render_preview(TEST_DATA, module_drawer='rounded')
+    qr_gen.render_preview(TEST_DATA, module_drawer='circle', color_mask='radial')
+
+    assert qr_gen.module_matrix(TEST_DATA) is first
+    output = metrics.render()
+    assert 'cache_misses_total{cache="qr_matrix"} 1' in output
+    assert 'cache_hits_total{cache="qr_matrix"} 3' in output
+
+
+def test_matrix_cache_is_bounded():
+    qr_gen = QRCodeGenerator(matrix_cache_size=2)
+    for i in range(5):
+        qr_gen.module_matrix(f"{TEST_DATA}/{i}")
+    assert len(qr_gen._matrix_cache) == 2
+
+
+def test_png_preview_is_small_and_leaves_cache_intact():
+    qr_gen = QRCodeGenerator()
+    body, mimetype = qr_gen.render_preview(TEST_DATA, preview_format='png', size=128)
+    image = Image.open(io.BytesIO(body))
+
+    assert mimetype == 'image/png'
+    assert max(image.size) <= 128
+    assert qr_gen.module_matrix(TEST_DATA).box_size == qr_gen.box_size
+
+
+def test_preview_endpoint():
+    """The endpoint returns inline SVG by default and validates its input."""
+    print("⚡ Testing /api/qr/preview...")
+
+    from app import app
+    client = app.test_client()
+
+    response = client.post('/api/qr/preview', data={'data': TEST_DATA, 'module_drawer': 'rounded'})
+    assert response.status_code == 200
+    assert response.mimetype == 'image/svg+xml'
+    assert response.headers['Cache-Control'] == 'no-store'
+    assert b'<svg' in response.data
+
+    response = client.post('/api/qr/preview', data={'data': TEST_DATA, 'preview_format': 'png', 'size': '9999'})
+    assert response.status_code == 200
+    assert max(Image.open(io.BytesIO(response.data)).size) <= 512
+
+    assert client.post('/api/qr/preview', data={'data': ''}).status_code == 400
+    assert client.post('/api/qr/preview', data={'data': TEST_DATA, 'preview_format': 'gif'}).status_code == 400
+    print("  ✅ SVG and PNG previews served")
+
+
+if __name__ == "__main__":
+    test_matrix_cache_reused_across_styles()
+    test_matrix_cache_is_bounded()
+    test_png_preview_is_small_and_leaves_cache_intact()
+    test_preview_endpoint()
+    print("\n🎉 Live preview tests passed!")
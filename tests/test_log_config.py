@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Test the queue-based logging pipeline: JSON formatting, the listener thread and rotation settings."""
+
+import sys
+import os
+import json
+import logging
+import subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+
+from utils import log_config
+from utils.log_config import JsonFormatter, configure_logging, shutdown_logging
+
+
+@pytest.fixture
+def pipeline():
+    """Run configure_logging for one test, then restore the root handlers it replaced."""
+    root = logging.getLogger()
+    saved = (log_config._listener, log_config._queue_handler, root.level)
+    log_config._listener = log_config._queue_handler = None
+    yield
+    shutdown_logging()
+    log_config._listener, log_config._queue_handler, level = saved
+    root.setLevel(level)
+
+
+def test_json_formatter():
+    formatter = JsonFormatter()
+    record = logging.makeLogRecord({'name': 'qr', 'levelno': logging.INFO, 'levelname': 'INFO',
+                                    'msg': 'Rendered %d codes', 'args': (3,), 'format': 'png', 'elapsed_ms': 1.5})
+    entry = json.loads(formatter.format(record))
+    assert entry['message'] == 'Rendered 3 codes'
+    assert entry['level'] == 'INFO' and entry['logger'] == 'qr'
+    assert entry['format'] == 'png' and entry['elapsed_ms'] == 1.5
+    assert entry['timestamp'].endswith('+00:00')
+    assert 'args' not in entry and 'msg' not in entry
+
+    try:
+        raise ValueError('broken payload')
+    except ValueError:
+        record = logging.makeLogRecord({'msg': 'failed', 'exc_info': sys.exc_info()})
+    entry = json.loads(formatter.format(record))
+    assert entry['exc_info'].startswith('Traceback') and 'ValueError: broken payload' in entry['exc_info']
+
+    # Tracebacks formatted before queueing arrive as exc_text
+    entry = json.loads(formatter.format(logging.makeLogRecord({'msg': 'failed', 'exc_text': 'Traceback: queued'})))
+    assert entry['exc_info'] == 'Traceback: queued'
+
+
+def test_records_reach_file_through_listener(tmp_path, pipeline):
+    log_file = tmp_path / 'app.log'
+    listener = configure_logging(level='DEBUG', log_file=str(log_file), log_format='json')
+    assert listener._thread is not None
+
+    logger = logging.getLogger('test_log_config')
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        logger.exception('Division of %s failed', 'one', extra={'request_id': 'abc'})
+    logger.debug('Debug detail')
+    shutdown_logging()
+
+    entries = [json.loads(line) for line in log_file.read_text(encoding='utf-8').splitlines()]
+    assert [entry['message'] for entry in entries] == ['Division of one failed', 'Debug detail']
+    assert entries[0]['request_id'] == 'abc' and 'ZeroDivisionError' in entries[0]['exc_info']
+    assert entries[0]['level'] == 'ERROR'
+
+
+def test_rotation_settings(tmp_path, pipeline):
+    log_file = tmp_path / 'rotating.log'
+    listener = configure_logging(log_file=str(log_file), max_bytes=200, backup_count=2)
+    file_handler = listener.handlers[0]
+    assert (file_handler.maxBytes, file_handler.backupCount) == (200, 2)
+
+    logger = logging.getLogger('test_log_config')
+    for i in range(20):
+        logger.info('Line %d with enough text to fill the file', i)
+    shutdown_logging()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['rotating.log', 'rotating.log.1', 'rotating.log.2']
+
+    # The app reads the rotation settings from the environment
+    env = dict(os.environ, LOG_FILE=str(tmp_path / 'app.log'), LOG_MAX_BYTES='4096', LOG_BACKUP_COUNT='3')
+    code = ("import app; from utils import log_config; handler = log_config._listener.handlers[0]; "
+            "print(handler.maxBytes, handler.backupCount, handler.baseFilename)")
+    result = subprocess.run([sys.executable, '-c', code], cwd=os.path.join(os.path.dirname(__file__), '..'),
+                            env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[-3:] == ['4096', '3', str(tmp_path / 'app.log')]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Test logo palette extraction and the QR color suggestions derived from it."""
+
+import sys
+import os
+import io
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from utils import LogoPaletteExtractor, metrics
+from utils.color_contrast import contrast_ratio, relative_luminance, parse_color
+
+
+def _png(image):
+    buf = io.BytesIO()
+    image.save(buf, 'PNG')
+    return buf.getvalue()
+
+
+def _logo():
+    image = Image.new('RGB', (800, 600), '#f4f1e8')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([100, 100, 500, 400], fill='#e8a317')
+    draw.ellipse([450, 200, 750, 550], fill='#1b4f8a')
+    return image
+
+
+def test_contrast_ratio():
+    assert contrast_ratio((0, 0, 0), (255, 255, 255)) == pytest.approx(21)
+    assert contrast_ratio((255, 255, 255), (255, 255, 255)) == pytest.approx(1)
+    assert contrast_ratio(parse_color('#777'), parse_color('white')) == pytest.approx(4.48, abs=0.01)
+    # Broadcasts one color against many
+    ratios = contrast_ratio(np.array([[0, 0, 0], [255, 0, 0]]), (255, 255, 255))
+    assert ratios == pytest.approx([21, 4.0], abs=0.01)
+    assert relative_luminance(np.zeros((4, 4, 3))).shape == (4, 4)
+
+
+def test_palette_and_suggestions():
+    extractor = LogoPaletteExtractor()
+    result = extractor.extract(_png(_logo()))
+    palette = [entry['color'] for entry in result['palette']]
+    assert palette[0] == '#f4f1e8'
+    assert '#1b4f8a' in palette and '#e8a317' in palette
+    assert sum(entry['share'] for entry in result['palette']) == pytest.approx(1, abs=0.01)
+
+    # The dark logo color on the light logo background, both from the logo
+    assert result['foreground'] == '#1b4f8a'
+    assert result['background'] == '#f4f1e8'
+    assert result['contrast'] >= extractor.min_contrast
+    background = parse_color(result['background'])
+    for key in ('gradient_start', 'gradient_end'):
+        assert contrast_ratio(parse_color(result[key]), background) >= extractor.min_contrast
+
+
+def test_light_logos_are_darkened():
+    extractor = LogoPaletteExtractor()
+    result = extractor.extract(Image.new('RGBA', (50, 50), (255, 200, 0, 255)))
+    assert result['background'] == '#ffffff'
+    foreground = parse_color(result['foreground'])
+    assert contrast_ratio(foreground, (255, 255, 255)) >= extractor.min_contrast
+    # Same hue, only darker
+    assert foreground[0] > foreground[1] > foreground[2] == 0
+
+    # Transparent pixels are ignored
+    image = Image.new('RGBA', (40, 40), (0, 0, 0, 0))
+    ImageDraw.Draw(image).rectangle([10, 10, 30, 30], fill=(0, 90, 40, 255))
+    result = extractor.extract(image)
+    assert [entry['color'] for entry in result['palette']] == ['#005a28']
+
+
+def test_cached_by_image_hash():
+    extractor = LogoPaletteExtractor()
+    data = _png(_logo().resize((3000, 2250)))
+    metrics.reset()
+    start = time.perf_counter()
+    first = extractor.extract(data)
+    elapsed = time.perf_counter() - start
+    print(f"Extracted palette of a 3000x2250 logo in {elapsed * 1000:.0f}ms")
+    assert extractor.extract(data) is first
+    output = metrics.render()
+    assert 'cache_hits_total{cache="logo_palette"} 1' in output
+    assert 'cache_misses_total{cache="logo_palette"} 1' in output
+
+
+def test_logo_palette_endpoint():
+    import app as app_module
+    client = app_module.app.test_client()
+    response = client.post('/api/logo-palette', data={'image': (io.BytesIO(_png(_logo())), 'logo.png')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.get_json()['foreground'] == '#1b4f8a'
+
+    response = client.post('/api/logo-palette', data={'image': (io.BytesIO(b'not an image'), 'logo.png')},
+                           content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert client.post('/api/logo-palette').status_code == 400
+
+
+if __name__ == "__main__":
+    test_contrast_ratio()
+    test_palette_and_suggestions()
+    test_light_logos_are_darkened()
+    test_cached_by_image_hash()
+    test_logo_palette_endpoint()
+    print("\n🎉 Logo palette tests passed!")
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Test hot-path instrumentation and the /metrics endpoint."""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils import MetricsRegistry
+
+
+def test_registry_rendering():
+    """Counters and histograms render in Prometheus text format."""
+    print("📊 Testing metrics registry...")
+
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.inc('cache_hits_total', cache='render')
+    registry.inc('cache_hits_total', cache='render')
+    registry.observe('span_duration_seconds', 0.05, span='qr_encode')
+    registry.observe('span_duration_seconds', 0.5, span='qr_encode')
+
+    text = registry.render()
+    assert '# TYPE cache_hits_total counter' in text
+    assert 'cache_hits_total{cache="render"} 2' in text
+    assert 'span_duration_seconds_bucket{span="qr_encode",le="0.1"} 1' in text
+    assert 'span_duration_seconds_bucket{span="qr_encode",le="1.0"} 2' in text
+    assert 'span_duration_seconds_bucket{span="qr_encode",le="+Inf"} 2' in text
+    assert 'span_duration_seconds_count{span="qr_encode"} 2' in text
+    print("  ✅ Registry renders counters and cumulative buckets")
+
+
+def test_metrics_endpoint():
+    """Generating a QR code populates spans and route latency."""
+    print("🌐 Testing /metrics endpoint...")
+
+    from app import app
+    client = app.test_client()
+
+    response = client.post('/generate-qr', data={'data': 'Metrics test'})
+    assert response.status_code == 302
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    for span in ('qr_encode', 'qr_style', 'qr_png_compress', 'png_base64', 'preview_write'):
+        assert f'span="{span}"' in text, f"missing span {span}"
+    assert 'http_request_duration_seconds_count{method="POST",route="/generate-qr"}' in text
+    print("  ✅ /metrics exposes spans and per-route latency")
+
+
+if __name__ == "__main__":
+    test_registry_rendering()
+    test_metrics_endpoint()
+    print("\n🎉 Metrics tests passed!")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Test the cached index page shell and its dynamic fragments."""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils import metrics
+import app as app_module
+
+SVG_PATH = os.path.join(os.path.dirname(__file__), '..', 'test_svg_example.svg')
+
+
+def _compile_count():
+    for line in metrics.render().splitlines():
+        if line.startswith('span_duration_seconds_count{span="page_shell_compile"}'):
+            return int(float(line.split()[-1]))
+    return 0
+
+
+def test_shell_rendered_once():
+    """Plain page loads reuse the compiled shell and render no fragments."""
+    print("🐚 Testing cached page shell...")
+    app_module.index_page._chunks = None
+    metrics.reset()
+    client = app_module.app.test_client()
+
+    pages = [client.get('/').get_data(as_text=True) for _ in range(3)]
+    assert pages[0] == pages[1] == pages[2]
+    assert _compile_count() == 1
+    assert 'page_fragment' not in metrics.render()
+    assert '\x00' not in pages[0]
+    assert 'class="qr-preview"' not in pages[0]
+    assert 'flash-messages' not in pages[0]
+    print("  ✅ 3 requests, 1 template render")
+
+
+def test_fragments_fill_the_shell():
+    client = app_module.app.test_client()
+    shell = client.get('/').get_data(as_text=True)
+
+    page = client.post('/shorten-url', data={
+        'full_url': 'https://confluence.example.com/pages/viewpage.action?pageId=123456'
+    }).get_data(as_text=True)
+    assert 'id="short-url-input"' in page
+    assert page.count('<html') == 1
+    assert len(page) > len(shell)
+
+    client.post('/generate-qr', data={'data': 'fragment'})
+    page = client.get('/?show_qr=1').get_data(as_text=True)
+    assert 'class="qr-preview"' in page
+    assert page.index('class="qr-preview"') < page.index('id="qr-form"')
+
+    with open(SVG_PATH, 'rb') as f:
+        page = client.post('/check-svg', data={'svg_file': (f, 'example.svg'), 'check_red': 'on'},
+                           content_type='multipart/form-data').get_data(as_text=True)
+    assert 'class="svg-analysis-results"' in page
+
+
+def test_flashed_messages_are_shown():
+    client = app_module.app.test_client()
+    response = client.post('/generate-qr', data={'data': ''}, follow_redirects=True)
+    page = response.get_data(as_text=True)
+    assert '<div class="flash error">Please enter text or URL to encode</div>' in page
+    # Consumed: the next page is the bare shell again
+    assert 'flash-messages' not in client.get('/').get_data(as_text=True)
+
+
+if __name__ == "__main__":
+    test_shell_rendered_once()
+    test_fragments_fill_the_shell()
+    test_flashed_messages_are_shown()
+    print("\n🎉 Page shell tests passed!")
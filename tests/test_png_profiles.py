@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Test PNG output profiles and lossless color reduction."""
+
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from PIL import Image, ImageChops
+from utils import QRCodeGenerator
+
+TEST_DATA = "https://example.com/png-profile-test"
+
+
+def test_two_color_codes_become_1bit():
+    """Plain black/white codes are written as 1-bit PNGs."""
+    print("🖼️  Testing 1-bit conversion...")
+
+    qr_gen = QRCodeGenerator()
+    sizes = {}
+    for profile in QRCodeGenerator.PNG_PROFILES:
+        buf, mimetype, _ = qr_gen.generate_qr_code(TEST_DATA, png_profile=profile)
+        image = Image.open(buf)
+        assert mimetype == 'image/png'
+        assert image.mode == '1', f"{profile} should produce a 1-bit image"
+        sizes[profile] = len(buf.getvalue())
+        print(f"  ✅ {profile}: {sizes[profile]} bytes")
+
+    assert sizes['small'] <= sizes['balanced'] <= sizes['fast']
+
+
+@pytest.mark.parametrize('module_drawer,color_mask', [
+    ('rounded', 'solid'),
+    ('circle', 'square'),
+])
+def test_palette_reduction_is_lossless(module_drawer, color_mask):
+    """Palette conversion keeps every pixel identical to the RGB render."""
+    print(f"🎨 Testing lossless palette reduction ({module_drawer}, {color_mask})...")
+
+    qr_gen = QRCodeGenerator(png_profile='small')
+    buf, _, _ = qr_gen.generate_qr_code(TEST_DATA, module_drawer=module_drawer, color_mask=color_mask)
+    reduced = Image.open(buf).convert('RGB')
+
+    import qrcode
+    from qrcode.image.styledpil import StyledPilImage
+    from qrcode.image.styles.moduledrawers.pil import RoundedModuleDrawer, CircleModuleDrawer
+    from qrcode.image.styles.colormasks import SquareGradiantColorMask
+
+    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=4)
+    qr.add_data(TEST_DATA)
+    qr.make(fit=True)
+    kwargs = {'image_factory': StyledPilImage}
+    kwargs['module_drawer'] = RoundedModuleDrawer() if module_drawer == 'rounded' else CircleModuleDrawer()
+    if color_mask == 'square':
+        kwargs['color_mask'] = SquareGradiantColorMask()
+    original = qr.make_image(**kwargs).get_image()
+
+    assert ImageChops.difference(reduced, original).getbbox() is None
+    print("  ✅ Pixels identical")
+
+
+def test_unknown_profile_rejected():
+    """Unknown profile names raise ValueError."""
+    with pytest.raises(ValueError):
+        QRCodeGenerator(png_profile='tiny')
+    with pytest.raises(ValueError):
+        QRCodeGenerator().generate_qr_code(TEST_DATA, png_profile='tiny')
+
+
+if __name__ == "__main__":
+    test_two_color_codes_become_1bit()
+    test_palette_reduction_is_lossless('rounded', 'solid')
+    test_palette_reduction_is_lossless('circle', 'square')
+    test_unknown_profile_rejected()
+    print("\n🎉 PNG profile tests passed!")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Test stateless signed preview tokens."""
+
+import re
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from utils import PreviewTokenCodec
+
+TEST_DATA = "https://example.com/preview-token-test"
+
+
+def test_round_trip_fills_defaults():
+    codec = PreviewTokenCodec('secret')
+    token = codec.dumps({'data': TEST_DATA, 'module_drawer': 'rounded', 'export_format': 'png',
+                         'foreground_color': None, 'pages': []})
+    params, issued = codec.loads(token)
+
+    assert params == {'data': TEST_DATA, 'export_format': 'png', 'module_drawer': 'rounded',
+                      'color_mask': 'solid'}
+    assert issued.tzinfo is not None
+    assert re.fullmatch(r'[A-Za-z0-9_.\-]+', token)
+
+
+def test_tampered_and_foreign_tokens_rejected():
+    codec = PreviewTokenCodec('secret')
+    token = codec.dumps({'data': TEST_DATA})
+
+    with pytest.raises(ValueError):
+        codec.loads(token[:-2] + ('AA' if not token.endswith('AA') else 'BB'))
+    with pytest.raises(ValueError):
+        PreviewTokenCodec('other-secret').loads(token)
+
+
+def test_expired_token_rejected():
+    token = PreviewTokenCodec('secret').dumps({'data': TEST_DATA})
+    with pytest.raises(ValueError):
+        PreviewTokenCodec('secret', max_age=-1).loads(token)
+
+
+def test_limits():
+    codec = PreviewTokenCodec('secret', max_length=200)
+    with pytest.raises(ValueError):
+        codec.dumps({'data': os.urandom(400).hex()})
+    with pytest.raises(ValueError):
+        codec.dumps({'logo_image': 'not encodable'})
+
+
+def test_stateless_preview_served_without_session():
+    """A token URL renders on a client (or node) that never saw the session."""
+    print("🔏 Testing stateless preview tokens...")
+
+    import app as app_module
+    app_module.PREVIEW_MODE = 'stateless'
+    try:
+        client = app_module.app.test_client()
+        response = client.post('/generate-qr', data={'data': TEST_DATA, 'module_drawer': 'circle',
+                                                     'export_format': 'svg'})
+        assert response.status_code == 302
+
+        page = client.get('/?show_qr=1').get_data(as_text=True)
+        url = re.search(r'src="(/qr/[^"]+)"', page).group(1)
+        download_url = re.search(r'href="(/qr/[^"]+download=1)"', page).group(1).replace('&amp;', '&')
+
+        fresh = app_module.app.test_client()
+        first = fresh.get(url)
+        assert first.status_code == 200
+        assert first.mimetype == 'image/svg+xml'
+        assert b'<svg' in first.data
+        assert first.headers['ETag']
+
+        # Deterministic output: conditional requests are answered with 304
+        again = fresh.get(url, headers={'If-None-Match': first.headers['ETag']})
+        assert again.status_code == 304
+
+        download = fresh.get(download_url)
+        assert download.data == first.data
+        assert re.search(r'attachment; filename="[\d_-]+_qrcode\.svg"', download.headers['Content-Disposition'])
+
+        assert fresh.get('/qr/not-a-token').status_code == 404
+        print("  ✅ Token preview rendered on a fresh client")
+    finally:
+        app_module.PREVIEW_MODE = 'session'
+
+
+if __name__ == "__main__":
+    test_round_trip_fills_defaults()
+    test_tampered_and_foreign_tokens_rejected()
+    test_expired_token_rejected()
+    test_limits()
+    test_stateless_preview_served_without_session()
+    print("\n🎉 Preview token tests passed!")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Test opt-in request profiling."""
+
+import sys
+import os
+import tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from flask import Flask
+from utils import RequestProfiler
+
+
+def test_disabled_profiler_leaves_view_untouched():
+    """Without a token the decorator returns the original function."""
+    print("🔬 Testing disabled profiler...")
+
+    profiler = RequestProfiler(token=None, profile_dir=tempfile.mkdtemp())
+
+    def view():
+        return 'ok'
+
+    assert profiler.profile_view(view) is view
+    assert profiler.list_profiles() == []
+    print("  ✅ Disabled profiler adds no wrapper")
+
+
+def test_profile_capture():
+    """Authorized requests are profiled and can be rendered as text."""
+    print("🔬 Testing profile capture...")
+
+    profiler = RequestProfiler(token='secret', profile_dir=tempfile.mkdtemp(), max_profiles=2)
+    app = Flask(__name__)
+
+    @app.route('/work', methods=['POST'])
+    @profiler.profile_view
+    def work():
+        return {'total': sum(range(1000))}
+
+    client = app.test_client()
+    assert 'X-Profile-Id' not in client.post('/work').headers
+    assert 'X-Profile-Id' not in client.post('/work', headers={'X-Profile': 'wrong'}).headers
+
+    profile_ids = []
+    for _ in range(3):
+        response = client.post('/work', headers={'X-Profile': 'secret'})
+        assert response.json == {'total': 499500}
+        profile_ids.append(response.headers['X-Profile-Id'])
+
+    saved = [info['id'] for info in profiler.list_profiles()]
+    assert len(saved) == 2, "old profiles should be pruned"
+    assert profile_ids[-1] in saved
+    assert saved[0] and profiler.list_profiles()[0]['path'] == '/work'
+
+    report = profiler.render_text(profile_ids[-1])
+    assert 'function calls' in report
+    assert profiler.render_text('../etc/passwd') is None
+    assert 'function calls' in profiler.render_text(profile_ids[-1], sort='time')
+    with pytest.raises(ValueError):
+        profiler.render_text(profile_ids[-1], sort='bogus')
+    print("  ✅ Profiles captured, pruned and rendered")
+
+
+def test_profile_route_rejects_unknown_sort(monkeypatch):
+    import app as app_module
+    profiler = RequestProfiler(token='secret', profile_dir=tempfile.mkdtemp())
+    monkeypatch.setattr(app_module, 'profiler', profiler)
+    work = Flask(__name__)
+    work.add_url_rule('/work', 'work', profiler.profile_view(lambda: 'done'))
+    profile_id = work.test_client().get('/work', headers={'X-Profile': 'secret'}).headers['X-Profile-Id']
+
+    client = app_module.app.test_client()
+    url = f'/profiles/{profile_id}?format=text&token=secret'
+    assert client.get(url + '&sort=calls').status_code == 200
+    response = client.get(url + '&sort=bogus')
+    assert response.status_code == 400 and 'Unknown sort order' in response.get_json()['error']
+
+
+if __name__ == "__main__":
+    test_disabled_profiler_leaves_view_untouched()
+    test_profile_capture()
+    print("\n🎉 Profiling tests passed!")
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Test reading rendered QR codes back: grid sampling, Reed-Solomon correction and verification."""
+
+import sys
+import os
+import io
+import time
+import random
+import subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from utils import QRCodeGenerator, QRCodeReader
+from utils.qr_decodability import codeword_map
+
+
+def _logo():
+    return Image.new('RGB', (120, 120), '#1b4f8a')
+
+
+@pytest.mark.parametrize('level', ['L', 'M', 'Q', 'H'])
+def test_decodes_module_matrices(level):
+    generator = QRCodeGenerator(error_correction=level)
+    reader = QRCodeReader()
+    for data in ['0123456789' * 7, 'HELLO WORLD $%*+-./:', 'https://example.com/?q=1', 'Grüße ✓', 'x' * 900]:
+        qr = generator.module_matrix(data)
+        result = reader.decode(qr.modules)
+        assert result['data'] == data
+        assert result['version'] == qr.version and result['error_correction'] == level
+        assert result['codeword_errors'] == 0 and result['format_errors'] == 0
+
+
+def test_corrects_up_to_block_capacity():
+    generator = QRCodeGenerator(error_correction='M')
+    reader = QRCodeReader()
+    qr = generator.module_matrix('y' * 300)
+    modules = np.array(qr.modules)
+    owners = {}
+    for r, row in enumerate(codeword_map(qr.version)):
+        for c, codeword in enumerate(row):
+            if codeword is not None:
+                owners.setdefault(codeword, []).append((r, c))
+
+    capacities = reader.decode(modules)['block_capacities']
+    rng = random.Random(7)
+    damaged = modules.copy()
+    # One flipped module in each of the first codewords damages every block evenly
+    for codeword in range(len(capacities) * min(capacities)):
+        r, c = rng.choice(owners[codeword])
+        damaged[r, c] = not damaged[r, c]
+    result = reader.decode(damaged)
+    assert result['data'] == 'y' * 300
+    assert result['codeword_errors'] == len(capacities) * min(capacities)
+    assert result['worst_block_usage'] == 1
+
+    # Far beyond capacity the code no longer decodes
+    for codeword in rng.sample(sorted(owners), len(owners) // 2):
+        r, c = owners[codeword][0]
+        damaged[r, c] = not damaged[r, c]
+    with pytest.raises(ValueError):
+        reader.decode(damaged)
+
+
+def test_verify_styled_renders():
+    generator = QRCodeGenerator()
+    data = 'https://example.com/styled'
+    for style in [{}, {'module_drawer': 'circle'}, {'module_drawer': 'rounded', 'color_mask': 'radial'},
+                  {'color_mask': 'custom', 'gradient_start': '#1b4f8a', 'gradient_end': '#000000'}]:
+        report = generator.verify_image(generator.render_image(data, **style), data)
+        assert report['ok'] and report['module_errors'] == 0 and report['error_margin'] == 1
+
+    # A logo costs codewords but stays within the correction capacity
+    report = generator.verify_image(generator.render_image(data, logo_image=_logo()), data, _logo())
+    assert report['ok']
+    assert report['module_errors'] > 0 and report['codeword_errors'] > 0
+    assert 0 <= report['error_margin'] < 1
+
+    # Previews are read at their own box size
+    preview = Image.open(io.BytesIO(generator.render_preview(data, preview_format='png', size=128)[0]))
+    assert generator.verify_image(preview, data)['ok']
+
+
+def test_generate_with_verify():
+    generator = QRCodeGenerator()
+    result = generator.generate_qr_code('verify me')
+    assert len(result) == 3
+    for export_format in ('png', 'webp', 'svg'):
+        buf, mimetype, filename, report = generator.generate_qr_code('verify me', export_format=export_format,
+                                                                     verify=True)
+        assert report['ok'] and report['data'] == 'verify me'
+
+    # Custom solid colors are drawn in the raster the vector formats are checked on
+    custom = {'color_mask': 'custom', 'foreground_color': '#1b4f8a', 'background_color': '#f5f0e1'}
+    buf = generator.generate_qr_code('verify me', **custom)[0]
+    assert set(color for _, color in Image.open(buf).convert('RGB').getcolors()) == {(27, 79, 138), (245, 240, 225)}
+    assert generator.generate_qr_code('verify me', export_format='svg', verify=True, **custom)[3]['ok']
+    inverted = dict(custom, foreground_color='#ffffff', background_color='#000000')
+    assert not generator.generate_qr_code('verify me', export_format='svg', verify=True, **inverted)[3]['ok']
+
+    data = 'z' * 1500
+    generator.module_matrix(data)
+    image = generator.render_image(data)
+    start = time.perf_counter()
+    report = generator.verify_image(image, data)
+    elapsed = time.perf_counter() - start
+    print(f"Verified a version {report['version']} render in {elapsed * 1000:.1f}ms")
+    assert report['ok']
+
+
+def test_batch_verification(tmp_path):
+    generator = QRCodeGenerator()
+    paths = []
+    for i, data in enumerate(['first', 'second code', 'ÜNICODE']):
+        buf = generator.generate_qr_code(data, module_drawer='rounded')[0]
+        paths.append(str(tmp_path / f'code{i}.png'))
+        with open(paths[-1], 'wb') as f:
+            f.write(buf.getvalue())
+    broken = tmp_path / 'broken.png'
+    broken.write_bytes(b'not an image')
+    blank = tmp_path / 'blank.png'
+    Image.new('RGB', (100, 100), 'white').save(blank)
+
+    reports = dict(QRCodeReader().verify_files(paths + [str(broken), str(blank)], {paths[0]: 'first'}))
+    assert [reports[path]['data'] for path in paths] == ['first', 'second code', 'ÜNICODE']
+    assert all(reports[path]['ok'] for path in paths)
+    assert not reports[str(broken)]['decoded'] and not reports[str(blank)]['decoded']
+
+    # Wrong expected data
+    assert not QRCodeReader().verify(Image.open(paths[1]), 'first')['ok']
+
+    script = os.path.join(os.path.dirname(__file__), '..', 'cli.py')
+    result = subprocess.run([sys.executable, script, 'verify'] + paths, capture_output=True, text=True)
+    assert result.returncode == 0 and result.stdout.count('OK:') == 3
+    result = subprocess.run([sys.executable, script, 'verify', paths[0], str(broken), '--data', 'first'],
+                            capture_output=True, text=True)
+    assert result.returncode == 1 and '1 of 2 file(s) failed' in result.stdout
+
+
+def test_app_verifies_renders(monkeypatch):
+    import app as app_module
+    client = app_module.app.test_client()
+    response = client.post('/generate-qr', data={'data': 'checked', 'export_format': 'png'}, follow_redirects=True)
+    assert 'did not read back' not in response.get_data(as_text=True)
+
+    monkeypatch.setattr(app_module.qr_generator, 'verify_image',
+                        lambda image, data, logo_image=None: {'ok': False, 'error': 'Format information is unreadable'})
+    response = client.post('/generate-qr', data={'data': 'checked', 'export_format': 'png'}, follow_redirects=True)
+    assert 'did not read back' in response.get_data(as_text=True)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    for level in ('L', 'M', 'Q', 'H'):
+        test_decodes_module_matrices(level)
+    test_corrects_up_to_block_capacity()
+    test_verify_styled_renders()
+    test_generate_with_verify()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_batch_verification(pathlib.Path(tmp))
+    print("\n🎉 QR reader tests passed!")
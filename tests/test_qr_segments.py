@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Test optimal segment-mode encoding: the dynamic program, version fitting and reports."""
+
+import sys
+import os
+import random
+import itertools
+import subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import qrcode
+from qrcode import util
+
+from utils import QRCodeGenerator, QRCodeReader
+from utils.qr_segments import optimal_segments, segment_bits, fit_segments, MODES
+
+CONTACT = 'MECARD:N:DOE,JOHN;TEL:+4930123456789;EMAIL:J@EXAMPLE.COM;;'
+
+
+def _brute_force_bits(payload, version):
+    """Fewest bits over every assignment of allowed modes to the bytes."""
+    choices = []
+    for byte in payload:
+        choices.append([mode for mode, allowed in zip(MODES, (True, byte in util.ALPHA_NUM, byte in b'0123456789'))
+                        if allowed])
+    best = None
+    for modes in itertools.product(*choices):
+        segments = [util.QRData(bytes(byte for byte, _ in group), mode=mode, check_data=False)
+                    for mode, group in itertools.groupby(zip(payload, modes), key=lambda pair: pair[1])]
+        bits = segment_bits(segments, version)
+        best = bits if best is None else min(best, bits)
+    return best
+
+
+def test_matches_brute_force():
+    rng = random.Random(3)
+    alphabet = b'0123456789ABC:/ab'
+    for version in (1, 10, 27):
+        for _ in range(60):
+            payload = bytes(rng.choice(alphabet) for _ in range(rng.randint(1, 9)))
+            segments = optimal_segments(payload, version)
+            assert b''.join(segment.data for segment in segments) == payload
+            assert segment_bits(segments, version) == _brute_force_bits(payload, version)
+
+
+def test_segment_bits_match_encoder():
+    for version in (1, 10, 27):
+        segments = optimal_segments(CONTACT + ' grüße 42', version)
+        buffer = util.BitBuffer()
+        for segment in segments:
+            buffer.put(segment.mode, 4)
+            buffer.put(len(segment), util.length_in_bits(segment.mode, version))
+            segment.write(buffer)
+        assert len(buffer) == segment_bits(segments, version)
+
+
+def test_smaller_versions_than_default_split():
+    # Never larger than qrcode's own split, and smaller for mixed payloads
+    rng = random.Random(5)
+    smaller = 0
+    for _ in range(100):
+        payload = ''.join(rng.choice(['0', '7', 'A', 'Z', '/', 'x', '-']) for _ in range(rng.randint(10, 200)))
+        version, _ = fit_segments(payload, qrcode.constants.ERROR_CORRECT_M)
+        qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M)
+        qr.add_data(payload)
+        default = qr.best_fit()
+        assert version <= default
+        smaller += version < default
+    assert smaller > 5
+
+    plan = QRCodeGenerator().plan_segments(CONTACT)
+    assert plan['baseline_version'] > plan['version']
+    assert plan['modules_saved'] == (plan['baseline_version'] * 4 + 17) ** 2 - plan['modules']
+    assert {segment['mode'] for segment in plan['segments']} == {'alphanumeric', 'numeric', 'byte'}
+
+
+def test_optimized_codes_decode():
+    generator = QRCodeGenerator(error_correction='Q')
+    reader = QRCodeReader()
+    for data in [CONTACT, '0123456789' * 50 + 'tail', 'Grüße 12345678 ✓ ABCDEFGHIJ', '', 'x' * 1000 + '9' * 900]:
+        qr = generator.module_matrix(data)
+        assert qr.version == generator.plan_segments(data)['version']
+        result = reader.decode(qr.modules)
+        assert result['data'] == data
+
+    # A long digit run is one numeric segment
+    digits = '1' * 1200
+    version, segments = fit_segments(digits, qrcode.constants.ERROR_CORRECT_L)
+    assert len(segments) == 1 and segments[0].mode == util.MODE_NUMBER
+    assert reader.decode(QRCodeGenerator(error_correction='L').module_matrix(digits).modules)['data'] == digits
+
+
+def test_cli_reports_savings(tmp_path):
+    script = os.path.join(os.path.dirname(__file__), '..', 'cli.py')
+    output = tmp_path / 'contact.png'
+    result = subprocess.run([sys.executable, script, 'qr', '--data', CONTACT, '--output', str(output)],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert 'modules saved by segment optimization' in result.stdout
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_matches_brute_force()
+    test_segment_bits_match_encoder()
+    test_smaller_versions_than_default_split()
+    test_optimized_codes_decode()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_cli_reports_savings(pathlib.Path(tmp))
+    print("\n🎉 QR segment tests passed!")
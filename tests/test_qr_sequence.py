@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Test splitting large payloads into structured append sequences and rendering them as bundles."""
+
+import sys
+import os
+import io
+import zipfile
+import subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from PIL import Image
+
+from utils import QRCodeGenerator, QRCodeReader, QRRenderPool
+from utils.qr_sequence import split_payload, parity
+
+LONG = 'https://example.com/catalogue?items=' + ','.join(f'Artikel-{i:04d}-größe' for i in range(120))
+
+
+def _read_bundle(body):
+    reader = QRCodeReader()
+    with zipfile.ZipFile(io.BytesIO(body)) as archive:
+        names = archive.namelist()
+        reports = [reader.verify(Image.open(io.BytesIO(archive.read(name)))) for name in names]
+    return names, reports
+
+
+def test_split_payload():
+    parts = split_payload('ab€cd€ef', 3)
+    assert ''.join(part.data for part in parts) == 'ab€cd€ef'
+    assert [part.index for part in parts] == [0, 1, 2] and {part.total for part in parts} == {3}
+    assert {part.parity for part in parts} == {parity('ab€cd€ef'.encode('utf-8'))}
+    with pytest.raises(ValueError):
+        split_payload('abc', 17)
+
+
+def test_plan_sequence():
+    generator = QRCodeGenerator()
+    assert generator.plan_sequence('short') == ['short']
+
+    parts = generator.plan_sequence(LONG, max_version=8)
+    assert ''.join(part.data for part in parts) == LONG
+    versions = [generator.module_matrix(part).version for part in parts]
+    assert max(versions) <= 8
+    # As few codes as possible
+    fewer = split_payload(LONG, len(parts) - 1)
+    assert max(generator.plan_symbol(part)['version'] for part in fewer) > 8
+    assert generator.module_matrix(LONG).version > 8
+
+    with pytest.raises(ValueError):
+        generator.plan_sequence('x' * 3000, max_version=2)
+
+    # Gradient contrast is sampled on the modules of a single code of the sequence
+    parts = generator.plan_sequence('x' * 4000, max_version=10)
+    assert generator.check_contrast(parts[0], color_mask='radial')['gradient']['samples'] > 0
+
+
+def test_sequence_symbols_decode():
+    generator = QRCodeGenerator()
+    parts = generator.plan_sequence(LONG, max_version=8)
+    decoded = []
+    for part in parts:
+        buf, mimetype, filename, report = generator.generate_qr_code(part, module_drawer='rounded', verify=True)
+        assert report['ok']
+        assert report['structured_append'] == {'index': part.index, 'total': len(parts), 'parity': part.parity}
+        decoded.append(report['data'])
+    assert ''.join(decoded) == LONG
+
+    # With a logo every code is planned with the error correction the logo needs
+    logo = Image.new('RGB', (100, 100), 'navy')
+    parts = generator.plan_sequence(LONG[:500], max_version=5, logo_image=logo)
+    for part in parts:
+        assert generator.module_matrix(part, logo).version <= 5
+        report = generator.verify_image(generator.render_image(part, logo_image=logo), part, logo)
+        assert report['ok'] and report['codeword_errors'] > 0
+
+
+def test_bundles():
+    generator = QRCodeGenerator()
+    parts = generator.plan_sequence(LONG, max_version=8)
+    buf, mimetype, filename = generator.generate_sequence(parts, 'png')
+    assert mimetype == 'application/zip' and filename.endswith('.zip')
+    names, reports = _read_bundle(buf.getvalue())
+    assert names[0] == f'qr-01-of-{len(parts):02d}.png'
+    assert ''.join(report['data'] for report in reports) == LONG
+
+    buf, mimetype, _ = generator.generate_sequence(parts, 'pdf')
+    assert mimetype == 'application/pdf'
+    assert buf.getvalue().count(b'/Type /Page\n') + buf.getvalue().count(b'/Type /Page ') == len(parts)
+
+    # Rendered in parallel, with the same names and content
+    out = io.BytesIO()
+    with QRRenderPool(processes=2) as pool:
+        assert pool.write_sequence(parts, out, export_format='png') == len(parts)
+    parallel_names, parallel_reports = _read_bundle(out.getvalue())
+    assert parallel_names == names
+    assert [report['data'] for report in parallel_reports] == [report['data'] for report in reports]
+
+
+def test_app_and_cli_split(tmp_path):
+    import app as app_module
+    client = app_module.app.test_client()
+    response = client.post('/generate-qr', data={'data': LONG, 'split_sequence': 'on'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+    assert 'attachment' in response.headers['Content-Disposition']
+    _, reports = _read_bundle(response.get_data())
+    assert ''.join(report['data'] for report in reports) == LONG
+
+    # Payloads beyond the capacity of any single code are split too
+    oversized = 'x' * 4000
+    response = client.post('/generate-qr', data={'data': oversized, 'split_sequence': 'on'})
+    assert response.status_code == 200 and response.mimetype == 'application/zip'
+    _, reports = _read_bundle(response.get_data())
+    assert ''.join(report['data'] for report in reports) == oversized
+    # A gradient is contrast-checked on the first code instead of the whole payload
+    response = client.post('/generate-qr', data={'data': oversized, 'split_sequence': 'on', 'export_format': 'svg',
+                                                 'color_mask': 'custom', 'use_gradient': 'on',
+                                                 'gradient_start': '#000000', 'gradient_end': '#1b4f8a'})
+    assert response.status_code == 200 and response.mimetype == 'application/zip'
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        assert len(archive.namelist()) == len(reports)
+
+    # Small payloads stay a single code
+    response = client.post('/generate-qr', data={'data': 'short', 'split_sequence': 'on'})
+    assert response.status_code == 302
+
+    script = os.path.join(os.path.dirname(__file__), '..', 'cli.py')
+    output = tmp_path / 'codes.zip'
+    result = subprocess.run([sys.executable, script, 'qr', '--data', LONG, '--split', '--max-version', '8',
+                             '--workers', '2', '--output', str(output)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert 'Payload split into' in result.stdout
+
+    # Splitting applies to one payload; several --data values are rejected rather than ignored
+    for flag in ('--split', '--verify'):
+        result = subprocess.run([sys.executable, script, 'qr', '--data', LONG, '--data', 'short', flag,
+                                 '--output', str(tmp_path / 'codes.zip')], capture_output=True, text=True)
+        assert result.returncode == 2 and 'single --data value' in result.stderr
+    for version in ('0', '41'):
+        result = subprocess.run([sys.executable, script, 'qr', '--data', LONG, '--split', '--max-version', version,
+                                 '--output', str(tmp_path / 'codes.zip')], capture_output=True, text=True)
+        assert result.returncode == 2 and 'between 1 and 40' in result.stderr
+    _, reports = _read_bundle(output.read_bytes())
+    assert ''.join(report['data'] for report in reports) == LONG
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_split_payload()
+    test_plan_sequence()
+    test_sequence_symbols_decode()
+    test_bundles()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_app_and_cli_split(pathlib.Path(tmp))
+    print("\n🎉 QR sequence tests passed!")
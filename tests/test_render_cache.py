@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test the shared SQLite render cache."""
+
+import sys
+import os
+import multiprocessing
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils import SharedRenderCache, metrics
+
+
+def _worker_put(directory, index):
+    cache = SharedRenderCache(directory)
+    cache.put(f'key-{index}', f'value-{index}'.encode(), 'text/plain')
+
+
+def test_round_trip(tmp_path):
+    cache = SharedRenderCache(str(tmp_path))
+    key = cache.make_key('render', {'data': 'x', 'export_format': 'png'})
+
+    assert cache.get(key) is None
+    cache.put(key, b'\x89PNG', 'image/png')
+    assert cache.get(key) == (b'\x89PNG', 'image/png')
+    assert key == cache.make_key('render', {'export_format': 'png', 'data': 'x'})
+    assert key != cache.make_key('preview', {'data': 'x', 'export_format': 'png'})
+
+
+def test_shared_between_processes(tmp_path):
+    """Entries written by other worker processes are visible to everyone."""
+    print("🗄️  Testing cross-process render cache...")
+
+    processes = [multiprocessing.Process(target=_worker_put, args=(str(tmp_path), i)) for i in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    cache = SharedRenderCache(str(tmp_path))
+    for i in range(4):
+        assert cache.get(f'key-{i}') == (f'value-{i}'.encode(), 'text/plain')
+    assert cache.stats()['entries'] == 4
+    print("  ✅ 4 processes shared one keyspace")
+
+
+def test_lru_eviction(tmp_path):
+    """Least recently used entries go first once the size limit is exceeded."""
+    cache = SharedRenderCache(str(tmp_path), max_bytes=300, touch_interval=0)
+    for name in ('a', 'b', 'c'):
+        cache.put(name, b'x' * 100, 'text/plain')
+    cache.get('a')  # 'b' is now the least recently used
+    cache.put('d', b'x' * 100, 'text/plain')
+
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None and cache.get('d') is not None
+    assert cache.stats()['bytes'] <= 300
+
+    cache.put('huge', b'x' * 301, 'text/plain')
+    assert cache.get('huge') is None
+
+
+def test_running_size_total(tmp_path):
+    """The stored byte total is kept incrementally and matches the entries."""
+    cache = SharedRenderCache(str(tmp_path), max_bytes=1000)
+
+    def stored():
+        return cache._connection().execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    cache.put('a', b'x' * 100, 'text/plain')
+    cache.put('a', b'x' * 250, 'text/plain')  # replacing an entry counts its new size only
+    for i in range(10):
+        cache.put(f'k{i}', b'x' * 150, 'text/plain')
+    assert cache.stats()['bytes'] == stored() <= 1000
+
+    # A database written before the total existed is counted when it is opened
+    cache._connection().executescript('DROP TABLE cache_size')
+    assert SharedRenderCache(str(tmp_path), max_bytes=1000).stats()['bytes'] == stored()
+
+    cache.clear()
+    assert cache.stats() == {'entries': 0, 'bytes': 0, 'max_bytes': 1000}
+
+
+def test_get_or_render_counts_hits(tmp_path):
+    metrics.reset()
+    cache = SharedRenderCache(str(tmp_path), name='test_render')
+    calls = []
+
+    def render():
+        calls.append(1)
+        return b'svg', 'image/svg+xml'
+
+    assert cache.get_or_render('k', render) == (b'svg', 'image/svg+xml')
+    assert cache.get_or_render('k', render) == (b'svg', 'image/svg+xml')
+    assert len(calls) == 1
+    output = metrics.render()
+    assert 'cache_hits_total{cache="test_render"} 1' in output
+    assert 'cache_misses_total{cache="test_render"} 1' in output
+
+
+def test_app_shares_renders_between_form_and_token(tmp_path):
+    """A stateless preview token is served from the render the form stored."""
+    import app as app_module
+    app_module.render_cache = SharedRenderCache(str(tmp_path))
+    app_module.PREVIEW_MODE = 'stateless'
+    try:
+        client = app_module.app.test_client()
+        client.post('/generate-qr', data={'data': 'cache me', 'foreground_color': '#000000'})
+        assert app_module.render_cache.stats()['entries'] == 1
+
+        token = client.get('/?show_qr=1').get_data(as_text=True).split('/qr/')[1].split('"')[0]
+        metrics.reset()
+        assert client.get(f'/qr/{token}').status_code == 200
+        assert 'cache_hits_total{cache="render"} 1' in metrics.render()
+    finally:
+        app_module.render_cache = None
+        app_module.PREVIEW_MODE = 'session'
+
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_round_trip, test_shared_between_processes, test_lru_eviction, test_running_size_total,
+                 test_get_or_render_counts_hits, test_app_shares_renders_between_form_and_token):
+        with tempfile.TemporaryDirectory() as directory:
+            test(directory)
+    print("\n🎉 Render cache tests passed!")
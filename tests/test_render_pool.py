@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test the shared-memory QR render pool."""
+
+import io
+import sys
+import os
+import zipfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from qrcode.exceptions import DataOverflowError
+from utils import QRCodeGenerator, QRRenderPool
+
+TEST_DATA = "https://example.com/render-pool-test"
+
+
+def test_results_match_serial_rendering():
+    """Pooled output is byte-identical to rendering in-process."""
+    print("🧵 Testing pooled rendering...")
+
+    expected, _, _ = QRCodeGenerator().generate_qr_code(TEST_DATA, module_drawer='rounded')
+    with QRRenderPool(processes=2) as pool:
+        with pool.render(TEST_DATA, module_drawer='rounded') as result:
+            assert isinstance(result.data, memoryview)
+            assert result.mimetype == 'image/png'
+            assert bytes(result.data) == expected.getvalue()
+    print(f"  ✅ {len(expected.getvalue())} bytes via shared memory")
+
+
+def test_imap_preserves_order_and_reuses_slots():
+    """More items than slots are processed in order as slots are released."""
+    payloads = [f"{TEST_DATA}/{i}" for i in range(12)]
+    qr_gen = QRCodeGenerator()
+    with QRRenderPool(processes=2, slots=3) as pool:
+        for payload, result in zip(payloads, pool.imap(payloads, export_format='svg')):
+            with result:
+                expected, _, _ = qr_gen.generate_qr_code(payload, export_format='svg')
+                assert bytes(result.data) == expected.getvalue()
+        assert pool._free.qsize() == 3
+
+
+def test_oversized_result_falls_back_inline():
+    """Output larger than a slot is returned through the result pipe."""
+    with QRRenderPool(processes=1, slots=1, slot_size=64) as pool:
+        with pool.render(TEST_DATA) as result:
+            assert len(result) > 64
+            assert bytes(result.data[:8]) == b'\x89PNG\r\n\x1a\n'
+        # The slot was never held, so the next render does not block
+        with pool.render(TEST_DATA) as result:
+            assert len(result) > 64
+
+
+def test_write_archive():
+    buf = io.BytesIO()
+    with QRRenderPool(processes=2) as pool:
+        count = pool.write_archive((f"{TEST_DATA}/{i}" for i in range(5)), buf, export_format='webp')
+
+    assert count == 5
+    with zipfile.ZipFile(buf) as archive:
+        assert archive.namelist() == [f'qr-{i:04d}.webp' for i in range(1, 6)]
+
+
+def test_worker_errors_propagate():
+    """A failing render raises in the parent and frees its slot."""
+    with QRRenderPool(processes=1, slots=1) as pool:
+        with pytest.raises(ValueError):
+            pool.render(TEST_DATA, export_format='gif')
+        with pool.render(TEST_DATA) as result:
+            assert len(result) > 0
+
+
+
+def test_imap_returns_slots_on_error_and_early_exit():
+    """Slots of tasks still in flight go back to the pool when imap stops."""
+    payloads = [TEST_DATA, 'x' * 5000, TEST_DATA, TEST_DATA]
+    with QRRenderPool(processes=2, slots=3) as pool:
+        with pytest.raises(DataOverflowError):
+            for result in pool.imap(payloads):
+                result.release()
+        assert pool._free.qsize() == 3
+
+        results = pool.imap(f"{TEST_DATA}/{i}" for i in range(10))
+        next(results).release()
+        results.close()
+        assert pool._free.qsize() == 3
+        with pool.render(TEST_DATA) as result:
+            assert len(result) > 0
+
+
+if __name__ == "__main__":
+    test_results_match_serial_rendering()
+    test_imap_preserves_order_and_reuses_slots()
+    test_oversized_result_falls_back_inline()
+    test_write_archive()
+    test_worker_errors_propagate()
+    test_imap_returns_slots_on_error_and_early_exit()
+    print("\n🎉 Render pool tests passed!")
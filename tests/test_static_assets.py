@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Test content-hashed static URLs and their cache headers."""
+
+import sys
+import os
+import re
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils import StaticAssetManifest
+import app as app_module
+
+
+def test_manifest_names_follow_content(tmp_path):
+    (tmp_path / 'css').mkdir()
+    (tmp_path / 'css' / 'site.css').write_text('body {}')
+    (tmp_path / 'css' / 'site.css.gz').write_bytes(b'skipped')
+    manifest = StaticAssetManifest(str(tmp_path))
+
+    hashed = manifest.hashed('css/site.css')
+    assert re.fullmatch(r'css/site\.[0-9a-f]{12}\.css', hashed)
+    assert manifest.resolve(hashed) == 'css/site.css'
+    assert manifest.hashed('css/site.css.gz') == 'css/site.css.gz'
+    assert manifest.hashed('missing.js') == 'missing.js'
+
+    (tmp_path / 'css' / 'site.css').write_text('body { color: red }')
+    manifest.build()
+    assert manifest.hashed('css/site.css') != hashed
+    assert manifest.resolve(hashed) is None
+
+
+def test_pages_reference_fingerprinted_assets():
+    """Every static URL in the page is hashed and served as immutable."""
+    print("🔖 Testing static asset fingerprinting...")
+    client = app_module.app.test_client()
+    page = client.get('/').get_data(as_text=True)
+    urls = re.findall(r'/static/[^"]+', page)
+    assert len(urls) == 6
+
+    for url in urls:
+        assert re.search(r'\.[0-9a-f]{12}\.\w+$', url), url
+        response = client.get(url, headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.cache_control.max_age == 365 * 24 * 3600
+        assert response.cache_control.immutable
+        assert response.cache_control.public
+    print(f"  ✅ {len(urls)} assets cached for a year")
+
+
+def test_plain_and_stale_names():
+    client = app_module.app.test_client()
+    plain = client.get('/static/js/script.js')
+    assert plain.status_code == 200
+    assert not plain.cache_control.immutable
+    assert client.get('/static/js/script.000000000000.js').status_code == 404
+
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as directory:
+        test_manifest_names_follow_content(pathlib.Path(directory))
+    test_pages_reference_fingerprinted_assets()
+    test_plain_and_stale_names()
+    print("\n🎉 Static asset tests passed!")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Test the streaming SVG stroke fixer, its endpoint and svg_checker.py --fix."""
+
+import sys
+import os
+import io
+import subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+from lxml import etree
+
+from utils import SVGColorValidator, SVGFixer
+
+DRAWING = '''<?xml version="1.0"?>
+<!-- Exported -->
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+     width="100mm" height="50mm" viewBox="0 0 200 100">
+  <style>.c{stroke:#00f;stroke-width:3}</style>
+  <defs><path id="template" stroke="blue" d="M0 0L5 5"/></defs>
+  <g stroke="blue" stroke-width="0.5">Label &amp; text
+    <path id="styled" class="c" d="M0 0L1 1"/><!-- keep me -->
+    <rect id="scaled" width="1" height="1" style="fill:none;stroke-opacity:0.4" transform="scale(2)"/>
+    <use xlink:href="#template"/>
+    <rect id="ok" stroke="red" stroke-width="2" width="1" height="1"/>
+  </g>
+  <circle id="engraved" r="3" fill="black"/>
+</svg>'''
+
+
+def test_fix_makes_drawing_compliant():
+    fixer = SVGFixer()
+    fixed = fixer.fix_string(DRAWING)
+    assert fixer.stats == {'shapes': 3, 'fixed': 2, 'color': 2, 'width': 2, 'opacity': 1}
+
+    analysis = SVGColorValidator().validate_svg_colors(fixed)
+    shapes = {shape['id']: shape for shape in analysis['shapes']}
+    for shape_id in ('styled', 'scaled', 'ok'):
+        assert shapes[shape_id]['stroke']['color'] in ('#ff0000', 'red')
+        assert shapes[shape_id]['width_ok']
+        assert shapes[shape_id]['stroke_opacity'] == '1'
+    # Unstroked shapes and <defs> content are left alone
+    assert shapes['engraved']['stroke']['color'] is None
+    assert shapes['template']['stroke']['color'] == 'blue'
+
+    # Everything else is copied through
+    root = etree.fromstring(fixed.encode('utf-8'))
+    assert '<!-- keep me -->' in fixed and 'Label &amp; text' in fixed
+    assert root.find('.//{http://www.w3.org/2000/svg}use').get('{http://www.w3.org/1999/xlink}href') == '#template'
+    assert root.find('.//{http://www.w3.org/2000/svg}rect').get('style') == \
+        'fill:none;stroke:#ff0000;stroke-width:1;stroke-opacity:1'
+    # An already compliant drawing is not changed again
+    again = SVGFixer()
+    again.fix_string(fixed)
+    assert again.stats['fixed'] == 0
+
+
+def test_only_selected_settings_are_fixed():
+    svg = '<svg xmlns="http://www.w3.org/2000/svg"><line stroke="blue" stroke-width="3" stroke-opacity="0.5"/></svg>'
+    fixed = SVGFixer(fix_width=False, fix_opacity=False).fix_string(svg)
+    line = etree.fromstring(fixed.encode('utf-8'))[0]
+    assert line.get('style') == 'stroke:#ff0000'
+    assert line.get('stroke-width') == '3' and line.get('stroke-opacity') == '0.5'
+    # Without scaling the width is written as 1mm
+    fixed = SVGFixer(fix_color=False, fix_opacity=False).fix_string(svg)
+    assert 'stroke-width:1mm' in fixed
+
+
+def test_streams_large_documents():
+    """Output arrives in chunks while parsing, and finished elements are dropped."""
+    shapes = ''.join(f'<path id="p{i}" stroke="blue" d="M{i} 0L{i} 10"/>' for i in range(50000))
+    source = io.BytesIO(f'<svg xmlns="http://www.w3.org/2000/svg"><g>{shapes}</g></svg>'.encode())
+    fixer = SVGFixer()
+    chunks = list(fixer.stream(source))
+    assert len(chunks) > 10
+    assert all(len(chunk) < 2 * SVGFixer.CHUNK_SIZE for chunk in chunks)
+    assert fixer.stats['fixed'] == 50000
+    fixed = b''.join(chunks)
+    assert fixed.count(b'stroke:#ff0000;stroke-width:1mm') == 50000
+    assert len(etree.fromstring(fixed)[0]) == 50000
+
+    with pytest.raises(etree.XMLSyntaxError):
+        SVGFixer().stream(io.BytesIO(b'<svg><path></svg>'))
+
+
+def test_fix_endpoint():
+    import app as app_module
+    client = app_module.app.test_client()
+    response = client.post('/fix-svg', data={'svg_file': (io.BytesIO(DRAWING.encode()), 'logo.svg'),
+                                             'check_red': 'on', 'check_width': 'on', 'check_opacity': 'on'},
+                           content_type='multipart/form-data')
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'image/svg+xml'
+    assert 'logo-fixed.svg' in response.headers['Content-Disposition']
+    analysis = SVGColorValidator().validate_svg_colors(response.get_data(as_text=True))
+    assert analysis['compliance']['red_strokes'] == 3
+
+    # Pasted content, colour only
+    response = client.post('/fix-svg', data={'svg_text': DRAWING, 'check_red': 'on'})
+    assert 'stroke-opacity:0.4' in response.get_data(as_text=True)
+
+    response = client.post('/fix-svg', data={'svg_text': '<svg'})
+    assert response.status_code == 302
+
+    # Tolerances that are not positive numbers are reported instead of failing
+    for tolerance in ('abc', '-1'):
+        response = client.post('/fix-svg', data={'svg_text': DRAWING, 'width_tolerance': tolerance},
+                               follow_redirects=True)
+        assert 'Width tolerance must be a positive number' in response.get_data(as_text=True)
+
+    # Non-Latin-1 upload names still give a header the server can encode
+    response = client.post('/fix-svg', data={'svg_file': (io.BytesIO(DRAWING.encode()), 'Zeichnung-€.svg')},
+                           content_type='multipart/form-data')
+    disposition = response.headers['Content-Disposition']
+    disposition.encode('latin-1')
+    assert "filename*=UTF-8''Zeichnung-%E2%82%AC-fixed.svg" in disposition
+
+
+def test_svg_checker_fix(tmp_path):
+    path = tmp_path / 'drawing.svg'
+    path.write_text(DRAWING)
+    script = os.path.join(os.path.dirname(__file__), '..', 'svg_checker.py')
+    output = subprocess.run([sys.executable, script, str(path), '--fix'], capture_output=True, text=True).stdout
+    assert 'Fixed 2 of 3 stroked shape(s)' in output
+    checked = subprocess.run([sys.executable, script, str(tmp_path / 'drawing-fixed.svg')],
+                             capture_output=True, text=True).stdout
+    # The cut lines pass; the <defs> template and the engraved circle are not cut lines
+    assert 'Warning' not in checked.split("'styled'")[1].split("'engraved'")[0]
+
+    # Fixing in place
+    subprocess.run([sys.executable, script, str(path), '--fix', '-o', str(path)], check=True, capture_output=True)
+    assert 'stroke:#ff0000' in path.read_text()
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_fix_makes_drawing_compliant()
+    test_only_selected_settings_are_fixed()
+    test_streams_large_documents()
+    test_fix_endpoint()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_svg_checker_fix(pathlib.Path(tmp))
+    print("\n🎉 SVG fixer tests passed!")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Test SVG cut geometry: path flattening, duplicates, overlaps and the grid index."""
+
+import sys
+import os
+import math
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from lxml import etree
+
+from utils import SVGColorValidator
+from utils.svg_geometry import (parse_path, parse_transform, analyze_geometry, SegmentGrid,
+                                collinear_overlaps)
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg">{}</svg>'
+
+
+def _length(polyline):
+    return float(np.hypot(*np.diff(polyline, axis=0).T).sum())
+
+
+def test_path_commands():
+    square, = parse_path('M0 0 h10 v10 H0 z')
+    assert square.tolist() == [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
+
+    # Implicit line-tos after a moveto, relative coordinates, packed numbers
+    polyline, = parse_path('m1-1 2 0 0 2')
+    assert polyline.tolist() == [[1, -1], [3, -1], [3, 1]]
+
+    circle, = parse_path('M10 0 A10 10 0 1 1 -10 0 A10 10 0 1 1 10 0')
+    assert _length(circle) == pytest.approx(2 * math.pi * 10, rel=1e-3)
+
+    # Packed arc flags ("00" then the x coordinate)
+    assert parse_path('M0,0a1,1 0 001,1')[0][-1].tolist() == [1, 1]
+
+    # Smooth curves reflect the previous control point
+    curve, = parse_path('M0 0 C0 10 10 10 10 0 S20 -10 20 0')
+    assert curve[-1].tolist() == [20, 0]
+    assert curve[len(curve) * 3 // 4][1] < 0
+
+    for bad in ('L1 2', 'M1', 'M0 0 X1 2', 'M0 0 A1 1 0 2 0 1 1'):
+        with pytest.raises(ValueError):
+            parse_path(bad)
+
+
+def test_transforms():
+    assert parse_transform('translate(5) scale(2)') == (2.0, 0.0, 0.0, 2.0, 5.0, 0.0)
+    a, b, c, d, e, f = parse_transform('rotate(90 10 10)')
+    assert (a * 0 + c * 0 + e, b * 0 + d * 0 + f) == pytest.approx((20, 0))
+
+
+def test_duplicates_and_overlaps():
+    """Copies (in any drawing order) and collinear strokes are reported."""
+    print("✂️  Testing duplicate and overlapping cut detection...")
+    root = etree.fromstring(SVG.format(
+        '<g transform="translate(10,0)">'
+        '<rect id="a" width="10" height="10"/>'
+        '<path id="b" d="M10 10 L10 0 L0 0 L0 10 Z"/>'  # same square, other direction
+        '<line id="c" x1="5" x2="20"/>'                  # overlaps the top edge by 5
+        '</g>'
+        '<line id="d" x1="30" y1="5" x2="40" y2="5"/>'   # parallel, not collinear
+        '<defs><rect id="hidden" width="10" height="10"/></defs>'
+    ))
+    report = analyze_geometry(root)
+
+    assert report['shapes'] == 4
+    assert report['duplicates'] == [{'ids': ['a', 'b'], 'length': 40.0}]
+    assert report['duplicate_length'] == pytest.approx(40)
+    assert report['overlaps'] == [{'ids': ['a', 'c'], 'length': pytest.approx(5)}]
+    assert report['cut_length'] == pytest.approx(40 + 40 + 15 + 10)
+    assert report['unique_cut_length'] == pytest.approx(60)
+    print(f"  ✅ {report['duplicate_count']} duplicate, {report['overlap_count']} overlap")
+
+
+def test_grid_finds_same_pairs_as_brute_force():
+    rng = np.random.default_rng(7)
+    count = 400
+    x0, y0 = rng.uniform(0, 50, count), rng.uniform(0, 50, count)
+    angle = rng.uniform(0, math.pi, count)
+    length = rng.uniform(0.5, 8, count)
+    x1, y1 = x0 + length * np.cos(angle), y0 + length * np.sin(angle)
+    # Make some exactly collinear overlapping copies
+    x0[:40], y0[:40] = x0[40:80] + 0.3 * np.cos(angle[40:80]), y0[40:80] + 0.3 * np.sin(angle[40:80])
+    x1[:40], y1[:40] = x1[40:80], y1[40:80]
+
+    first, second = np.triu_indices(count, 1)
+    brute = collinear_overlaps(x0, y0, x1, y1, first, second, 0.01)
+    expected = {(int(a), int(b)) for a, b, o in zip(first, second, brute) if o > 0}
+
+    grid = SegmentGrid(x0, y0, x1, y1, padding=0.01)
+    first, second = grid.candidate_pairs()
+    found = collinear_overlaps(x0, y0, x1, y1, first, second, 0.01)
+    assert {(int(a), int(b)) for a, b, o in zip(first, second, found) if o > 0} == expected
+    assert len(expected) >= 40
+    assert len(first) < count * (count - 1) // 2 / 10
+
+
+def test_large_documents_scale():
+    """Many shapes go through the array pipeline, not pairwise comparisons."""
+    shapes = ''.join(f'<rect x="{i % 300 * 12}" y="{i // 300 * 12}" width="10" height="10"/>'
+                     for i in range(30000))
+    report = analyze_geometry(etree.fromstring(SVG.format(shapes + '<rect width="10" height="10"/>')))
+    assert report['shapes'] == 30001
+    assert report['duplicate_count'] == 1
+    assert report['overlap_count'] == 0
+    assert report['cut_length'] == pytest.approx(30001 * 40)
+
+
+def test_validator_and_api():
+    validator = SVGColorValidator()
+    assert 'error' in validator.analyze_geometry('<svg')
+
+    import app as app_module
+    client = app_module.app.test_client()
+    svg = SVG.format('<line x1="0" x2="10" stroke="red"/><line x1="5" x2="15" stroke="red"/>')
+    data = client.post('/analyze-svg-colors', json={'svg_content': svg, 'geometry': True}).get_json()
+    assert data['analysis']['geometry']['overlap_length'] == pytest.approx(5)
+
+    # The tolerance is a quantization step; zero, negative and non-numeric values are rejected
+    for tolerance in (0, -1, 'wide', float('nan')):
+        response = client.post('/analyze-svg-colors', json={'svg_content': svg, 'geometry': True,
+                                                            'tolerance': tolerance})
+        assert response.status_code == 400 and 'tolerance' in response.get_json()['error']
+    with pytest.raises(ValueError):
+        analyze_geometry(etree.fromstring(svg), tolerance=0)
+
+    page = client.post('/check-svg', data={'svg_text': svg, 'check_geometry': 'on'}).get_data(as_text=True)
+    assert 'Cut Geometry' in page and 'Overlap: line_1 / line_2' in page
+
+
+if __name__ == "__main__":
+    test_path_commands()
+    test_transforms()
+    test_duplicates_and_overlaps()
+    test_grid_finds_same_pairs_as_brute_force()
+    test_large_documents_scale()
+    test_validator_and_api()
+    print("\n🎉 SVG geometry tests passed!")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Test the styled vector SVG renderer."""
+
+import io
+import re
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pytest
+import qrcode
+from lxml import etree
+from PIL import Image
+from qrcode.image.svg import SvgImage
+from utils import QRCodeGenerator
+from utils.svg_renderer import QRSvgRenderer
+
+SVG_NS = {'svg': 'http://www.w3.org/2000/svg'}
+TEST_DATA = "https://example.com/svg-renderer-test"
+
+
+def _modules(data):
+    qr = qrcode.QRCode(box_size=10, border=4)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.modules
+
+
+def test_square_path_covers_exactly_dark_modules():
+    """Merged rectangles cover every dark module and nothing else."""
+    print("🔳 Testing square path merging...")
+
+    modules = _modules(TEST_DATA)
+    svg = QRSvgRenderer(border=4).render(modules)
+    root = etree.fromstring(svg.encode('utf-8'))
+    paths = root.xpath('//svg:path', namespaces=SVG_NS)
+    assert len(paths) == 1, "all modules should be merged into one path"
+
+    count = len(modules)
+    covered = [[False] * count for _ in range(count)]
+    for x, y, w, h in re.findall(r'M(\d+) (\d+)h(\d+)v(\d+)h-\d+z', paths[0].get('d')):
+        x, y, w, h = int(x) - 4, int(y) - 4, int(w), int(h)
+        for row in range(y, y + h):
+            for col in range(x, x + w):
+                assert not covered[row][col], "rectangles must not overlap"
+                covered[row][col] = True
+
+    assert covered == [[bool(m) for m in row] for row in modules]
+    print("  ✅ Rectangles match the module matrix")
+
+
+@pytest.mark.parametrize('module_drawer', ['square', 'rounded', 'circle'])
+@pytest.mark.parametrize('color_mask', ['solid', 'radial', 'square'])
+def test_styled_svg_is_valid(module_drawer, color_mask):
+    """Every style combination produces well-formed SVG with its gradient."""
+    qr_gen = QRCodeGenerator()
+    buf, mimetype, filename = qr_gen.generate_qr_code(
+        TEST_DATA, export_format='svg', module_drawer=module_drawer, color_mask=color_mask
+    )
+    assert mimetype == 'image/svg+xml'
+    assert filename.endswith('.svg')
+
+    root = etree.fromstring(buf.getvalue())
+    if color_mask == 'radial':
+        assert root.xpath('//svg:radialGradient', namespaces=SVG_NS)
+    elif color_mask == 'square':
+        assert len(root.xpath('//svg:linearGradient', namespaces=SVG_NS)) == 4
+    else:
+        assert not root.xpath('//svg:radialGradient | //svg:linearGradient', namespaces=SVG_NS)
+
+
+def test_custom_colors_and_logo():
+    """Custom colors are applied and the logo is embedded as a data URI."""
+    qr_gen = QRCodeGenerator()
+    buf, _, _ = qr_gen.generate_qr_code(
+        TEST_DATA, export_format='svg', color_mask='custom',
+        foreground_color='#123456', background_color='#fafafa',
+        logo_image=Image.new('RGB', (100, 100), 'red')
+    )
+    svg = buf.getvalue().decode('utf-8')
+    assert 'fill="#123456"' in svg
+    assert 'fill="#fafafa"' in svg
+    assert 'xlink:href="data:image/png;base64,' in svg
+
+
+def test_smaller_than_rect_per_module_output():
+    """Path merging is several times smaller than qrcode's SvgImage."""
+    print("📏 Testing output size...")
+
+    data = TEST_DATA + "/" + "x" * 1500
+    qr_gen = QRCodeGenerator()
+    buf, _, _ = qr_gen.generate_qr_code(data, export_format='svg')
+
+    qr = qrcode.QRCode(box_size=10, border=4)
+    qr.add_data(data)
+    qr.make(fit=True)
+    baseline = io.BytesIO()
+    qr.make_image(image_factory=SvgImage).save(baseline)
+
+    ratio = len(baseline.getvalue()) / len(buf.getvalue())
+    print(f"  ✅ {len(buf.getvalue())} bytes vs {len(baseline.getvalue())} bytes ({ratio:.1f}x smaller)")
+    assert ratio > 5
+
+
+if __name__ == "__main__":
+    test_square_path_covers_exactly_dark_modules()
+    for drawer in ('square', 'rounded', 'circle'):
+        for mask in ('solid', 'radial', 'square'):
+            test_styled_svg_is_valid(drawer, mask)
+    test_custom_colors_and_logo()
+    test_smaller_than_rect_per_module_output()
+    print("\n🎉 SVG renderer tests passed!")
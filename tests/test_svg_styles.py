@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Test effective SVG styles: style attributes, <style> sheets and group inheritance."""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from lxml import etree
+
+from utils import SVGColorValidator
+from utils.svg_styles import Stylesheet, StyleResolver, parse_declarations, has_stroke
+from utils.svg_geometry import iter_shapes
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg">{}</svg>'
+
+
+def _styles(svg):
+    root = etree.fromstring(svg)
+    return {element.get('id'): style for _, element, _, _, _, style in iter_shapes(root, StyleResolver(root))}
+
+
+def test_declarations():
+    assert parse_declarations('stroke: #F00 ; stroke-width:1mm;font-size:3px') == (
+        ('stroke', '#F00', False), ('stroke-width', '1mm', False))
+    assert parse_declarations('fill:red !important') == (('fill', 'red', True),)
+
+
+def test_cascade_and_inheritance():
+    styles = _styles(SVG.format(
+        '<style><![CDATA[ /* Illustrator */ .cls-1{fill:none;stroke:#ff0000} '
+        '@media print { rect { stroke: blue } } path.cut, #special { stroke-width: 2 } '
+        'g > path { stroke: green } rect { stroke: black !important } ]]></style>'
+        '<g stroke="blue" style="stroke-width:0.5mm;stroke-opacity:0.5" opacity="0.3">'
+        '  <path id="inherits" d="M0 0L1 1"/>'
+        '  <path id="attribute" stroke="lime" d="M0 0L1 1"/>'
+        '  <path id="class" class="cls-1 cut" stroke="lime" d="M0 0L1 1"/>'
+        '  <path id="special" class="cls-1" style="stroke:#00f;stroke-opacity:inherit" d="M0 0L1 1"/>'
+        '  <rect id="important" style="stroke:red" width="1" height="1"/>'
+        '  <g color="#123456"><line id="current" stroke="currentColor" x2="1"/></g>'
+        '</g>'
+    ))
+    assert styles['inherits'] == {'stroke': 'blue', 'stroke-width': '0.5mm', 'stroke-opacity': '0.5'}
+    assert styles['attribute']['stroke'] == 'lime'
+    assert styles['class']['stroke'] == '#ff0000' and styles['class']['stroke-width'] == '2'
+    assert styles['class']['fill'] == 'none'
+    assert styles['special']['stroke'] == '#00f' and styles['special']['stroke-opacity'] == '0.5'
+    assert styles['important']['stroke'] == 'black'
+    assert styles['current']['stroke'] == '#123456'
+    # Only simple selectors are matched; the child combinator rule is skipped
+    assert Stylesheet('g > path { stroke: green } a:hover { fill: red }').unsupported_selectors == 2
+
+
+def test_validator_uses_effective_styles():
+    svg = SVG.format(
+        '<style>.cut { stroke: red; stroke-width: 1mm }</style>'
+        '<g style="stroke:#ff0000;stroke-width:1mm;fill:url(#grad)">'
+        '  <rect id="a" width="1" height="1"/>'
+        '  <circle id="b" class="cut" r="1" stroke-opacity="0.5"/>'
+        '</g>'
+        '<g style="display:none"><rect id="hidden" class="cut" width="2" height="2"/></g>'
+        '<rect id="unstroked" width="3" height="3"/>'
+    )
+    analysis = SVGColorValidator().validate_svg_colors(svg)
+    assert analysis['total_shapes'] == 4
+    assert analysis['compliance'] == {
+        'red_strokes': 3, 'correct_width': 3, 'correct_opacity': 3, 'total_with_stroke': 3}
+    assert analysis['color_summary']['has_gradients']
+    assert analysis['shapes'][0]['fill']['type'] == 'url_reference'
+
+    # Hidden and unstroked shapes are not cut lines
+    geometry = SVGColorValidator().analyze_geometry(svg)
+    assert geometry['shapes'] == 2
+    assert not has_stroke({'stroke': 'none'}) and has_stroke({'stroke': 'red'})
+
+
+def test_resolution_is_linear():
+    """Deep groups and many shapes resolve in one walk, without ancestor lookups."""
+    groups = '<g style="stroke:red">' * 200 + '<path d="M0 0L1 1"/>' * 20000 + '</g>' * 200
+    root = etree.fromstring(SVG.format('<style>.a{fill:none}</style>' + groups))
+    start = time.perf_counter()
+    shapes = list(iter_shapes(root, StyleResolver(root)))
+    elapsed = time.perf_counter() - start
+    print(f"Resolved {len(shapes)} shapes in {elapsed:.2f}s")
+    assert len(shapes) == 20000
+    assert all(style['stroke'] == 'red' for *_, style in shapes)
+
+
+if __name__ == "__main__":
+    test_declarations()
+    test_cascade_and_inheritance()
+    test_validator_uses_effective_styles()
+    test_resolution_is_linear()
+    print("\n🎉 SVG style tests passed!")
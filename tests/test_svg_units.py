@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Test stroke width normalization to millimetres and tolerance-based compliance."""
+
+import sys
+import os
+import subprocess
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import numpy as np
+import pytest
+from lxml import etree
+
+from utils import SVGColorValidator
+from utils.svg_units import parse_length, to_user_units, document_scale, stroke_widths_mm, width_compliance
+from utils.svg_geometry import iter_shapes
+from utils.svg_styles import StyleResolver
+
+
+def _widths(svg):
+    root = etree.fromstring(svg)
+    shapes = [(transform, style) for *_, transform, _, style in iter_shapes(root, StyleResolver(root))]
+    return stroke_widths_mm(root, shapes)
+
+
+def test_lengths():
+    assert parse_length(' 3.7795px ') == (3.7795, 'px')
+    assert parse_length('1E1') == (10.0, '')
+    assert parse_length('red') is None
+    assert to_user_units('1in') == 96
+    assert to_user_units('1mm') == pytest.approx(3.779527559)
+    assert to_user_units('50%') is None
+    assert to_user_units('50%', reference=10) == 5
+    assert to_user_units('2em') is None
+
+
+def test_document_scale():
+    root = etree.fromstring('<svg width="100mm" height="50mm" viewBox="0 0 200 100"/>')
+    assert document_scale(root)[0] == pytest.approx(0.5)
+    # No physical size: one user unit is one CSS pixel
+    assert document_scale(etree.fromstring('<svg viewBox="0 0 10 10"/>'))[0] == pytest.approx(25.4 / 96)
+    # Aspect ratio mismatch: the viewBox is fitted inside (meet)
+    root = etree.fromstring('<svg width="100mm" height="100mm" viewBox="0 0 100 50"/>')
+    assert document_scale(root)[0] == pytest.approx(1.0)
+
+
+def test_widths_with_units_viewbox_and_transforms():
+    widths = _widths(
+        '<svg xmlns="http://www.w3.org/2000/svg">'
+        '<path stroke-width="1mm"/><path stroke-width="3.7795px"/><path stroke-width="0.1cm"/>'
+        '<g transform="scale(2)"><path stroke-width="0.5mm"/></g>'
+        '<g transform="scale(4 1)"><path stroke-width="0.5mm"/></g>'
+        '<path stroke-width="2em"/><path/>'
+        '</svg>'
+    )
+    assert widths[:5] == pytest.approx([1, 1, 1, 1, 1], abs=1e-4)
+    assert np.isnan(widths[5])
+    assert widths[6] == pytest.approx(25.4 / 96)
+
+    # A 10mm wide drawing of 100 user units: width 10 is 1mm
+    widths = _widths('<svg xmlns="http://www.w3.org/2000/svg" width="10mm" height="10mm" viewBox="0 0 100 100">'
+                     '<path stroke-width="10"/><path stroke-width="10%"/></svg>')
+    assert widths == pytest.approx([1, 1])
+
+    assert list(width_compliance([1.0, 1.004, 1.02, np.nan], tolerance_mm=0.01)) == [True, True, False, False]
+    assert list(width_compliance([1.02], tolerance_mm=0.05)) == [True]
+
+
+def test_validator_tolerance_and_api():
+    svg = ('<svg xmlns="http://www.w3.org/2000/svg"><path stroke="red" stroke-width="3.7795px"/>'
+           '<path stroke="red" stroke-width="1.02mm"/><path stroke="red" stroke-width="1mm"/></svg>')
+    validator = SVGColorValidator()
+    analysis = validator.validate_svg_colors(svg)
+    assert analysis['compliance']['correct_width'] == 2
+    assert analysis['shapes'][1]['stroke_width_mm'] == pytest.approx(1.02)
+    assert not analysis['shapes'][1]['width_ok']
+    assert validator.validate_svg_colors(svg, width_tolerance=0.05)['compliance']['correct_width'] == 3
+
+    import app as app_module
+    client = app_module.app.test_client()
+    data = client.post('/analyze-svg-colors', json={'svg_content': svg, 'width_tolerance': 0.05}).get_json()
+    assert data['analysis']['compliance']['correct_width'] == 3
+    page = client.post('/check-svg', data={'svg_text': svg, 'check_width': 'on'}).get_data(as_text=True)
+    assert '(1.020 mm)' in page and '± 0.01 mm' in page
+
+    # Tolerances that are not positive numbers are rejected instead of marking every width wrong
+    for tolerance in ('abc', -3, 0):
+        response = client.post('/analyze-svg-colors', json={'svg_content': svg, 'width_tolerance': tolerance})
+        assert response.status_code == 400 and 'Width tolerance' in response.get_json()['error']
+        response = client.post('/check-svg', data={'svg_text': svg, 'width_tolerance': str(tolerance)})
+        assert response.status_code == 400 and 'Width tolerance must be a positive number' in response.get_data(as_text=True)
+
+
+def test_svg_checker_cli(tmp_path):
+    path = tmp_path / 'drawing.svg'
+    path.write_text('<svg xmlns="http://www.w3.org/2000/svg" width="100mm" height="50mm" viewBox="0 0 200 100">'
+                    '<g stroke="red" stroke-width="2"><path d="M0 0L1 1"/></g></svg>')
+    script = os.path.join(os.path.dirname(__file__), '..', 'svg_checker.py')
+    output = subprocess.run([sys.executable, script, str(path)], capture_output=True, text=True).stdout
+    assert 'Stroke width: 2 (1.000mm) (OK)' in output
+    assert 'Stroke color: red (OK)' in output
+
+
+def test_many_shapes_are_vectorized():
+    """Widths of many shapes are scaled on arrays; only distinct values are parsed."""
+    shapes = ''.join(f'<path transform="scale({1 + i % 7})" stroke-width="{i % 50 / 10}mm"/>' for i in range(100000))
+    svg = f'<svg xmlns="http://www.w3.org/2000/svg">{shapes}</svg>'
+    start = time.perf_counter()
+    widths = _widths(svg)
+    elapsed = time.perf_counter() - start
+    print(f"Normalized {len(widths)} widths in {elapsed:.2f}s")
+    i = np.arange(100000)
+    assert widths == pytest.approx((1 + i % 7) * (i % 50 / 10))
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+    test_lengths()
+    test_document_scale()
+    test_widths_with_units_viewbox_and_transforms()
+    test_validator_tolerance_and_api()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_svg_checker_cli(pathlib.Path(tmp))
+    test_many_shapes_are_vectorized()
+    print("\n🎉 SVG unit tests passed!")